@@ -1,34 +1,525 @@
 # analyzer.py
 import pandas as pd
+import numpy as np
+import os
+import re
+import hashlib
 import logging
-from typing import Dict, Tuple, List, Any
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Tuple, List, Any, Optional
 import sys
 
+from config import CACHE_DIR, MONTHS, DEFAULT_SLA_DAYS
+
 logger = logging.getLogger(__name__)
 
+# Группы статусов (после удаления пробелов по краям)
+STATUS_GROUPS = {
+    'Выполнение завершено успешно': 'successful',
+    'Выполнение завершено с проблемами': 'with_problems',
+    'ВОбработке': 'in_progress',
+}
+STATUS_GROUP_NAMES = ['successful', 'with_problems', 'in_progress', 'other']
+CLARIFICATION_STAGE = 'Уточнение'
+
+# Срок работы над ошибкой (дней) по серьезности, если таблица SLA не передана
+DEADLINE_DAYS = DEFAULT_SLA_DAYS
+SLA_PERCENTILES = [50, 90, 99]
+
+def deadline_fields(violations: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Поля deadline_violations_* результата анализа (нет в таблице SLA - нули)"""
+    return {
+        'deadline_violations_significant': violations.get('Значительная', {'total': 0, 'violations': 0}),
+        'deadline_violations_critical': violations.get('Критическая', {'total': 0, 'violations': 0}),
+    }
+
+# Колонки выгрузки, которые используются в анализе
+REQUIRED_COLUMNS = ['Статус', 'Серьезность', 'Активный этап', 'Сектор', 'Участок', 'Дней в работе']
+TEXT_COLUMNS = ['Статус', 'Серьезность', 'Активный этап', 'Сектор', 'Участок']
+
+def file_fingerprint(file_path: str) -> str:
+    """Отпечаток содержимого файла выгрузки"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return f"{os.path.getsize(file_path)}-{digest.hexdigest()}"
+
+class ErrorFrameCache:
+    """Кэш прочитанных выгрузок: в памяти на время сеанса и на диске (pickle).
+
+    Ключ - отпечаток содержимого файла, поэтому повторный анализ той же
+    выгрузки (в том числе после смены отдела или месяца) не читает Excel.
+    Версия pandas входит в имя файла кэша: pickle другой версии не читается.
+    """
+
+    MAX_MEMORY_ENTRIES = 4
+    MAX_DISK_ENTRIES = 10
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self._frames: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                return frame
+
+        path = self._disk_path(key)
+        if not path.exists():
+            return None
+        try:
+            frame = pd.read_pickle(path)
+        except Exception as e:
+            logger.warning(f"Кэш выгрузки {path.name} не прочитан: {e}")
+            return None
+
+        self._remember(key, frame)
+        return frame
+
+    def put(self, key: str, frame: pd.DataFrame):
+        self._remember(key, frame)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._disk_path(key)
+            temp_path = path.with_suffix('.tmp')
+            frame.to_pickle(temp_path)
+            os.replace(temp_path, path)
+            self._prune_disk()
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить кэш выгрузки: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    def _remember(self, key: str, frame: pd.DataFrame):
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.MAX_MEMORY_ENTRIES:
+                self._frames.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"errors_v{self.FORMAT_VERSION}_pd{pd.__version__}_{key}.pkl"
+
+    def _prune_disk(self):
+        files = sorted(self.cache_dir.glob("errors_v*.pkl"), key=lambda path: path.stat().st_mtime, reverse=True)
+        for path in files[self.MAX_DISK_ENTRIES:]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+error_frame_cache = ErrorFrameCache(CACHE_DIR)
+
+def read_error_export(file_path: str) -> pd.DataFrame:
+    """Чтение только нужных колонок: текст - категории, "Дней в работе" - число"""
+    def usecols(column) -> bool:
+        return column in REQUIRED_COLUMNS
+    
+    # Пробуем загрузить с разными движками
+    try:
+        frame = pd.read_excel(file_path, sheet_name='Лист1', engine='openpyxl', usecols=usecols)
+    except:
+        frame = pd.read_excel(file_path, sheet_name='Лист1', engine='xlrd', usecols=usecols)
+    
+    # Проверяем необходимые колонки
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in frame.columns]
+    if missing_columns:
+        raise ValueError(f"Отсутствуют обязательные колонки: {missing_columns}")
+    
+    frame = frame[REQUIRED_COLUMNS].astype({col: 'category' for col in TEXT_COLUMNS})
+    frame['Дней в работе'] = pd.to_numeric(frame['Дней в работе'], errors='coerce')
+    return frame
+
+def load_error_export(file_path: str) -> pd.DataFrame:
+    """Выгрузка из кэша или из Excel (прочитанная выгрузка попадает в кэш).
+
+    Возвращается кэшированный кадр - его нельзя менять на месте.
+    """
+    key = file_fingerprint(file_path)
+    frame = error_frame_cache.get(key)
+    if frame is None:
+        frame = read_error_export(file_path)
+        error_frame_cache.put(key, frame)
+        logger.info(f"Файл {os.path.basename(file_path)} загружен. Строк: {len(frame)}")
+    else:
+        logger.info(f"Файл {os.path.basename(file_path)} взят из кэша выгрузок. Строк: {len(frame)}")
+    return frame
+
+def load_error_exports(file_paths: List[str], max_workers: Optional[int] = None) -> List[pd.DataFrame]:
+    """Загрузка нескольких выгрузок: из кэша, остальные - параллельно в пуле процессов.
+
+    Кадры возвращаются в порядке file_paths. Если пул процессов недоступен,
+    файлы читаются последовательно в текущем процессе.
+    """
+    keys = [file_fingerprint(path) for path in file_paths]
+    frames = [error_frame_cache.get(key) for key in keys]
+    missing = [i for i, frame in enumerate(frames) if frame is None]
+    
+    if len(missing) > 1:
+        workers = min(len(missing), max_workers or os.cpu_count() or 1)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {i: executor.submit(read_error_export, file_paths[i]) for i in missing}
+                for i, future in futures.items():
+                    frames[i] = future.result()
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(f"Пул процессов недоступен, последовательное чтение выгрузок: {e}")
+    
+    for i in missing:
+        if frames[i] is None:
+            frames[i] = read_error_export(file_paths[i])
+        error_frame_cache.put(keys[i], frames[i])
+    
+    logger.info(f"Загружено выгрузок: {len(file_paths)}, прочитано из Excel: {len(missing)}")
+    return frames
+
+_MONTH_PATTERNS = [
+    (month, re.compile(r'ма[йя]' if month == 'Май' else month[:3].lower()))
+    for month in MONTHS
+]
+
+def detect_export_month(file_path: str) -> Optional[str]:
+    """Месяц из MONTHS по имени файла выгрузки ("ошибки_март.xlsx", "Errors Февраля.xlsx")"""
+    name = Path(file_path).stem.lower()
+    for month, pattern in _MONTH_PATTERNS:
+        if pattern.search(name):
+            return month
+    return None
+
+def exports_by_month(file_paths: List[str]) -> Dict[str, str]:
+    """Подписи месяцев для выгрузок тренда: {месяц: путь} в календарном порядке.
+
+    Файлы без месяца в имени подписываются именем файла и идут в конце.
+    """
+    month_order = {month: i for i, month in enumerate(MONTHS)}
+    labeled = [(detect_export_month(path), path) for path in file_paths]
+    labeled.sort(key=lambda item: month_order.get(item[0], len(month_order)))
+    
+    exports = {}
+    for month, path in labeled:
+        label = month or Path(path).stem
+        if label in exports:
+            label = f"{label} ({Path(path).stem})"
+        exports[label] = path
+    return exports
+
+def normalize_text_column(series: pd.Series, default: str) -> pd.Series:
+    """Текстовая колонка без пробелов по краям в виде категории, пустые - default.
+
+    Строки обрабатываются только среди уникальных значений: после удаления
+    пробелов совпавшие значения ("ВОбработке" и "ВОбработке ") сливаются в
+    одну категорию.
+    """
+    codes, uniques = pd.factorize(series)
+    # Код -1 (пустое значение) указывает на последний элемент - default
+    stripped = pd.Index(uniques).astype(str).str.strip().append(pd.Index([default]))
+    stripped_codes, categories = pd.factorize(stripped)
+    return pd.Series(pd.Categorical.from_codes(stripped_codes[codes], categories=categories),
+                     index=series.index, name=series.name)
+
+def grouped_weighted_percentiles(group_codes: np.ndarray, values: np.ndarray, weights: np.ndarray,
+                                 group_count: int, quantiles: List[float]) -> np.ndarray:
+    """Перцентили значений с весами (числом строк) для всех групп сразу.
+
+    Результат - массив group_count × len(quantiles), как np.percentile по
+    развернутым строкам каждой группы (пустые группы - 0). Одна сортировка
+    по (группа, значение), дальше позиции перцентилей ищутся searchsorted
+    по накопленным весам.
+    """
+    result = np.zeros((group_count, len(quantiles)))
+    if len(values) == 0:
+        return result
+    
+    order = np.lexsort((values, group_codes))
+    values = values[order]
+    cumulative = np.cumsum(weights[order])
+    totals = np.bincount(group_codes, weights=weights, minlength=group_count).astype(np.int64)
+    starts = np.cumsum(totals) - totals
+    present = totals > 0
+    last = len(values) - 1
+    
+    for i, q in enumerate(quantiles):
+        # Линейная интерполяция между соседними строками, как в np.percentile
+        position = q / 100 * np.maximum(totals - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, np.maximum(totals - 1, 0))
+        lower_value = values[np.minimum(np.searchsorted(cumulative, starts + lower, side='right'), last)]
+        upper_value = values[np.minimum(np.searchsorted(cumulative, starts + upper, side='right'), last)]
+        result[:, i] = np.where(present, lower_value + (upper_value - lower_value) * (position - lower), 0)
+    return result
+
+def weighted_percentiles(values: np.ndarray, weights: np.ndarray, quantiles: List[float]) -> List[float]:
+    """Перцентили значений с весами (числом строк) - как np.percentile по развернутым строкам"""
+    group_codes = np.zeros(len(values), dtype=np.int64)
+    return [float(value) for value in grouped_weighted_percentiles(group_codes, values, weights, 1, quantiles)[0]]
+
+class ErrorCube:
+    """Агрегатный куб выгрузки для фильтров без повторного анализа.
+
+    Ячейка - уникальное сочетание текстовых колонок (TEXT_COLUMNS) и значения
+    "Дней в работе"; в ней хранится число строк и номер первой строки.
+    Фильтр - маска по ячейкам, показатели - bincount по кодам категорий,
+    поэтому отчет по любому срезу не обращается к DataFrame. Номер первой
+    строки сохраняет порядок analyze_errors при равных счетчиках.
+    """
+    
+    DAYS_PERCENTILES = SLA_PERCENTILES
+    
+    def __init__(self, categories: Dict[str, List[str]], codes: Dict[str, np.ndarray],
+                 days: np.ndarray, counts: np.ndarray, first_rows: np.ndarray,
+                 filters: Optional[Dict[str, List[str]]] = None):
+        self.categories = categories
+        self.codes = codes
+        self.days = days
+        self.counts = counts
+        self.first_rows = first_rows
+        self.filters = filters or {}
+        self._category_index = {column: {value: i for i, value in enumerate(values)}
+                                for column, values in categories.items()}
+    
+    @property
+    def size(self) -> int:
+        """Число ячеек куба"""
+        return len(self.counts)
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'ErrorCube':
+        """Куб по кадру после ErrorAnalyzer.clean_data (текстовые колонки - категории)"""
+        codes = [df[column].cat.codes.to_numpy(np.int64) for column in TEXT_COLUMNS]
+        day_codes, day_values = pd.factorize(df['Дней в работе'])
+        codes.append(day_codes.astype(np.int64))
+        sizes = [len(df[column].cat.categories) for column in TEXT_COLUMNS] + [len(day_values)]
+        
+        # Ключ ячейки - число в смешанной системе счисления по кодам колонок
+        if np.prod([max(size, 1) for size in sizes], dtype=float) < 2 ** 62:
+            key = np.zeros(len(df), dtype=np.int64)
+            for column_codes, size in zip(codes, sizes):
+                key = key * max(size, 1) + column_codes
+        else:
+            key = np.unique(np.column_stack(codes), axis=0, return_inverse=True)[1].ravel()
+        
+        _, first_rows, counts = np.unique(key, return_index=True, return_counts=True)
+        
+        # Ячейки в порядке появления
+        order = np.argsort(first_rows, kind='stable')
+        first_rows = first_rows[order]
+        return cls(
+            categories={column: list(df[column].cat.categories) for column in TEXT_COLUMNS},
+            codes={column: codes[i][first_rows] for i, column in enumerate(TEXT_COLUMNS)},
+            days=np.asarray(day_values, dtype=float)[codes[-1][first_rows]],
+            counts=counts[order].astype(np.int64),
+            first_rows=first_rows.astype(np.int64),
+        )
+    
+    @classmethod
+    def from_cells(cls, cells: Dict[tuple, List[int]]) -> 'ErrorCube':
+        """Куб по ячейкам {(значения TEXT_COLUMNS..., дни): [число строк, первая строка]}"""
+        categories = {column: {} for column in TEXT_COLUMNS}
+        codes = {column: np.empty(len(cells), dtype=np.int64) for column in TEXT_COLUMNS}
+        days = np.empty(len(cells), dtype=float)
+        counts = np.empty(len(cells), dtype=np.int64)
+        first_rows = np.empty(len(cells), dtype=np.int64)
+        
+        # Ячейки добавлялись в порядке появления - категории получают тот же порядок
+        for i, (key, (count, first_row)) in enumerate(cells.items()):
+            for column, value in zip(TEXT_COLUMNS, key):
+                codes[column][i] = categories[column].setdefault(value, len(categories[column]))
+            days[i] = key[-1]
+            counts[i] = count
+            first_rows[i] = first_row
+        
+        return cls({column: list(values) for column, values in categories.items()},
+                   codes, days, counts, first_rows)
+    
+    def values(self, column: str) -> List[str]:
+        """Значения колонки, которые есть в кубе, по убыванию числа строк"""
+        counts = np.bincount(self.codes[column], weights=self.counts, minlength=len(self.categories[column]))
+        order = np.argsort(-counts, kind='stable')
+        return [self.categories[column][i] for i in order if counts[i] > 0]
+    
+    def filter(self, **filters: List[str]) -> 'ErrorCube':
+        """Срез куба: filter(Сектор=['...'], Серьезность=['Критическая']); пустой список - без фильтра"""
+        mask = np.ones(self.size, dtype=bool)
+        applied = dict(self.filters)
+        for column, selected in filters.items():
+            if not selected:
+                continue
+            allowed = np.zeros(len(self.categories[column]), dtype=bool)
+            for value in selected:
+                index = self._category_index[column].get(value)
+                if index is not None:
+                    allowed[index] = True
+            mask &= allowed[self.codes[column]]
+            applied[column] = list(selected)
+        
+        return ErrorCube(self.categories, {column: codes[mask] for column, codes in self.codes.items()},
+                         self.days[mask], self.counts[mask], self.first_rows[mask], applied)
+    
+    def _count_by(self, column: str, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Число строк и первая строка по категориям колонки (по ячейкам mask)"""
+        codes, counts, first_rows = self.codes[column], self.counts, self.first_rows
+        if mask is not None:
+            codes, counts, first_rows = codes[mask], counts[mask], first_rows[mask]
+        size = len(self.categories[column])
+        totals = np.bincount(codes, weights=counts, minlength=size).astype(np.int64)
+        first = np.full(size, np.iinfo(np.int64).max)
+        np.minimum.at(first, codes, first_rows)
+        return totals, first
+    
+    def _ordered(self, column: str, totals: np.ndarray, first: np.ndarray) -> List[int]:
+        """Коды категорий по убыванию счетчика, при равенстве - по первой строке"""
+        present = np.flatnonzero(totals > 0)
+        return list(present[np.lexsort((first[present], -totals[present]))])
+    
+    def _status_groups(self) -> np.ndarray:
+        """Индекс группы статуса (STATUS_GROUP_NAMES) для каждой ячейки"""
+        other = STATUS_GROUP_NAMES.index('other')
+        by_category = np.array([STATUS_GROUP_NAMES.index(STATUS_GROUPS[value]) if value in STATUS_GROUPS else other
+                                for value in self.categories['Статус']], dtype=np.int64)
+        return by_category[self.codes['Статус']] if len(by_category) else np.zeros(0, dtype=np.int64)
+    
+    def _top10_by_status(self, column: str, groups: np.ndarray) -> Dict[str, Dict[str, int]]:
+        size = len(self.categories[column])
+        table = np.bincount(self.codes[column] * len(STATUS_GROUP_NAMES) + groups, weights=self.counts,
+                            minlength=size * len(STATUS_GROUP_NAMES)).astype(np.int64)
+        table = table.reshape(size, len(STATUS_GROUP_NAMES))
+        totals, first = self._count_by(column)
+        
+        result = {}
+        for code in self._ordered(column, totals, first)[:10]:
+            row = table[code]
+            result[self.categories[column][code]] = {
+                'total': int(totals[code]),
+                'successful': int(row[STATUS_GROUP_NAMES.index('successful')]),
+                'with_problems': int(row[STATUS_GROUP_NAMES.index('with_problems')]),
+                'in_progress': int(row[STATUS_GROUP_NAMES.index('in_progress')])
+            }
+        return result
+    
+    def _distribution(self, column: str, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        totals, first = self._count_by(column, mask)
+        return {self.categories[column][code]: int(totals[code]) for code in self._ordered(column, totals, first)}
+    
+    def days_summary(self) -> Dict[str, float]:
+        """Сумма, среднее и перцентили "Дней в работе" по срезу"""
+        total = int(self.counts.sum())
+        days_sum = float(np.dot(self.days, self.counts))
+        summary = {'count': total, 'sum': days_sum, 'mean': days_sum / total if total else 0.0}
+        for q, value in zip(self.DAYS_PERCENTILES, weighted_percentiles(self.days, self.counts, self.DAYS_PERCENTILES)):
+            summary[f'p{q}'] = value
+        return summary
+    
+    def sla_report(self, sla_limits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Нарушения SLA и перцентили "Дней в работе" по серьезности, секторам и участкам.
+
+        Лимит серьезности раскладывается на все ячейки одним индексированием,
+        счетчики - bincount с весами, перцентили - grouped_weighted_percentiles.
+        Строки секторов и участков упорядочены по числу нарушений.
+        """
+        limits = DEADLINE_DAYS if sla_limits is None else sla_limits
+        category_limits = np.array([limits.get(value, np.nan) for value in self.categories['Серьезность']], dtype=float)
+        cell_limits = category_limits[self.codes['Серьезность']] if len(category_limits) else np.zeros(0)
+        tracked = ~np.isnan(cell_limits)
+        overdue = tracked & (self.days > np.where(tracked, cell_limits, np.inf))
+        
+        report = {'limits': dict(limits)}
+        for key, column in (('by_seriousness', 'Серьезность'), ('by_sector', 'Сектор'), ('by_area', 'Участок')):
+            codes = self.codes[column]
+            size = len(self.categories[column])
+            totals, first = self._count_by(column)
+            tracked_counts = np.bincount(codes, weights=self.counts * tracked, minlength=size).astype(np.int64)
+            violations = np.bincount(codes, weights=self.counts * overdue, minlength=size).astype(np.int64)
+            percentiles = grouped_weighted_percentiles(codes, self.days, self.counts, size, SLA_PERCENTILES)
+            
+            present = np.flatnonzero(totals > 0)
+            if column == 'Серьезность':
+                order = present[np.argsort(first[present], kind='stable')]
+            else:
+                order = present[np.lexsort((first[present], -totals[present], -violations[present]))]
+            
+            rows = {}
+            for code in order:
+                name = self.categories[column][code]
+                row = {
+                    'total': int(totals[code]),
+                    'tracked': int(tracked_counts[code]),
+                    'violations': int(violations[code]),
+                }
+                if column == 'Серьезность':
+                    row['limit'] = limits.get(name)
+                for q, value in zip(SLA_PERCENTILES, percentiles[code]):
+                    row[f'p{q}'] = float(value)
+                rows[name] = row
+            report[key] = rows
+        
+        return report
+    
+    def analysis(self, sla_limits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Показатели среза в формате ErrorAnalyzer.analyze_errors() (+ дни в работе, SLA и фильтры)"""
+        groups = self._status_groups()
+        clarification = np.array([value == CLARIFICATION_STAGE for value in self.categories['Активный этап']],
+                                 dtype=bool)
+        on_clarification = clarification[self.codes['Активный этап']] if len(clarification) else np.zeros(0, dtype=bool)
+        
+        def count(mask: np.ndarray) -> int:
+            return int(self.counts[mask].sum())
+        
+        successful = groups == STATUS_GROUP_NAMES.index('successful')
+        analysis = {
+            'total_errors': int(self.counts.sum()),
+            'successfully_closed': count(successful),
+            'clarification_required': count(on_clarification),
+            'closed_with_problems': count((groups == STATUS_GROUP_NAMES.index('with_problems')) & ~on_clarification),
+            'in_progress': count(groups == STATUS_GROUP_NAMES.index('in_progress')),
+            'seriousness_breakdown': self._distribution('Серьезность', successful),
+            'sector_top10': self._top10_by_status('Сектор', groups),
+            'area_top10': self._top10_by_status('Участок', groups),
+            'status_distribution': self._distribution('Статус'),
+        }
+        
+        sla = self.sla_report(sla_limits)
+        violations = {
+            seriousness: {'total': row['tracked'], 'violations': row['violations']}
+            for seriousness, row in sla['by_seriousness'].items() if row['limit'] is not None
+        }
+        analysis.update(deadline_fields(violations))
+        
+        analysis['days_in_work'] = self.days_summary()
+        analysis['sla'] = sla
+        analysis['filters'] = dict(self.filters)
+        return analysis
+
 class ErrorAnalyzer:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: Optional[str] = None, frame: Optional[pd.DataFrame] = None,
+                 sla_limits: Optional[Dict[str, float]] = None):
         self.file_path = file_path
         self.df = None
-        self.load_data()
+        # Таблица SLA: серьезность -> допустимое число дней в работе
+        self.sla_limits = DEADLINE_DAYS if sla_limits is None else sla_limits
+        # Группа статуса (STATUS_GROUP_NAMES) и признак этапа уточнения по строкам
+        self.status_group = None
+        self.on_clarification = None
+        if frame is not None:
+            self.df = frame.copy()
+        else:
+            self.load_data()
     
     def load_data(self):
-        """Загрузка данных из Excel файла с обработкой ошибок"""
+        """Загрузка данных из Excel файла (или из кэша выгрузок) с обработкой ошибок"""
         try:
-            # Пробуем загрузить с разными движками
-            try:
-                self.df = pd.read_excel(self.file_path, sheet_name='Лист1', engine='openpyxl')
-            except:
-                self.df = pd.read_excel(self.file_path, sheet_name='Лист1', engine='xlrd')
-            
-            logger.info(f"Файл успешно загружен. Строк: {len(self.df)}")
-            
-            # Проверяем необходимые колонки
-            required_columns = ['Статус', 'Серьезность', 'Активный этап', 'Сектор', 'Участок', 'Дней в работе']
-            missing_columns = [col for col in required_columns if col not in self.df.columns]
-            
-            if missing_columns:
-                raise ValueError(f"Отсутствуют обязательные колонки: {missing_columns}")
+            # clean_data меняет колонки, кэшированный кадр остается нетронутым
+            self.df = load_error_export(self.file_path).copy()
                 
         except Exception as e:
             logger.error(f"Ошибка загрузки файла: {str(e)}")
@@ -39,155 +530,510 @@ class ErrorAnalyzer:
         if self.df is None:
             return
         
-        # Заполнение пустых значений
+        # Значения для пустых ячеек текстовых полей
         fill_values = {
             'Серьезность': 'Не указана',
             'Статус': 'Не указан',
             'Активный этап': 'Не указан',
             'Сектор': 'Не указан',
-            'Участок': 'Не указан',
-            'Дней в работе': 0
+            'Участок': 'Не указан'
         }
         
-        for col, default_value in fill_values.items():
-            if col in self.df.columns:
-                self.df[col] = self.df[col].fillna(default_value)
-        
         # Стандартизация текстовых полей
-        text_columns = ['Статус', 'Активный этап', 'Сектор', 'Участок', 'Серьезность']
-        for col in text_columns:
+        for col, default_value in fill_values.items():
             if col in self.df.columns:
-                self.df[col] = self.df[col].astype(str).str.strip()
+                self.df[col] = normalize_text_column(self.df[col], default_value)
         
         # Обработка числовых полей
         if 'Дней в работе' in self.df.columns:
-            # Преобразуем в числовой формат, заменяем ошибки на 0
+            # Преобразуем в числовой формат, пустые значения и ошибки заменяем на 0
             self.df['Дней в работе'] = pd.to_numeric(self.df['Дней в работе'], errors='coerce').fillna(0)
+        
+        # Группа статуса считается один раз: все разбивки ниже - группировки по ней
+        group = self.df['Статус'].map(STATUS_GROUPS)
+        self.status_group = pd.Series(pd.Categorical(group, categories=STATUS_GROUP_NAMES),
+                                      index=self.df.index).fillna('other')
+        self.on_clarification = self.df['Активный этап'] == CLARIFICATION_STAGE
     
     def analyze_errors(self) -> Dict[str, Any]:
         """Основной анализ данных"""
         self.clean_data()
-        
-        analysis = {
-            'total_errors': len(self.df),
-            'successfully_closed': self._get_successfully_closed(),
-            'clarification_required': self._get_clarification_required(),
-            'closed_with_problems': self._get_closed_with_problems(),
-            'in_progress': self._get_in_progress(),
-            'seriousness_breakdown': self._get_seriousness_breakdown(),
-            'sector_top10': self._get_sector_top10(),
-            'area_top10': self._get_area_top10(),
-            'status_distribution': self._get_status_distribution(),
-            'deadline_violations_significant': self._get_deadline_violations_by_seriousness('Значительная'),
-            'deadline_violations_critical': self._get_deadline_violations_by_seriousness('Критическая')
-        }
-        
-        return analysis
+        single_group = pd.Categorical.from_codes(np.zeros(len(self.df), dtype=np.int64), categories=[0])
+        return self._analyze_groups(pd.Series(single_group, index=self.df.index))[0]
     
-    def _get_successfully_closed(self) -> int:
-        """Количество успешно закрытых ошибок"""
-        successful_statuses = ['Выполнение завершено успешно', 'Выполнение завершено успешно ']
-        return len(self.df[self.df['Статус'].isin(successful_statuses)])
+    def build_cube(self) -> ErrorCube:
+        """Агрегатный куб выгрузки (для фильтров и отчетов по срезам)"""
+        if self.status_group is None:
+            self.clean_data()
+        return ErrorCube.from_frame(self.df)
     
-    def _get_clarification_required(self) -> int:
-        """Количество ошибок на уточнении"""
-        clarification_stages = ['Уточнение', 'Уточнение ']
-        return len(self.df[self.df['Активный этап'].isin(clarification_stages)])
+    def analyze_errors_by(self, keys: pd.Series) -> Dict[Any, Dict[str, Any]]:
+        """Показатели analyze_errors для каждого значения keys (например, месяца выгрузки)"""
+        self.clean_data()
+        return self._analyze_groups(keys)
     
-    def _get_closed_with_problems(self) -> int:
-        """Количество ошибок закрытых с проблемами (исключая уточнение)"""
-        problem_statuses = ['Выполнение завершено с проблемами', 'Выполнение завершено с проблемами ']
-        clarification_stages = ['Уточнение', 'Уточнение ']
+    def _analyze_groups(self, keys: pd.Series) -> Dict[Any, Dict[str, Any]]:
+        """Каждый показатель - одна группировка по keys и колонкам показателя.
+
+        Группы возвращаются в порядке категорий keys (для категории, включая
+        пустые) или в порядке появления значений.
+        """
+        keys = keys.rename('_group')
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            groups = list(keys.cat.categories)
+        else:
+            groups = list(pd.unique(keys))
         
-        mask = (self.df['Статус'].isin(problem_statuses)) & \
-               (~self.df['Активный этап'].isin(clarification_stages))
-        return len(self.df[mask])
+        totals = keys.groupby(keys, observed=True).size()
+        
+        # Статусы × этап уточнения одним проходом
+        status_by_stage = self._count_by_status(keys, self.on_clarification).reindex(
+            pd.MultiIndex.from_product([groups, [False, True]]), fill_value=0)
+        seriousness = self._get_seriousness_breakdown(keys)
+        sector_top10 = self._get_top10_by_status(keys, 'Сектор')
+        area_top10 = self._get_top10_by_status(keys, 'Участок')
+        status_distribution = self._get_status_distribution(keys)
+        violations = self._get_deadline_violations(keys)
+        
+        result = {}
+        for group in groups:
+            stages = status_by_stage.loc[group]
+            result[group] = {
+                'total_errors': int(totals.get(group, 0)),
+                'successfully_closed': int(stages['successful'].sum()),
+                'clarification_required': int(stages.loc[True].sum()),
+                'closed_with_problems': int(stages.loc[False, 'with_problems']),
+                'in_progress': int(stages['in_progress'].sum()),
+                'seriousness_breakdown': seriousness.get(group, {}),
+                'sector_top10': sector_top10.get(group, {}),
+                'area_top10': area_top10.get(group, {}),
+                'status_distribution': status_distribution.get(group, {}),
+                **deadline_fields(violations[group]),
+            }
+        
+        return result
+    
+    def _count_by_status(self, *keys: pd.Series) -> pd.DataFrame:
+        """Число строк по сочетаниям keys × группам статусов (одна группировка)"""
+        counts = self.status_group.groupby([*keys, self.status_group], observed=True).size()
+        table = counts.unstack(fill_value=0)
+        return table.reindex(columns=STATUS_GROUP_NAMES, fill_value=0)
+    
+    @staticmethod
+    def _first_rows(keys: pd.Series, values: pd.Series) -> pd.Series:
+        """Номер первой строки каждого сочетания (группа, значение).
+
+        При равных счетчиках значения идут в порядке появления в своей группе,
+        поэтому месяц в тренде упорядочен так же, как при анализе одного файла.
+        """
+        rows = pd.Series(np.arange(len(values)), index=values.index)
+        return rows.groupby([keys, values], observed=True).min()
     
-    def _get_in_progress(self) -> int:
-        """Количество ошибок в работе"""
-        in_progress_statuses = ['ВОбработке', 'ВОбработке ']
-        return len(self.df[self.df['Статус'].isin(in_progress_statuses)])
+    def _split_counts(self, keys: pd.Series, values: pd.Series) -> Dict[Any, Dict[str, int]]:
+        """{группа: {значение: число строк}} по убыванию числа строк"""
+        table = pd.DataFrame({
+            'count': values.groupby([keys, values], observed=True).size(),
+            'first': self._first_rows(keys, values),
+        })
+        result = {}
+        for group, part in table[table['count'] > 0].groupby(level=0, sort=False):
+            part = part.droplevel(0).sort_values(['count', 'first'], ascending=[False, True])
+            result[group] = {key: int(value) for key, value in part['count'].items()}
+        return result
     
-    def _get_seriousness_breakdown(self) -> Dict[str, int]:
+    def _get_seriousness_breakdown(self, keys: pd.Series) -> Dict[Any, Dict[str, int]]:
         """Распределение серьезности для успешно закрытых"""
-        successful_statuses = ['Выполнение завершено успешно', 'Выполнение завершено успешно ']
-        successful = self.df[self.df['Статус'].isin(successful_statuses)]
+        if 'Серьезность' not in self.df.columns:
+            return {}
         
-        if 'Серьезность' in successful.columns:
-            return successful['Серьезность'].value_counts().to_dict()
-        return {}
+        successful = self.status_group == 'successful'
+        return self._split_counts(keys[successful], self.df.loc[successful, 'Серьезность'])
     
-    def _get_sector_top10(self) -> Dict[str, Dict[str, int]]:
-        """ТОП-10 секторов с разбивкой по статусам"""
-        sector_stats = {}
+    def _get_top10_by_status(self, keys: pd.Series, column: str) -> Dict[Any, Dict[str, Dict[str, int]]]:
+        """ТОП-10 значений колонки (сектор, участок) с разбивкой по статусам"""
+        if column not in self.df.columns:
+            return {}
         
-        if 'Сектор' not in self.df.columns:
-            return sector_stats
-            
-        top_sectors = self.df['Сектор'].value_counts().head(10).index
+        table = self._count_by_status(keys, self.df[column])
+        table['total'] = table.sum(axis=1)
+        table['first'] = self._first_rows(keys, self.df[column])
+        table = table[table['total'] > 0]
         
-        for sector in top_sectors:
-            sector_data = self.df[self.df['Сектор'] == sector]
-            
-            sector_stats[sector] = {
-                'total': len(sector_data),
-                'successful': len(sector_data[sector_data['Статус'].isin(['Выполнение завершено успешно', 'Выполнение завершено успешно '])]),
-                'with_problems': len(sector_data[sector_data['Статус'].isin(['Выполнение завершено с проблемами', 'Выполнение завершено с проблемами '])]),
-                'in_progress': len(sector_data[sector_data['Статус'].isin(['ВОбработке', 'ВОбработке '])])
+        result = {}
+        for group, part in table.groupby(level=0, sort=False):
+            top = part.droplevel(0).sort_values(['total', 'first'], ascending=[False, True]).head(10)
+            result[group] = {
+                key: {
+                    'total': int(row['total']),
+                    'successful': int(row['successful']),
+                    'with_problems': int(row['with_problems']),
+                    'in_progress': int(row['in_progress'])
+                }
+                for key, row in top.iterrows()
             }
+        return result
+    
+    def _get_status_distribution(self, keys: pd.Series) -> Dict[Any, Dict[str, int]]:
+        """Общее распределение по статусам"""
+        if 'Статус' in self.df.columns:
+            return self._split_counts(keys, self.df['Статус'])
+        return {}
+    
+    def _get_deadline_violations(self, keys: pd.Series) -> Dict[Any, Dict[str, Dict[str, int]]]:
+        """Статистика нарушений сроков (дней в работе > срока) по серьезности из таблицы SLA"""
+        limits = self.sla_limits
+        result = defaultdict(lambda: {seriousness: {'total': 0, 'violations': 0} for seriousness in limits})
+        
+        if 'Дней в работе' not in self.df.columns or 'Серьезность' not in self.df.columns:
+            return result
+        
+        seriousness = self.df['Серьезность'].astype(object)
+        deadline = seriousness.map(limits)
+        tracked = deadline.notna()
+        if not tracked.any():
+            return result
         
-        return sector_stats
+        overdue = self.df['Дней в работе'][tracked] > deadline[tracked]
+        stats = overdue.groupby([keys[tracked], seriousness[tracked]], observed=True).agg(['size', 'sum'])
+        for (group, key), row in stats.iterrows():
+            result[group][key] = {'total': int(row['size']), 'violations': int(row['sum'])}
+        
+        return result
+
+# Выгрузки .xlsx от этого размера анализируются потоково, без DataFrame
+STREAMING_MIN_FILE_SIZE = 20 * 1024 * 1024
+
+class ErrorExportAggregator:
+    """Потоковый анализ выгрузки: openpyxl read_only, только нужные колонки.
+
+    Строки листа читаются по одной, и сразу обновляются счетчики - память
+    зависит от числа различных секторов и участков, а не от числа строк.
+    Результат result() совпадает с ErrorAnalyzer.analyze_errors(), включая
+    порядок значений при равных счетчиках (порядок первого появления).
+    """
+    
+    FILL_VALUES = {
+        'Серьезность': 'Не указана',
+        'Статус': 'Не указан',
+        'Активный этап': 'Не указан',
+        'Сектор': 'Не указан',
+        'Участок': 'Не указан'
+    }
+    STATUS_INDEX = {name: i for i, name in enumerate(STATUS_GROUP_NAMES)}
+    # Предел числа ячеек куба: при большем разнообразии фильтры недоступны
+    MAX_CUBE_CELLS = 200000
+    
+    def __init__(self, sla_limits: Optional[Dict[str, float]] = None):
+        self.sla_limits = DEADLINE_DAYS if sla_limits is None else sla_limits
+        self.total = 0
+        # (группа статуса, этап уточнения) -> число строк
+        self.status_by_stage: Dict[Tuple[str, bool], int] = {}
+        # Значение -> счетчики по STATUS_GROUP_NAMES; порядок ключей - порядок появления
+        self.sectors: Dict[str, List[int]] = {}
+        self.areas: Dict[str, List[int]] = {}
+        self.statuses: Dict[str, int] = {}
+        self.successful_seriousness: Dict[str, int] = {}
+        self.deadlines = {seriousness: {'total': 0, 'violations': 0} for seriousness in self.sla_limits}
+        # Ячейки ErrorCube: (значения TEXT_COLUMNS..., дни) -> [число строк, первая строка]
+        self.cells: Optional[Dict[tuple, List[int]]] = {}
+        self.logger = logging.getLogger(__name__)
     
-    def _get_area_top10(self) -> Dict[str, Dict[str, int]]:
-        """ТОП-10 участков с разбивка по статусам"""
-        area_stats = {}
+    @staticmethod
+    def _text(value, default: str) -> str:
+        if value is None or value != value:  # пустая ячейка или NaN
+            return default
+        return str(value).strip()
+    
+    @staticmethod
+    def _days(value) -> float:
+        """Как pd.to_numeric(errors='coerce').fillna(0)"""
+        if isinstance(value, bool):
+            return float(value)
+        if isinstance(value, (int, float)):
+            return value if value == value else 0
+        try:
+            number = float(str(value).strip())
+        except (TypeError, ValueError):
+            return 0
+        return number if number == number else 0
+    
+    def add_row(self, status, seriousness, stage, sector, area, days):
+        """Учет одной строки выгрузки (значения ячеек как есть)"""
+        fill = self.FILL_VALUES
+        status = self._text(status, fill['Статус'])
+        seriousness = self._text(seriousness, fill['Серьезность'])
+        sector = self._text(sector, fill['Сектор'])
+        area = self._text(area, fill['Участок'])
+        stage = self._text(stage, fill['Активный этап'])
+        days = self._days(days)
         
-        if 'Участок' not in self.df.columns:
-            return area_stats
-            
-        top_areas = self.df['Участок'].value_counts().head(10).index
+        if self.cells is not None:
+            self._add_cell((status, seriousness, stage, sector, area, days))
+        
+        group = STATUS_GROUPS.get(status, 'other')
+        index = self.STATUS_INDEX[group]
+        key = (group, stage == CLARIFICATION_STAGE)
+        
+        self.total += 1
+        self.status_by_stage[key] = self.status_by_stage.get(key, 0) + 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        
+        counts = self.sectors.get(sector)
+        if counts is None:
+            counts = self.sectors[sector] = [0] * len(STATUS_GROUP_NAMES)
+        counts[index] += 1
+        
+        counts = self.areas.get(area)
+        if counts is None:
+            counts = self.areas[area] = [0] * len(STATUS_GROUP_NAMES)
+        counts[index] += 1
+        
+        if group == 'successful':
+            self.successful_seriousness[seriousness] = self.successful_seriousness.get(seriousness, 0) + 1
+        
+        deadline = self.sla_limits.get(seriousness)
+        if deadline is not None:
+            stats = self.deadlines[seriousness]
+            stats['total'] += 1
+            if days > deadline:
+                stats['violations'] += 1
+    
+    def _add_cell(self, key: tuple):
+        cell = self.cells.get(key)
+        if cell is not None:
+            cell[0] += 1
+        elif len(self.cells) < self.MAX_CUBE_CELLS:
+            self.cells[key] = [1, self.total]
+        else:
+            self.logger.warning(f"Куб выгрузки превысил {self.MAX_CUBE_CELLS} ячеек, фильтры недоступны")
+            self.cells = None
+    
+    def cube(self) -> Optional[ErrorCube]:
+        """Агрегатный куб прочитанных строк (None, если ячеек слишком много)"""
+        if self.cells is None:
+            return None
+        return ErrorCube.from_cells(self.cells)
+    
+    def read_file(self, file_path: str, sheet_name: str = 'Лист1'):
+        """Потоковое чтение листа выгрузки"""
+        from openpyxl import load_workbook
         
-        for area in top_areas:
-            area_data = self.df[self.df['Участок'] == area]
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook[sheet_name]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            positions = {}
+            for i, name in enumerate(header):
+                if name in REQUIRED_COLUMNS and name not in positions:
+                    positions[name] = i
             
-            area_stats[area] = {
-                'total': len(area_data),
-                'successful': len(area_data[area_data['Статус'].isin(['Выполнение завершено успешно', 'Выполнение завершено успешно '])]),
-                'with_problems': len(area_data[area_data['Статус'].isin(['Выполнение завершено с проблемами', 'Выполнение завершено с проблемами '])]),
-                'in_progress': len(area_data[area_data['Статус'].isin(['ВОбработке', 'ВОбработке '])])
-            }
+            missing_columns = [col for col in REQUIRED_COLUMNS if col not in positions]
+            if missing_columns:
+                raise ValueError(f"Отсутствуют обязательные колонки: {missing_columns}")
+            
+            indexes = [positions[col] for col in REQUIRED_COLUMNS]
+            empty_row = [None] * len(indexes)
+            add_row = self.add_row
+            blank_rows = 0
+            for row in sheet.iter_rows(min_row=2, values_only=True):
+                # Как pandas: пустые строки в конце листа отбрасываются, внутри - считаются
+                if all(cell is None for cell in row):
+                    blank_rows += 1
+                    continue
+                for _ in range(blank_rows):
+                    add_row(*empty_row)
+                blank_rows = 0
+                add_row(*[row[i] if i < len(row) else None for i in indexes])
+        finally:
+            workbook.close()
         
-        return area_stats
+        self.logger.info(f"Файл {os.path.basename(file_path)} обработан потоково. Строк: {self.total}")
     
-    def _get_status_distribution(self) -> Dict[str, int]:
-        """Общее распределение по статусам"""
-        if 'Статус' in self.df.columns:
-            return self.df['Статус'].value_counts().to_dict()
-        return {}
+    def _top10(self, table: Dict[str, List[int]]) -> Dict[str, Dict[str, int]]:
+        top = sorted(table.items(), key=lambda item: -sum(item[1]))[:10]
+        return {
+            key: {
+                'total': sum(counts),
+                'successful': counts[self.STATUS_INDEX['successful']],
+                'with_problems': counts[self.STATUS_INDEX['with_problems']],
+                'in_progress': counts[self.STATUS_INDEX['in_progress']]
+            }
+            for key, counts in top
+        }
     
-    def _get_deadline_violations_by_seriousness(self, seriousness: str) -> Dict[str, int]:
-        """Статистика нарушений сроков по серьезности"""
-        if 'Дней в работе' not in self.df.columns or 'Серьезность' not in self.df.columns:
-            return {'total': 0, 'violations': 0}
+    @staticmethod
+    def _sorted_counts(counts: Dict[str, int]) -> Dict[str, int]:
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+    
+    def result(self) -> Dict[str, Any]:
+        """Результат в формате ErrorAnalyzer.analyze_errors()"""
+        by_stage = self.status_by_stage
         
-        # Определяем лимит дней в зависимости от серьезности
-        if seriousness == 'Значительная':
-            deadline_days = 14
-        elif seriousness == 'Критическая':
-            deadline_days = 1
-        else:
-            return {'total': 0, 'violations': 0}
+        def count(group: str, stage: Optional[bool] = None) -> int:
+            return sum(value for (g, s), value in by_stage.items() if g == group and stage in (None, s))
         
-        # Фильтруем ошибки по серьезности
-        seriousness_data = self.df[self.df['Серьезность'] == seriousness]
+        return {
+            'total_errors': self.total,
+            'successfully_closed': count('successful'),
+            'clarification_required': sum(value for (_, stage), value in by_stage.items() if stage),
+            'closed_with_problems': count('with_problems', False),
+            'in_progress': count('in_progress'),
+            'seriousness_breakdown': self._sorted_counts(self.successful_seriousness),
+            'sector_top10': self._top10(self.sectors),
+            'area_top10': self._top10(self.areas),
+            'status_distribution': self._sorted_counts(self.statuses),
+            **deadline_fields({key: dict(value) for key, value in self.deadlines.items()}),
+        }
+
+def analyze_error_export(file_path: str, sla_limits: Optional[Dict[str, float]] = None
+                         ) -> Tuple[Dict[str, Any], Optional[ErrorCube]]:
+    """Анализ одной выгрузки и ее куб.
+
+    Большие .xlsx без кэша обрабатываются потоково, остальные - через ErrorAnalyzer.
+    """
+    is_large_xlsx = (file_path.lower().endswith(('.xlsx', '.xlsm')) and
+                     os.path.getsize(file_path) >= STREAMING_MIN_FILE_SIZE)
+    if is_large_xlsx and error_frame_cache.get(file_fingerprint(file_path)) is None:
+        aggregator = ErrorExportAggregator(sla_limits)
+        aggregator.read_file(file_path)
+        return aggregator.result(), aggregator.cube()
+    
+    analyzer = ErrorAnalyzer(file_path, sla_limits=sla_limits)
+    analysis = analyzer.analyze_errors()
+    return analysis, analyzer.build_cube()
+
+class TrendAnalyzer:
+    """Тренд показателей ErrorAnalyzer по месячным выгрузкам.
+
+    Выгрузки загружаются параллельно (через кэш выгрузок), склеиваются в один
+    кадр с колонкой месяца, и все показатели считаются по месяцам одним
+    сгруппированным проходом.
+    """
+    
+    TREND_TOP = 10
+    
+    def __init__(self, exports: Dict[str, str], sla_limits: Optional[Dict[str, float]] = None):
+        # Подпись месяца -> путь к выгрузке, в порядке отчета
+        self.exports = exports
+        self.sla_limits = sla_limits
+        self.logger = logging.getLogger(__name__)
+    
+    def analyze(self) -> Dict[str, Any]:
+        months = list(self.exports)
+        frames = load_error_exports(list(self.exports.values()))
         
-        if len(seriousness_data) == 0:
-            return {'total': 0, 'violations': 0}
+        month_codes = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+        df = pd.concat(frames, ignore_index=True)
+        month_keys = pd.Series(pd.Categorical.from_codes(month_codes, categories=months), index=df.index)
         
-        # Считаем нарушения сроков (дней в работе > лимита)
-        violations = len(seriousness_data[seriousness_data['Дней в работе'] > deadline_days])
+        analyzer = ErrorAnalyzer(frame=df, sla_limits=self.sla_limits)
+        by_month = analyzer.analyze_errors_by(month_keys)
+        self.logger.info(f"Тренд построен: месяцев {len(months)}, строк {len(df)}")
         
         return {
-            'total': len(seriousness_data),
-            'violations': violations
-        }
\ No newline at end of file
+            'months': months,
+            'by_month': by_month,
+            'total_errors': len(df),
+            'sla_limits': dict(analyzer.sla_limits),
+            'sector_trend': self._get_trend(analyzer, month_keys, 'Сектор'),
+            'area_trend': self._get_trend(analyzer, month_keys, 'Участок'),
+        }
+    
+    def _get_trend(self, analyzer: ErrorAnalyzer, month_keys: pd.Series, column: str) -> Dict[str, List[int]]:
+        """Число ошибок по месяцам для ТОП значений колонки за весь период"""
+        table = analyzer.df[column].groupby([analyzer.df[column], month_keys], observed=True).size()
+        table = table.unstack(fill_value=0).reindex(columns=month_keys.cat.categories, fill_value=0)
+        totals = table.sum(axis=1)
+        top = totals[totals > 0].sort_values(ascending=False, kind='stable').head(self.TREND_TOP).index
+        return {key: [int(value) for value in table.loc[key]] for key in top}
+
+def analyze_department_export(file_path: str, sla_limits: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Анализ выгрузки отдела для сравнения (выполняется в пуле процессов)"""
+    analysis, cube = analyze_error_export(file_path, sla_limits)
+    return cube.analysis(sla_limits) if cube is not None else analysis
+
+class DepartmentComparison:
+    """Сравнение отделов: по одной выгрузке на отдел за один период.
+
+    Выгрузки анализируются параллельно в пуле процессов (каждая - тем же
+    путем, что и одиночный анализ, с общей таблицей SLA). Для сравнения
+    показатели приводятся к общей базе: доли от числа ошибок отдела, доля
+    отдела в общем числе ошибок и объединенный список серьезностей.
+    """
+    
+    RATE_METRICS = ['successfully_closed', 'clarification_required', 'closed_with_problems', 'in_progress']
+    
+    def __init__(self, exports: Dict[str, str], sla_limits: Optional[Dict[str, float]] = None,
+                 max_workers: Optional[int] = None):
+        # Отдел -> путь к выгрузке, в порядке отчета
+        self.exports = exports
+        self.sla_limits = DEADLINE_DAYS if sla_limits is None else sla_limits
+        self.max_workers = max_workers
+        self.logger = logging.getLogger(__name__)
+    
+    def analyze(self) -> Dict[str, Any]:
+        departments = list(self.exports)
+        analyses = dict(zip(departments, self._analyze_all([self.exports[name] for name in departments])))
+        total = sum(analysis['total_errors'] for analysis in analyses.values())
+        self.logger.info(f"Сравнение отделов: {len(departments)}, всего ошибок {total}")
+        
+        return {
+            'departments': departments,
+            'by_department': analyses,
+            'total_errors': total,
+            'sla_limits': dict(self.sla_limits),
+            'normalized': self._normalize(analyses, total),
+        }
+    
+    def _analyze_all(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        if len(file_paths) <= 1:
+            return [analyze_department_export(path, self.sla_limits) for path in file_paths]
+        
+        workers = min(len(file_paths), self.max_workers or os.cpu_count() or 1)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(analyze_department_export, path, self.sla_limits) for path in file_paths]
+                return [future.result() for future in futures]
+        except (OSError, BrokenProcessPool) as e:
+            self.logger.warning(f"Пул процессов недоступен, последовательный анализ отделов: {e}")
+            return [analyze_department_export(path, self.sla_limits) for path in file_paths]
+    
+    def _normalize(self, analyses: Dict[str, Dict[str, Any]], total: int) -> Dict[str, Any]:
+        """Показатели отделов в общей базе (проценты)"""
+        def percent(part: float, whole: float) -> float:
+            return part / whole * 100 if whole else 0.0
+        
+        average = total / len(analyses) if analyses else 0
+        rates = {}
+        for name, analysis in analyses.items():
+            department_total = analysis['total_errors']
+            rates[name] = {metric: percent(analysis[metric], department_total) for metric in self.RATE_METRICS}
+            rates[name]['share_of_total'] = percent(department_total, total)
+            rates[name]['load_index'] = department_total / average if average else 0.0
+        
+        # Серьезности всех отделов в одном порядке: по общему числу ошибок
+        seriousness_totals: Dict[str, int] = {}
+        for analysis in analyses.values():
+            for seriousness, row in analysis.get('sla', {}).get('by_seriousness', {}).items():
+                seriousness_totals[seriousness] = seriousness_totals.get(seriousness, 0) + row['total']
+        seriousness_order = [name for name, _ in sorted(seriousness_totals.items(), key=lambda item: -item[1])]
+        
+        seriousness = {}
+        for name, analysis in analyses.items():
+            rows = analysis.get('sla', {}).get('by_seriousness', {})
+            seriousness[name] = {}
+            for key in seriousness_order:
+                row = rows.get(key)
+                if row is None:
+                    seriousness[name][key] = None
+                    continue
+                seriousness[name][key] = {
+                    'share': percent(row['total'], analysis['total_errors']),
+                    'violation_rate': percent(row['violations'], row['tracked']) if row['limit'] is not None else None,
+                    'p50': row['p50'],
+                    'p90': row['p90'],
+                }
+        
+        return {'rates': rates, 'seriousness_order': seriousness_order, 'seriousness': seriousness}
+
@@ -3,20 +3,44 @@
 Анализатор базовых механизмов (журналы ОС Windows) - УЛУЧШЕННАЯ ВЕРСИЯ
 """
 
+import io
 import os
 import re
+import hashlib
 import logging
+import threading
 import tempfile
 import zipfile
 import struct
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Set, Iterable
+from collections import OrderedDict, Counter
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from evtx_reader import (EvtxRecord, EvtxFormatError, read_records_concurrently, make_time_window,
+                         scan_records, FILE_MAGIC, CHUNK_MAGIC, RECORD_MAGIC,
+                         FILE_HEADER_SIZE, CHUNK_SIZE, CHUNK_HEADER_SIZE)
+
+try:
+    from lxml import etree as _xml_etree
+except ImportError:
+    _xml_etree = ET
 
 logger = logging.getLogger(__name__)
 
+# Форматы времени событий в XML и текстовых выгрузках журналов
+_EVENT_TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%d.%m.%Y %H:%M:%S",
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y-%m-%d",
+    "%d.%m.%Y",
+)
+
 @dataclass
 class OSEvent:
     """Событие ОС Windows"""
@@ -25,7 +49,7 @@ class OSEvent:
     event_code: str
     source: str
     description: str
-    log_type: str  # Application или System
+    log_type: str  # Канал журнала: Application, System, Setup, ...
     
     def to_table_row(self) -> List[str]:
         """Преобразование в строку таблицы"""
@@ -37,9 +61,307 @@ class OSEvent:
             self.log_type
         ]
 
+# Числовые уровни событий по тексту уровня
+_LEVEL_NUMBERS = {
+    "Критическое": 1,
+    "Ошибка": 2,
+    "Предупреждение": 3,
+    "Информация": 4,
+    "Подробно": 5
+}
+
+# Названия основных журналов для отчета и переключателя
+CHANNEL_TITLES = {
+    "Application": "Журнал приложения",
+    "System": "Журнал системы",
+    "Setup": "Журнал установки",
+    "Security": "Журнал безопасности",
+}
+
+def journal_title(channel: str) -> str:
+    """Название журнала для отображения"""
+    return CHANNEL_TITLES.get(channel, channel)
+
+def journal_name_from_path(path: Path) -> str:
+    """Канал журнала по имени файла (Microsoft-Windows-PowerShell%4Operational.evtx)"""
+    return path.stem.replace('%4', '/')
+
+def _journal_order(channel: str):
+    """Порядок журналов: сначала основные, затем по алфавиту"""
+    titles = list(CHANNEL_TITLES)
+    return (titles.index(channel) if channel in titles else len(titles), channel.lower())
+
+def _looks_like_binary_evtx(head: bytes) -> bool:
+    """Бинарный журнал (в т.ч. с поврежденным заголовком) по первым байтам файла"""
+    return head.startswith(FILE_MAGIC) or CHUNK_MAGIC in head or RECORD_MAGIC in head
+
+def _local_name(tag) -> str:
+    """Имя тега без пространства имен"""
+    return tag.rpartition('}')[2] if isinstance(tag, str) else ""
+
+def _detect_text_encoding(file_path: str) -> str:
+    """Кодировка текстовой выгрузки журнала по BOM"""
+    with open(file_path, 'rb') as f:
+        bom = f.read(4)
+    if bom.startswith(b'\xff\xfe') or bom.startswith(b'\xfe\xff'):
+        return 'utf-16'
+    if bom.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    return 'utf-8'
+
+def _strip_xml_declaration(text: str) -> str:
+    """Начало XML без BOM и объявления <?xml ...?> (XMLPullParser принимает строки без него)"""
+    text = text.lstrip('\ufeff \t\r\n')
+    if text.startswith('<?xml'):
+        end = text.find('?>')
+        if end != -1:
+            text = text[end + 2:].lstrip()
+    return text
+
+# Размер начального и конечного блоков, по которым считается отпечаток текстовых выгрузок
+_FINGERPRINT_BLOCK = 64 * 1024
+
+def journal_fingerprint(file_path: str) -> str:
+    """Отпечаток журнала без чтения всего файла (не зависит от пути распаковки).
+
+    Размер, время изменения (при распаковке берется из архива) и хэш
+    заголовков: у EVTX - заголовок файла (номер следующей записи, число
+    чанков) и заголовки первого и последнего чанка (диапазоны номеров записей
+    и CRC32 данных чанка), у текстовых и XML-выгрузок - первый и последний
+    блоки по 64 КБ.
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        head = f.read(max(FILE_HEADER_SIZE + CHUNK_HEADER_SIZE, _FINGERPRINT_BLOCK))
+        if head.startswith(FILE_MAGIC) and len(head) >= FILE_HEADER_SIZE + CHUNK_HEADER_SIZE:
+            digest.update(head[:FILE_HEADER_SIZE + CHUNK_HEADER_SIZE])
+            # Номер последнего чанка из заголовка файла, в пределах размера файла
+            last_chunk = struct.unpack_from('<Q', head, 0x10)[0]
+            last_chunk = min(last_chunk, (stat.st_size - FILE_HEADER_SIZE) // CHUNK_SIZE - 1)
+            if last_chunk > 0:
+                f.seek(FILE_HEADER_SIZE + last_chunk * CHUNK_SIZE)
+                digest.update(f.read(CHUNK_HEADER_SIZE))
+        else:
+            digest.update(head)
+            if stat.st_size > len(head):
+                f.seek(max(len(head), stat.st_size - _FINGERPRINT_BLOCK))
+                digest.update(f.read())
+    return f"{stat.st_size}-{stat.st_mtime_ns}-{digest.hexdigest()}"
+
+# Коды событий загрузки и сбоев: 6005/6006 - запуск и остановка службы журнала,
+# 6008 - неожиданное завершение, 41 - Kernel-Power, 1001 - BugCheck
+REBOOT_EVENT_CODES = {"41", "6005", "6006", "6008", "1001"}
+# Источники, от которых эти коды относятся к перезагрузкам
+_REBOOT_SOURCES = ("EventLog", "Kernel-Power", "BugCheck", "SystemErrorReporting")
+# Записи о сбое, сделанные в пределах этого интервала от запуска, относятся к этой загрузке
+_BOOT_REPORT_WINDOW = timedelta(minutes=10)
+# Насколько раньше интервала анализа ищется завершение работы перед загрузкой
+_SHUTDOWN_LOOKBEHIND = timedelta(days=1)
+_REBOOT_CAUSES = {
+    "41": "Kernel-Power 41",
+    "6008": "неожиданное завершение",
+    "1001": "BugCheck",
+}
+
+def parse_event_time(timestamp: str) -> Optional[datetime]:
+    """Время события из XML или текстовой выгрузки (None - не распознано)"""
+    text = (timestamp or "").strip().replace('T', ' ')
+    for time_format in _EVENT_TIME_FORMATS:
+        # Отбрасываем дробную часть секунд и часовой пояс
+        for candidate in (text[:19], text[:22], text[:10]):
+            try:
+                return datetime.strptime(candidate, time_format)
+            except ValueError:
+                continue
+    return None
+
+def utc_to_local(moment: datetime) -> datetime:
+    """Время UTC без часового пояса (EVTX, SystemTime) в местное время без часового пояса"""
+    try:
+        return moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    except (OverflowError, OSError, ValueError):
+        return moment
+
+def local_to_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Местное время без часового пояса в UTC без часового пояса (None остается None)"""
+    if moment is None:
+        return None
+    try:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    except (OverflowError, OSError, ValueError):
+        return moment
+
+def _event_hour(timestamp: str) -> str:
+    """Час события "YYYY-MM-DD HH" (без strptime для основного формата)"""
+    if len(timestamp) >= 13 and timestamp[4] == '-' and timestamp[10] == ' ':
+        return timestamp[:13]
+    moment = parse_event_time(timestamp)
+    return moment.strftime("%Y-%m-%d %H") if moment else "Неизвестно"
+
+@dataclass
+class RebootEntry:
+    """Загрузка системы по событиям журнала System"""
+    time: datetime                       # запуск (6005) или первая запись о сбое
+    shutdown: Optional[datetime] = None  # корректное завершение (6006) перед загрузкой
+    kind: str = "Без записи о завершении"
+    causes: List[str] = field(default_factory=list)
+    started: bool = False
+
+class OSEventStats:
+    """Сводка по событиям за один проход.
+
+    Счетчики по коду × источнику × часу, источникам и уровням; для ленты
+    перезагрузок хранятся только события с кодами REBOOT_EVENT_CODES (без
+    повторов из копий журнала), поэтому память не растет с числом событий.
+    Отметки перезагрузок принимаются и рядом с интервалом window (завершение
+    работы накануне), в ленту попадают загрузки внутри интервала. Сводки
+    журналов складываются merge.
+    """
+
+    def __init__(self, window: Tuple[Optional[datetime], Optional[datetime]] = (None, None)):
+        self.window = window
+        self.total = 0
+        self.by_code_source_hour: Counter = Counter()
+        self.by_source: Counter = Counter()
+        self.by_level: Counter = Counter()
+        self._reboot_markers: Set[Tuple[datetime, str]] = set()
+
+    def add(self, event: OSEvent):
+        self.total += 1
+        self.by_code_source_hour[(event.event_code, event.source, _event_hour(event.timestamp))] += 1
+        self.by_source[event.source] += 1
+        self.by_level[event.level] += 1
+        self.add_reboot_marker(event)
+
+    def add_reboot_marker(self, event: OSEvent):
+        """Учет события только для ленты перезагрузок"""
+        if event.event_code in REBOOT_EVENT_CODES and any(name in event.source for name in _REBOOT_SOURCES):
+            moment = parse_event_time(event.timestamp)
+            if moment is not None:
+                self._reboot_markers.add((moment, event.event_code))
+
+    def update(self, events: Iterable[OSEvent]) -> 'OSEventStats':
+        for event in events:
+            self.add(event)
+        return self
+
+    def merge(self, other: 'OSEventStats'):
+        self.total += other.total
+        self.by_code_source_hour.update(other.by_code_source_hour)
+        self.by_source.update(other.by_source)
+        self.by_level.update(other.by_level)
+        self._reboot_markers |= other._reboot_markers
+
+    def top_sources(self, count: int = 10) -> List[Tuple[str, int]]:
+        """Самые частые источники"""
+        return self.by_source.most_common(count)
+
+    def hot_spots(self, count: int = 10) -> List[Tuple[Tuple[str, str, str], int]]:
+        """Самые частые сочетания (код, источник, час)"""
+        return self.by_code_source_hour.most_common(count)
+
+    def reboot_timeline(self) -> List[RebootEntry]:
+        """Загрузки по порядку: плановые (6006 перед 6005) и после сбоя (41, 6008, 1001)"""
+        boots: List[RebootEntry] = []
+        current: Optional[RebootEntry] = None
+        shutdown = None
+
+        for moment, code in sorted(self._reboot_markers):
+            if code == "6006":
+                shutdown = moment
+                continue
+
+            if code == "6005":
+                if current is not None and not current.started and moment - current.time <= _BOOT_REPORT_WINDOW:
+                    # Запись о сбое сделана раньше запуска службы журнала
+                    current.time = moment
+                else:
+                    current = RebootEntry(time=moment)
+                    boots.append(current)
+                current.started = True
+                current.shutdown = shutdown
+                if shutdown is not None and not current.causes:
+                    current.kind = "Плановая"
+                shutdown = None
+                continue
+
+            if current is None or abs(moment - current.time) > _BOOT_REPORT_WINDOW:
+                current = RebootEntry(time=moment)
+                boots.append(current)
+            current.kind = "Сбой"
+            cause = _REBOOT_CAUSES[code]
+            if cause not in current.causes:
+                current.causes.append(cause)
+
+        start, end = self.window
+        return [boot for boot in boots
+                if (start is None or boot.time >= start) and (end is None or boot.time < end)]
+
+@dataclass
+class JournalCacheEntry:
+    """Разобранный журнал в кэше.
+
+    events содержит все события уровней CACHED_LEVELS и все события с кодами
+    из codes (codes = None - все события журнала); stats - сводка по событиям
+    постоянного отбора (STATS_SELECTION), не зависящая от codes.
+    """
+    events: List[OSEvent]
+    codes: Optional[Set[str]]
+    stats: OSEventStats = field(default_factory=OSEventStats)
+
+    def covers(self, codes: Optional[Set[str]]) -> bool:
+        if self.codes is None:
+            return True
+        return codes is not None and codes <= self.codes
+
+class JournalEventCache:
+    """Кэш разобранных журналов ОС по отпечатку файла и интервалу анализа.
+
+    Общий для всех анализаторов процесса: повторный анализ того же архива с
+    другим фильтром кодов не разбирает журналы заново.
+    """
+
+    MAX_ENTRIES = 32
+
+    def __init__(self):
+        self._entries: "OrderedDict[tuple, JournalCacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[JournalCacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: JournalCacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+journal_event_cache = JournalEventCache()
+
 class BasicMechanismsAnalyzer:
     """Анализатор базовых механизмов (журналы ОС Windows)"""
     
+    # Уровни, события которых кэшируются при любом фильтре кодов
+    CACHED_LEVELS = {1, 2, 3}
+    # Отбор событий для сводки (коды, уровни): не зависит от фильтра кодов
+    STATS_SELECTION = (frozenset(REBOOT_EVENT_CODES), frozenset(CACHED_LEVELS))
+    # Размер блока потокового чтения XML-выгрузок (символов)
+    XML_BLOCK_SIZE = 64 * 1024
+    # Расширения файлов журналов
+    JOURNAL_SUFFIXES = ('.evtx', '.evt')
+    # Число журналов, разбираемых одновременно
+    MAX_JOURNAL_THREADS = 8
+    
     def __init__(self):
         self.temp_dir = None
         self.logger = logging.getLogger(__name__)
@@ -48,15 +370,25 @@ class BasicMechanismsAnalyzer:
         self.default_patterns = ["41", "55", "98", "7031", "7001", "7000"]
         self.custom_patterns = []
         self.use_custom_patterns = False
+        # Интервал анализа [начало, конец) во времени журнала (UTC)
+        self.time_window: Tuple[Optional[datetime], Optional[datetime]] = (None, None)
+        # Отбор событий при разборе: (коды или None - все, уровни) и интервал разбора;
+        # свои у каждого потока, без них - по шаблонам и интервалу анализа
+        self._local = threading.local()
+        # Общий пул процессов на время analyze_os_logs
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Сводка и разобранные журналы последнего analyze_os_logs
+        self.event_stats = OSEventStats()
+        self.journal_entries: List[JournalCacheEntry] = []
         
         # Попробуем импортировать evtx если установлен
         self.has_evtx = False
         try:
             import Evtx.Evtx as evtx
             self.has_evtx = True
-            self.logger.info("Библиотека evtx доступна для парсинга бинарных EVTX")
+            self.logger.info("Библиотека evtx доступна для поврежденных EVTX")
         except ImportError:
-            self.logger.warning("Библиотека evtx не установлена, будет использован упрощенный парсинг")
+            self.logger.info("Библиотека evtx не установлена, поврежденные EVTX разбираются сканером записей")
     
     def set_custom_patterns(self, patterns_str: str):
         """Установка пользовательских шаблонов"""
@@ -69,6 +401,45 @@ class BasicMechanismsAnalyzer:
         self.use_custom_patterns = use_custom
         self.logger.info(f"Использование пользовательских шаблонов: {use_custom}")
     
+    def apply_pattern_settings(self, use_custom: bool, patterns_str: str):
+        """Настройки шаблона со страницы анализа: пустой шаблон - коды по умолчанию"""
+        use_custom = use_custom and bool(patterns_str.strip())
+        if use_custom:
+            self.set_custom_patterns(patterns_str)
+        self.set_use_custom_patterns(use_custom)
+    
+    def set_time_window(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Ограничение анализа интервалом [start, end)"""
+        self.time_window = (start, end)
+        self.logger.info(f"Интервал анализа журналов: {start} - {end}")
+
+    def set_analysis_date(self, analysis_date: str):
+        """Ограничение анализа местными сутками YYYY-MM-DD"""
+        start = datetime.strptime(analysis_date, "%Y-%m-%d")
+        self.set_time_window(start, start + timedelta(days=1))
+
+    def _parse_window(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Интервал (местное время), события которого отбираются при разборе"""
+        window = getattr(self._local, 'window', None)
+        return window if window is not None else self.time_window
+
+    def _parse_window_utc(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Интервал разбора в UTC - для времени из записей EVTX"""
+        start, end = self._parse_window()
+        return local_to_utc(start), local_to_utc(end)
+
+    def _in_time_window(self, timestamp: str,
+                        window: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None) -> bool:
+        """Попадает ли время события в интервал разбора (нераспознанное время не отсекается)"""
+        start, end = window if window is not None else self._parse_window()
+        if start is None and end is None:
+            return True
+
+        moment = parse_event_time(timestamp)
+        if moment is None:
+            return True
+        return (start is None or moment >= start) and (end is None or moment < end)
+
     def extract_archive(self, archive_path: str) -> Optional[str]:
         """Распаковка архива логов"""
         try:
@@ -76,6 +447,16 @@ class BasicMechanismsAnalyzer:
             
             with zipfile.ZipFile(archive_path, 'r') as zip_ref:
                 zip_ref.extractall(self.temp_dir)
+                # Время изменения из архива: по нему (с размером и заголовками)
+                # журналы узнаются в кэше при повторной распаковке
+                for member in zip_ref.infolist():
+                    if member.is_dir():
+                        continue
+                    try:
+                        modified = datetime(*member.date_time).timestamp()
+                        os.utime(os.path.join(self.temp_dir, member.filename), (modified, modified))
+                    except (OSError, ValueError, OverflowError):
+                        continue
             
             self.logger.info(f"Архив распакован в: {self.temp_dir}")
             return self.temp_dir
@@ -121,16 +502,15 @@ class BasicMechanismsAnalyzer:
         try:
             # Сначала пробуем определить тип файла
             with open(file_path, 'rb') as f:
-                header = f.read(8)
+                head = f.read(self.XML_BLOCK_SIZE)
                 
             # Проверяем сигнатуру EVTX файла
-            if header == b'ElfFile\x00':
+            if head.startswith(FILE_MAGIC):
                 # Бинарный EVTX файл
-                if self.has_evtx:
-                    events = self._parse_binary_evtx(file_path, log_type)
-                else:
-                    self.logger.warning(f"Бинарный EVTX файл обнаружен, но библиотека evtx не установлена")
-                    events = self._parse_evtx_as_text(file_path, log_type)
+                events = self._parse_binary_evtx(file_path, log_type)
+            elif _looks_like_binary_evtx(head):
+                # Записи EVTX без заголовка файла (поврежденный или вырезанный журнал)
+                events = self._scan_binary_evtx(file_path, log_type)
             else:
                 # Возможно, это XML или текстовый файл
                 events = self._parse_text_evtx(file_path, log_type)
@@ -143,17 +523,188 @@ class BasicMechanismsAnalyzer:
         return events
     
     def _parse_binary_evtx(self, file_path: str, log_type: str) -> List[OSEvent]:
-        """Парсинг бинарного EVTX файла с помощью библиотеки evtx"""
+        """Парсинг бинарного EVTX без построения XML.
+
+        Записи и целые чанки вне интервала анализа отсекаются по времени из
+        заголовка записи. EventID, уровень, время и источник берутся из массива
+        подстановок; данные события декодируются только для записей с подходящим
+        кодом. Чанки файла разбираются параллельно в пуле процессов. Если
+        структура файла не распознана, используется библиотека evtx или
+        сканер записей.
+        """
+        events = []
+
+        codes, levels = self._current_selection()
+        event_ids = {int(code) for code in codes if code.isdigit()} if codes is not None else None
+
+        try:
+            time_window = make_time_window(*self._parse_window_utc())
+            for record in read_records_concurrently(file_path, event_ids, time_window=time_window,
+                                                    levels=levels, executor=self._process_pool):
+                events.append(self._event_from_record(record, log_type))
+        except EvtxFormatError as e:
+            self.logger.warning(f"Не удалось прочитать {file_path} напрямую: {e}")
+            if self.has_evtx:
+                return self._parse_rendered_evtx(file_path, log_type)
+            return self._scan_binary_evtx(file_path, log_type)
+
+        return events
+
+    def _scan_binary_evtx(self, file_path: str, log_type: str) -> List[OSEvent]:
+        """Разбор бинарного журнала поиском записей по сигнатуре (без заголовков файла и чанков)"""
+        events = []
+
+        codes, levels = self._current_selection()
+        event_ids = {int(code) for code in codes if code.isdigit()} if codes is not None else None
+
+        try:
+            time_window = make_time_window(*self._parse_window_utc())
+            for record in scan_records(file_path, event_ids, time_window=time_window, levels=levels):
+                events.append(self._event_from_record(record, log_type))
+            self.logger.info(f"Сканер записей: {len(events)} событий в {file_path}")
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Ошибка сканирования бинарного журнала {file_path}: {e}")
+
+        return events
+
+    def _event_from_record(self, record: EvtxRecord, log_type: str) -> OSEvent:
+        """Создание OSEvent из записи EVTX (время записи в UTC переводится в местное)"""
+        timestamp = record.timestamp
+        descriptions = [value.strip() for value in record.data if value and value.strip()]
+
+        return OSEvent(
+            timestamp=utc_to_local(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else "Неизвестно",
+            level=self._convert_event_level(record.level),
+            event_code=str(record.event_id),
+            source=record.provider or "Неизвестно",
+            description=" | ".join(descriptions),
+            log_type=record.channel or log_type
+        )
+
+    def _pattern_codes(self) -> Optional[Set[str]]:
+        """Коды событий фильтра (None - без фильтра)"""
+        if self.use_custom_patterns and self.custom_patterns:
+            return set(self.custom_patterns)
+        if not self.use_custom_patterns:
+            return set(self.default_patterns)
+        return None
+
+    def _pattern_event_ids(self) -> Optional[set]:
+        """Коды событий фильтра в виде чисел (None - без фильтра)"""
+        codes = self._pattern_codes()
+        if codes is None:
+            return None
+        return {int(p) for p in codes if p.isdigit()}
+
+    def _current_selection(self) -> Tuple[Optional[Set[str]], Optional[Set[int]]]:
+        selection = getattr(self._local, 'selection', None)
+        if selection is not None:
+            return selection
+        return self._pattern_codes(), None
+
+    def _selected(self, event_code: str, level_num: int) -> bool:
+        """Отбирается ли событие при разборе"""
+        codes, levels = self._current_selection()
+        if codes is None:
+            return True
+        return event_code in codes or (levels is not None and level_num in levels)
+
+    def load_journal_events(self, file_path: str, log_type: str) -> List[OSEvent]:
+        """События журнала по текущему фильтру кодов через кэш разобранных журналов"""
+        entry = self.load_journal(file_path, log_type)
+        if entry is None:
+            return []
+        return self.filter_events(entry.events, codes=self._pattern_codes())
+
+    def load_journal(self, file_path: str, log_type: str) -> Optional[JournalCacheEntry]:
+        """Разобранный журнал из кэша или после разбора файла.
+
+        При первом разборе в кэш попадают все события уровней CACHED_LEVELS и
+        все события с кодами фильтра, кодами по умолчанию и кодами перезагрузок.
+        Сводка считается по событиям STATS_SELECTION, поэтому не зависит от
+        фильтра кодов и истории кэша; журнал разбирается с запасом перед
+        интервалом анализа, чтобы завершение работы накануне попало в ленту
+        перезагрузок. Запрос с кодами, которые кэш уже покрывает, выполняется
+        без разбора файла.
+        """
+        codes = self._pattern_codes()
+
+        try:
+            key = (journal_fingerprint(file_path), self.time_window, self.STATS_SELECTION)
+        except OSError as e:
+            self.logger.error(f"Не удалось прочитать журнал {file_path}: {e}")
+            return None
+
+        entry = journal_event_cache.get(key)
+        if entry is None or not entry.covers(codes):
+            if codes is None:
+                cached_codes = None
+            else:
+                cached_codes = codes | set(self.default_patterns) | REBOOT_EVENT_CODES | \
+                    (entry.codes if entry else set())
+
+            start, end = self.time_window
+            parse_window = (start - _SHUTDOWN_LOOKBEHIND if start is not None else None,
+                            end + _BOOT_REPORT_WINDOW if end is not None else None)
+
+            self._local.selection = (cached_codes, self.CACHED_LEVELS if cached_codes is not None else None)
+            self._local.window = parse_window
+            try:
+                parsed = self.parse_evtx_file(file_path, log_type)
+            finally:
+                self._local.selection = None
+                self._local.window = None
+
+            widened = parse_window != self.time_window
+            events = []
+            stats = OSEventStats(self.time_window)
+            stats_codes, stats_levels = self.STATS_SELECTION
+            stats_level_names = {self._convert_event_level(level) for level in stats_levels}
+            for event in parsed:
+                if widened and not self._in_time_window(event.timestamp, self.time_window):
+                    stats.add_reboot_marker(event)
+                    continue
+                events.append(event)
+                if event.event_code in stats_codes or event.level in stats_level_names:
+                    stats.add(event)
+
+            entry = JournalCacheEntry(events, cached_codes, stats)
+            journal_event_cache.put(key, entry)
+        else:
+            self.logger.info(f"Журнал {file_path} взят из кэша ({len(entry.events)} событий)")
+
+        return entry
+
+    def filter_events(self, events: List[OSEvent], codes: Optional[Set[str]] = None,
+                      levels: Optional[Set[str]] = None, source: str = "", text: str = "") -> List[OSEvent]:
+        """Фильтр событий по кодам, уровням (текстом), подстроке источника и описания"""
+        source = source.lower()
+        text = text.lower()
+        return [
+            event for event in events
+            if (codes is None or event.event_code in codes)
+            and (levels is None or event.level in levels)
+            and (not source or source in event.source.lower())
+            and (not text or text in event.description.lower())
+        ]
+
+    def _parse_rendered_evtx(self, file_path: str, log_type: str) -> List[OSEvent]:
+        """Парсинг бинарного EVTX файла с помощью библиотеки evtx (через XML)"""
         events = []
         
         try:
             from Evtx.Evtx import Evtx
-            from Evtx.Views import evtx_file_xml_view
             
+            start, end = self._parse_window_utc()
             with Evtx(file_path) as evtx_file:
                 for record in evtx_file.records():
                     try:
-                        xml_record = evtx_file_xml_view(record)
+                        # Время из заголовка записи (UTC) - до рендеринга XML
+                        if start is not None or end is not None:
+                            written = record.timestamp().replace(tzinfo=None)
+                            if (start is not None and written < start) or (end is not None and written >= end):
+                                continue
+                        xml_record = record.xml()
                         event = self._parse_xml_event(xml_record, log_type)
                         if event:
                             events.append(event)
@@ -169,83 +720,98 @@ class BasicMechanismsAnalyzer:
     def _parse_xml_event(self, xml_content: str, log_type: str) -> Optional[OSEvent]:
         """Парсинг XML события"""
         try:
-            # Парсим XML
-            root = ET.fromstring(xml_content)
-            
-            # Находим пространства имен
-            ns = {'ns': 'http://schemas.microsoft.com/win/2004/08/events/event'}
-            
-            # Извлекаем данные
-            system = root.find('.//ns:System', ns)
-            if system is None:
-                return None
-            
-            # EventID
-            event_id_elem = system.find('ns:EventID', ns)
-            event_code = event_id_elem.text if event_id_elem is not None else "0"
-            
-            # Level
-            level_elem = system.find('ns:Level', ns)
-            level_num = int(level_elem.text) if level_elem is not None and level_elem.text else 0
-            level_text = self._convert_event_level(level_num)
-            
-            # TimeCreated
-            time_created = system.find('ns:TimeCreated', ns)
-            timestamp = time_created.get('SystemTime') if time_created is not None else ""
-            
-            # Provider
-            provider = system.find('ns:Provider', ns)
-            source = provider.get('Name') if provider is not None else "Неизвестно"
-            
-            # EventData/Data
-            event_data = root.find('.//ns:EventData', ns)
-            description = ""
-            if event_data is not None:
-                data_items = event_data.findall('ns:Data', ns)
-                if data_items:
-                    descriptions = []
-                    for data in data_items:
-                        if data.text:
-                            descriptions.append(data.text.strip())
-                    description = " | ".join(descriptions)
-            
-            # Фильтруем по шаблонам если нужно
-            if self.use_custom_patterns and self.custom_patterns:
-                if event_code not in self.custom_patterns:
-                    return None
-            elif not self.use_custom_patterns and event_code not in self.default_patterns:
-                return None
-            
-            # Форматируем timestamp
-            formatted_time = self._format_timestamp(timestamp)
-            
-            return OSEvent(
-                timestamp=formatted_time,
-                level=level_text,
-                event_code=event_code,
-                source=source,
-                description=description,
-                log_type=log_type
-            )
-            
+            return self._event_from_element(ET.fromstring(xml_content), log_type)
         except Exception as e:
             self.logger.debug(f"Ошибка парсинга XML события: {e}")
             return None
     
+    def _event_from_element(self, event_elem, log_type: str) -> Optional[OSEvent]:
+        """Событие из элемента <Event>.
+
+        Сначала читается EventID; уровень, время, источник и данные события
+        разбираются только у событий, прошедших фильтр по коду.
+        """
+        system = None
+        event_data = None
+        for child in event_elem:
+            name = _local_name(child.tag)
+            if name == 'System':
+                system = child
+            elif name == 'EventData':
+                event_data = child
+        if system is None:
+            return None
+        
+        # EventID
+        event_code = "0"
+        for child in system:
+            if _local_name(child.tag) == 'EventID':
+                event_code = (child.text or "0").strip()
+                break
+        
+        codes, levels = self._current_selection()
+        if codes is not None and levels is None and event_code not in codes:
+            return None
+        
+        fields = {_local_name(child.tag): child for child in system}
+        
+        # Level
+        level_elem = fields.get('Level')
+        level_text = (level_elem.text or "").strip() if level_elem is not None else ""
+        level_num = int(level_text) if level_text.isdigit() else 0
+        
+        # Фильтруем по шаблонам если нужно
+        if not self._selected(event_code, level_num):
+            return None
+        
+        # TimeCreated
+        time_created = fields.get('TimeCreated')
+        timestamp = time_created.get('SystemTime') if time_created is not None else ""
+        formatted_time = self._format_timestamp(timestamp)
+        if not self._in_time_window(formatted_time):
+            return None
+        
+        # Provider
+        provider = fields.get('Provider')
+        source = provider.get('Name') if provider is not None else "Неизвестно"
+        
+        # Channel
+        channel = fields.get('Channel')
+        if channel is not None and channel.text and channel.text.strip():
+            log_type = channel.text.strip()
+        
+        # EventData/Data
+        description = ""
+        if event_data is not None:
+            descriptions = [data.text.strip() for data in event_data
+                            if _local_name(data.tag) == 'Data' and data.text and data.text.strip()]
+            description = " | ".join(descriptions)
+        
+        return OSEvent(
+            timestamp=formatted_time,
+            level=self._convert_event_level(level_num),
+            event_code=event_code,
+            source=source,
+            description=description,
+            log_type=log_type
+        )
+    
     def _parse_text_evtx(self, file_path: str, log_type: str) -> List[OSEvent]:
-        """Парсинг текстового представления EVTX"""
+        """Парсинг текстового представления EVTX (XML-выгрузка или текстовый лог)"""
         events = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Если это XML
-            if '<Event' in content and '<System>' in content:
-                events = self._parse_xml_events(content, log_type)
-            else:
-                # Пробуем парсить как текстовый лог
-                events = self._parse_plain_text_events(content, log_type)
+            encoding = _detect_text_encoding(file_path)
+            with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+                head = f.read(self.XML_BLOCK_SIZE)
+                f.seek(0)
+                
+                # Если это XML
+                if '<Event' in head:
+                    events = self._parse_xml_stream(f, log_type)
+                else:
+                    # Пробуем парсить как текстовый лог
+                    events = self._parse_plain_text_events(f, log_type)
                 
         except Exception as e:
             self.logger.error(f"Ошибка парсинга текстового EVTX: {e}")
@@ -253,42 +819,65 @@ class BasicMechanismsAnalyzer:
         return events
     
     def _parse_xml_events(self, xml_content: str, log_type: str) -> List[OSEvent]:
-        """Парсинг XML событий"""
+        """Парсинг XML событий из строки"""
+        return self._parse_xml_stream(io.StringIO(xml_content), log_type)
+    
+    def _parse_xml_stream(self, stream, log_type: str) -> List[OSEvent]:
+        """Потоковый разбор XML-выгрузки журнала.
+
+        Файл подается в XMLPullParser (lxml, если установлен) блоками; каждый
+        <Event> обрабатывается по закрывающему тегу и сразу удаляется из
+        дерева, поэтому память не зависит от размера выгрузки. Выгрузка
+        wevtutil без корневого элемента оборачивается в <Events>.
+        """
         events = []
+        parser = _xml_etree.XMLPullParser(events=('start', 'end'))
+        root = None
         
-        try:
-            # Разделяем на отдельные события
-            event_start = '<Event'
-            event_end = '</Event>'
-            
-            start_pos = 0
-            while True:
-                start_idx = xml_content.find(event_start, start_pos)
-                if start_idx == -1:
-                    break
-                
-                end_idx = xml_content.find(event_end, start_idx)
-                if end_idx == -1:
-                    break
+        def drain():
+            nonlocal root
+            for action, elem in parser.read_events():
+                if action == 'start':
+                    if root is None:
+                        root = elem
+                    continue
+                if elem is root or _local_name(elem.tag) != 'Event':
+                    continue
                 
-                event_xml = xml_content[start_idx:end_idx + len(event_end)]
-                event = self._parse_xml_event(event_xml, log_type)
+                event = self._event_from_element(elem, log_type)
                 if event:
                     events.append(event)
                 
-                start_pos = end_idx + len(event_end)
-                
+                # Освобождаем обработанные события
+                elem.clear()
+                if root is not None:
+                    root.clear()
+        
+        try:
+            head = _strip_xml_declaration(stream.read(self.XML_BLOCK_SIZE))
+            wrapped = head.startswith('<Event') and not head.startswith('<Events')
+            parser.feed('<Events>' + head if wrapped else head)
+            drain()
+            
+            for block in iter(lambda: stream.read(self.XML_BLOCK_SIZE), ''):
+                parser.feed(block)
+                drain()
+            
+            if wrapped:
+                parser.feed('</Events>')
+            parser.close()
+            drain()
         except Exception as e:
             self.logger.error(f"Ошибка парсинга XML событий: {e}")
         
         return events
     
-    def _parse_plain_text_events(self, text_content: str, log_type: str) -> List[OSEvent]:
-        """Парсинг простого текстового лога"""
+    def _parse_plain_text_events(self, text_content, log_type: str) -> List[OSEvent]:
+        """Парсинг простого текстового лога (строка или открытый файл)"""
         events = []
         
         try:
-            lines = text_content.split('\n')
+            lines = text_content.split('\n') if isinstance(text_content, str) else text_content
             
             current_event = {}
             in_event = False
@@ -350,6 +939,12 @@ class BasicMechanismsAnalyzer:
         events = []
         
         try:
+            with open(file_path, 'rb') as f:
+                head = f.read(self.XML_BLOCK_SIZE)
+            if _looks_like_binary_evtx(head):
+                # Строки бинарного журнала в UTF-16, текстовый поиск их не найдет
+                return self._scan_binary_evtx(file_path, log_type)
+            
             with open(file_path, 'rb') as f:
                 # Читаем как текст с разными кодировками
                 try:
@@ -367,14 +962,7 @@ class BasicMechanismsAnalyzer:
             ]
             
             for match in re.finditer('|'.join(event_patterns), content):
-                event_code = match.group(1)
-                
-                # Фильтруем по шаблонам
-                if self.use_custom_patterns and self.custom_patterns:
-                    if event_code not in self.custom_patterns:
-                        continue
-                elif not self.use_custom_patterns and event_code not in self.default_patterns:
-                    continue
+                event_code = next(group for group in match.groups() if group)
                 
                 # Извлекаем контекст вокруг события
                 start = max(0, match.start() - 500)
@@ -384,11 +972,17 @@ class BasicMechanismsAnalyzer:
                 # Извлекаем время
                 time_match = re.search(r'Event Time:\s*(.+)', context)
                 timestamp = time_match.group(1).strip() if time_match else "Неизвестно"
+                if not self._in_time_window(timestamp):
+                    continue
                 
                 # Извлекаем уровень
                 level_match = re.search(r'Level:\s*(.+)', context)
                 level_text = self._convert_level_text(level_match.group(1).strip()) if level_match else "Информация"
                 
+                # Фильтруем по шаблонам
+                if not self._selected(event_code, _LEVEL_NUMBERS.get(level_text, 0)):
+                    continue
+                
                 # Извлекаем источник
                 source_match = re.search(r'Source:\s*(.+)', context)
                 source = source_match.group(1).strip() if source_match else "Неизвестно"
@@ -418,15 +1012,16 @@ class BasicMechanismsAnalyzer:
             event_code = event_dict.get('code', '0')
             
             # Фильтруем по шаблонам
-            if self.use_custom_patterns and self.custom_patterns:
-                if event_code not in self.custom_patterns:
-                    return None
-            elif not self.use_custom_patterns and event_code not in self.default_patterns:
+            level_text = event_dict.get('level', 'Информация')
+            if not self._selected(event_code, _LEVEL_NUMBERS.get(level_text, 0)):
+                return None
+            
+            if not self._in_time_window(event_dict.get('time', '')):
                 return None
             
             return OSEvent(
                 timestamp=event_dict.get('time', 'Неизвестно'),
-                level=event_dict.get('level', 'Информация'),
+                level=level_text,
                 event_code=event_code,
                 source=event_dict.get('source', 'Неизвестно'),
                 description=event_dict.get('description', ''),
@@ -463,7 +1058,7 @@ class BasicMechanismsAnalyzer:
             return level_text
     
     def _format_timestamp(self, timestamp: str) -> str:
-        """Форматирование timestamp в читаемый формат"""
+        """Форматирование timestamp в читаемый формат (время UTC - в местное)"""
         if not timestamp:
             return "Неизвестно"
         
@@ -471,7 +1066,7 @@ class BasicMechanismsAnalyzer:
             # Формат: 2024-01-15T10:30:45.123456Z
             if 'T' in timestamp and 'Z' in timestamp:
                 dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                return dt.strftime("%Y-%m-%d %H:%M:%S")
+                return dt.astimezone().strftime("%Y-%m-%d %H:%M:%S")
             elif 'T' in timestamp:
                 dt = datetime.fromisoformat(timestamp)
                 return dt.strftime("%Y-%m-%d %H:%M:%S")
@@ -480,118 +1075,174 @@ class BasicMechanismsAnalyzer:
         except:
             return timestamp
     
-    def analyze_os_logs(self, log_dir: str) -> Tuple[List[OSEvent], List[OSEvent]]:
-        """Анализ журналов ОС"""
-        application_events = []
-        system_events = []
-        
-        # Ищем файлы журналов
-        app_log_path = None
-        system_log_path = None
+    def find_journal_files(self, log_dir: str) -> List[Path]:
+        """Все файлы журналов в каталоге (крупные первыми, чтобы раньше попасть в пул)"""
+        journal_files = [path for path in Path(log_dir).rglob("*")
+                         if path.suffix.lower() in self.JOURNAL_SUFFIXES and path.is_file()]
+        journal_files.sort(key=lambda path: path.stat().st_size, reverse=True)
+        return journal_files
+    
+    def analyze_os_logs(self, log_dir: str) -> Dict[str, List[OSEvent]]:
+        """Анализ всех журналов ОС в каталоге.
+
+        Журналы разбираются одновременно в пуле потоков, чанки бинарных EVTX
+        всех журналов - в общем пуле процессов. События группируются по каналу
+        из самих записей (Application, System, Setup, ...); для выгрузок без
+        канала используется имя файла. Возвращает {канал: события по времени};
+        разобранные журналы остаются в journal_entries для refilter_journals.
+        """
+        self.event_stats = OSEventStats(self.time_window)
+        self.journal_entries = []
+        codes = self._pattern_codes()
         
-        log_dir_path = Path(log_dir)
+        journal_files = self.find_journal_files(log_dir)
+        if not journal_files:
+            self.logger.warning("Файлы журналов не найдены")
+            return {}
         
-        # Ищем файлы с разными именами
-        evtx_files = list(log_dir_path.rglob("*.evtx"))
-        evt_files = list(log_dir_path.rglob("*.evt"))
-        all_log_files = evtx_files + evt_files
+        self.logger.info(f"Найдено журналов: {len(journal_files)}")
         
-        # Сортируем по размеру (обычно системные журналы больше)
-        all_log_files.sort(key=lambda x: x.stat().st_size if x.exists() else 0, reverse=True)
+        self._process_pool = self._create_process_pool()
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(journal_files), self.MAX_JOURNAL_THREADS)) as executor:
+                futures = [(path, executor.submit(self.load_journal, str(path), journal_name_from_path(path)))
+                           for path in journal_files]
+                for path, future in futures:
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Ошибка разбора журнала {path}: {e}")
+                        continue
+                    if entry is None:
+                        continue
+                    self.event_stats.merge(entry.stats)
+                    self.journal_entries.append(entry)
+                    self.logger.info(f"Спарсено событий из {path.name}: {len(entry.events)}")
+        finally:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+                self._process_pool = None
         
-        # Пытаемся определить какие файлы какие
-        for log_file in all_log_files:
-            filename = log_file.name.lower()
-            
-            if 'application' in filename or 'app' in filename or 'приложение' in filename:
-                if not app_log_path:
-                    app_log_path = log_file
-                    self.logger.info(f"Найден журнал приложений: {log_file}")
-            elif 'system' in filename or 'sys' in filename or 'система' in filename:
-                if not system_log_path:
-                    system_log_path = log_file
-                    self.logger.info(f"Найден журнал системы: {log_file}")
-            elif 'security' in filename or 'безопасность' in filename:
-                # Журнал безопасности пропускаем
-                continue
-            elif not app_log_path:  # Первый несистемный файл считаем журналом приложений
-                app_log_path = log_file
-                self.logger.info(f"Предполагаемый журнал приложений: {log_file}")
-            elif not system_log_path:  # Второй файл считаем системным
-                system_log_path = log_file
-                self.logger.info(f"Предполагаемый журнал системы: {log_file}")
-        
-        # Парсим журнал приложений
-        if app_log_path and app_log_path.exists():
-            application_events = self.parse_evtx_file(str(app_log_path), "Журнал приложения")
-            self.logger.info(f"Спарсено событий из журнала приложений: {len(application_events)}")
-        else:
-            self.logger.warning(f"Журнал приложений не найден")
+        return self._group_journals(codes=codes)
+    
+    def refilter_journals(self, levels: Optional[Set[str]] = None, source: str = "",
+                          text: str = "") -> Optional[Dict[str, List[OSEvent]]]:
+        """Повторный отбор событий журналов последнего analyze_os_logs без разбора файлов.
+
+        Коды берутся из текущих настроек шаблона, уровни, источник и текст
+        описания - из аргументов. None - кэш журналов не покрывает коды
+        шаблона, нужен повторный анализ.
+        """
+        codes = self._pattern_codes()
+        if not all(entry.covers(codes) for entry in self.journal_entries):
+            return None
+        return self._group_journals(codes, levels, source, text)
+    
+    def _group_journals(self, codes: Optional[Set[str]] = None, levels: Optional[Set[str]] = None,
+                        source: str = "", text: str = "") -> Dict[str, List[OSEvent]]:
+        """События разобранных журналов по фильтру: {канал: события по времени}"""
+        journals: Dict[str, List[OSEvent]] = {}
+        for entry in self.journal_entries:
+            for event in self.filter_events(entry.events, codes, levels, source, text):
+                journals.setdefault(event.log_type, []).append(event)
         
-        # Парсим журнал системы
-        if system_log_path and system_log_path.exists():
-            system_events = self.parse_evtx_file(str(system_log_path), "Журнал системы")
-            self.logger.info(f"Спарсено событий из журнала системы: {len(system_events)}")
-        else:
-            self.logger.warning(f"Журнал системы не найден")
+        for events in journals.values():
+            events.sort(key=lambda event: event.timestamp)
         
-        return application_events, system_events
+        return {channel: journals[channel] for channel in sorted(journals, key=_journal_order)}
+    
+    def _create_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Общий пул процессов для чанков EVTX (None на одноядерной машине)"""
+        workers = os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        try:
+            return ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            self.logger.warning(f"Пул процессов недоступен: {e}")
+            return None
     
-    def format_os_logs_result(self, app_events: List[OSEvent], sys_events: List[OSEvent]) -> str:
+    def format_os_logs_result(self, journals: Dict[str, List[OSEvent]]) -> str:
         """Форматирование результатов анализа журналов ОС"""
-        total_events = len(app_events) + len(sys_events)
+        total_events = sum(len(events) for events in journals.values())
         
-        output = f"=== АНАЛИЗ ЖУРНАЛОВ ОС WINDOWS ===\n\n"
-        output += f"Всего событий найдено: {total_events}\n"
-        output += f"• Журнал приложения: {len(app_events)} событий\n"
-        output += f"• Журнал системы: {len(sys_events)} событий\n\n"
+        output = [f"=== АНАЛИЗ ЖУРНАЛОВ ОС WINDOWS ===\n\n"]
+        output.append(f"Всего событий найдено: {total_events}\n")
+        for channel, events in journals.items():
+            output.append(f"• {journal_title(channel)}: {len(events)} событий\n")
+        output.append("\n")
         
         if self.use_custom_patterns:
             patterns = self.custom_patterns if self.custom_patterns else self.default_patterns
-            output += f"Использованные коды событий: {', '.join(patterns)}\n\n"
+            output.append(f"Использованные коды событий: {', '.join(patterns)}\n\n")
+        
+        start, end = self.time_window
+        if start is not None or end is not None:
+            output.append(f"Интервал анализа: {start or '...'} - {end or '...'}\n\n")
         
         if total_events == 0:
-            output += "Событий не найдено.\nВозможные причины:\n"
-            output += "1. Файлы журналов отсутствуют в архиве\n"
-            output += "2. Журналы не содержат событий с выбранными кодами\n"
-            output += "3. Формат файлов журналов не поддерживается\n"
-            return output
-        
-        output += "=== ЖУРНАЛ ПРИЛОЖЕНИЯ ===\n\n"
-        if app_events:
-            output += "Дата и время           | Уровень       | Код события | Источник\n"
-            output += "-" * 80 + "\n"
-            for event in app_events[:50]:  # Ограничиваем вывод
-                output += f"{event.timestamp:20} | {event.level:13} | {event.event_code:11} | {event.source}\n"
-            if len(app_events) > 50:
-                output += f"... и еще {len(app_events) - 50} событий\n"
-        else:
-            output += "Событий не найдено\n"
-        
-        output += "\n\n=== ЖУРНАЛ СИСТЕМЫ ===\n\n"
-        if sys_events:
-            output += "Дата и время           | Уровень       | Код события | Источник\n"
-            output += "-" * 80 + "\n"
-            for event in sys_events[:50]:  # Ограничиваем вывод
-                output += f"{event.timestamp:20} | {event.level:13} | {event.event_code:11} | {event.source}\n"
-            if len(sys_events) > 50:
-                output += f"... и еще {len(sys_events) - 50} событий\n"
-        else:
-            output += "Событий не найдено\n"
-        
-        # Статистика по уровням
-        if total_events > 0:
-            all_events = app_events + sys_events
-            level_stats = {}
-            for event in all_events:
-                level_stats[event.level] = level_stats.get(event.level, 0) + 1
-            
-            output += "\n=== СТАТИСТИКА ПО УРОВНЯМ ===\n\n"
-            for level, count in sorted(level_stats.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / total_events) * 100
-                output += f"• {level}: {count} ({percentage:.1f}%)\n"
+            output.append("Событий не найдено.\nВозможные причины:\n")
+            output.append("1. Файлы журналов отсутствуют в архиве\n")
+            output.append("2. Журналы не содержат событий с выбранными кодами\n")
+            output.append("3. Формат файлов журналов не поддерживается\n")
+            return "".join(output)
+        
+        for channel, events in journals.items():
+            if not events:
+                continue
+            output.append(f"=== {journal_title(channel).upper()} ===\n\n")
+            output.append("Дата и время           | Уровень       | Код события | Источник\n")
+            output.append("-" * 80 + "\n")
+            for event in events[:50]:  # Ограничиваем вывод
+                output.append(f"{event.timestamp:20} | {event.level:13} | {event.event_code:11} | {event.source}\n")
+            if len(events) > 50:
+                output.append(f"... и еще {len(events) - 50} событий\n")
+            output.append("\n\n")
+        
+        output.append(self.format_event_stats(self.event_stats))
+        return "".join(output)
+    
+    def format_event_stats(self, stats: OSEventStats) -> str:
+        """Сводка: уровни, частые источники, пики по часам, перезагрузки и сбои"""
+        if stats.total == 0:
+            return ""
+        
+        output = ["=== СВОДКА ПО ЖУРНАЛАМ ===\n"]
+        output.append("(критические события, ошибки, предупреждения и события перезагрузок)\n\n")
+        
+        output.append("Уровни:\n")
+        for level, count in stats.by_level.most_common():
+            percentage = (count / stats.total) * 100
+            output.append(f"• {level}: {count} ({percentage:.1f}%)\n")
+        
+        output.append("\nЧастые источники:\n")
+        for source, count in stats.top_sources(10):
+            output.append(f"• {source}: {count}\n")
+        
+        output.append("\nПики (код × источник × час):\n")
+        output.append("Час             | Код события | Событий | Источник\n")
+        output.append("-" * 80 + "\n")
+        for (code, source, hour), count in stats.hot_spots(10):
+            output.append(f"{hour + ':00':15} | {code:11} | {count:7} | {source}\n")
+        
+        timeline = stats.reboot_timeline()
+        output.append("\n=== ПЕРЕЗАГРУЗКИ И СБОИ ===\n\n")
+        if not timeline:
+            output.append("Событий запуска и сбоев не найдено\n")
+            return "".join(output)
+        
+        crashes = sum(1 for boot in timeline if boot.kind == "Сбой")
+        output.append(f"Загрузок: {len(timeline)}, после сбоя: {crashes}\n\n")
+        output.append("Запуск               | Тип                     | Завершение           | Причина\n")
+        output.append("-" * 80 + "\n")
+        for boot in timeline[-50:]:  # Последние загрузки
+            shutdown = boot.shutdown.strftime("%Y-%m-%d %H:%M:%S") if boot.shutdown else "-"
+            output.append(f"{boot.time.strftime('%Y-%m-%d %H:%M:%S'):20} | {boot.kind:23} | "
+                          f"{shutdown:20} | {', '.join(boot.causes)}\n")
+        if len(timeline) > 50:
+            output.append(f"... и еще {len(timeline) - 50} загрузок ранее\n")
         
-        return output
+        return "".join(output)
     
     def cleanup(self):
         """Очистка временных файлов"""
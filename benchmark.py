@@ -0,0 +1,652 @@
+# benchmark.py
+"""
+Замеры производительности парсеров логов
+
+Запуск:
+    python benchmark.py inpas [путь_к_логу] [--date YYYY-MM-DD] [--slips N]
+    python benchmark.py sberbank [папка_драйвера] [--date YYYY-MM-DD] [--terminals N] [--days N]
+    python benchmark.py seek [путь_к_логу] [--date YYYY-MM-DD] [--days N] [--slips N]
+    python benchmark.py evtx [путь_к_журналу] [--records N]
+    python benchmark.py evtx-parallel [журнал ...] [--size-mb N] [--workers 1,2,4,8]
+
+Без пути генерируются синтетические логи.
+"""
+
+import os
+import re
+import sys
+import time
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+from payment_terminal_analyzer import (
+    PaymentTerminalAnalyzer, InpasTransaction, SberbankTransaction, InpasLogParser, LogSeekIndex
+)
+from basic_mechanisms_analyzer import BasicMechanismsAnalyzer
+from evtx_reader import (
+    FILE_MAGIC, CHUNK_MAGIC, FILE_HEADER_SIZE, CHUNK_SIZE, CHUNK_HEADER_SIZE, read_records_concurrently
+)
+
+
+def _legacy_parse_inpas_log(log_path: str, target_date: str) -> List[InpasTransaction]:
+    """Прежняя реализация PaymentTerminalAnalyzer._parse_inpas_log (эталон для сравнения)"""
+    transactions = []
+
+    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+
+        if 'ПАО' in line or 'АО' in line or 'БАНК' in line:
+            transaction_data = {'bank': line.strip()}
+
+            for j in range(i, min(i + 15, len(lines))):
+                if 'ОПЛАТА ПОКУПКИ' in lines[j]:
+                    if j + 1 < len(lines):
+                        transaction_data['status'] = lines[j + 1].strip()
+
+                    for k in range(j, min(j + 10, len(lines))):
+                        if target_date[:2] in lines[k]:
+                            m = re.search(r'(\d{2}\.\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2})', lines[k])
+                            if m:
+                                transaction_data['date'] = m.group(1)
+                                transaction_data['time'] = m.group(2)
+                        if 'ТЕРМИНАЛ:' in lines[k]:
+                            m = re.search(r'ТЕРМИНАЛ:\s*(\d+)', lines[k])
+                            if m:
+                                transaction_data['terminal'] = m.group(1)
+                        if 'КАРТА' in lines[k]:
+                            m = re.search(r'КАРТА\s+([A-Za-z ]+)', lines[k])
+                            if m:
+                                transaction_data['card_type'] = m.group(1).strip()
+                        if 'СУММА (RUB)' in lines[k]:
+                            m = re.search(r'СУММА \(RUB\)\s+([\d\.]+)', lines[k])
+                            if m:
+                                transaction_data['amount'] = m.group(1)
+                        if 'КОД АВТОРИЗАЦИИ:' in lines[k]:
+                            m = re.search(r'КОД АВТОРИЗАЦИИ:\s+(\d+)', lines[k])
+                            if m:
+                                transaction_data['auth_code'] = m.group(1)
+                        if '№ ССЫЛКИ:' in lines[k]:
+                            m = re.search(r'№ ССЫЛКИ:\s+(\d+)', lines[k])
+                            if m:
+                                transaction_data['rrn'] = m.group(1)
+
+                    if all(key in transaction_data for key in ['date', 'time', 'amount', 'terminal', 'status', 'bank']):
+                        transactions.append(InpasTransaction(
+                            timestamp=f"{transaction_data['date']} {transaction_data['time']}",
+                            amount=transaction_data['amount'],
+                            terminal=transaction_data['terminal'],
+                            status=transaction_data['status'],
+                            bank=transaction_data['bank'],
+                            card_type=transaction_data.get('card_type', ''),
+                            auth_code=transaction_data.get('auth_code', ''),
+                            rrn=transaction_data.get('rrn', '')
+                        ))
+                    break
+
+            i = j + 10
+        else:
+            i += 1
+
+    return transactions
+
+
+def _legacy_analyze_sberbank_driver(analyzer: PaymentTerminalAnalyzer, driver_dir: str,
+                                    target_date: str) -> List[SberbankTransaction]:
+    """Прежняя реализация analyze_sberbank_driver: подпапки и файлы по очереди"""
+    from pathlib import Path
+
+    transactions = []
+    driver_path = Path(driver_dir)
+    subdirs = [item for item in driver_path.iterdir() if item.is_dir() and item.name.isdigit()] or [driver_path]
+
+    for subdir in subdirs:
+        log_files = []
+        for pattern in [f"sbkernel{target_date[5:7]}{target_date[8:10]}.log",
+                        f"sbkernel{target_date[2:4]}{target_date[5:7]}.log",
+                        "sbkernel*.log"]:
+            found_files = list(subdir.rglob(pattern))
+            if found_files:
+                log_files.extend(found_files)
+                break
+        if not log_files:
+            log_files = list(subdir.rglob("*.log"))
+
+        for log_file in log_files:
+            transactions.extend(_legacy_parse_sberbank_log(analyzer, str(log_file), target_date))
+
+    return transactions
+
+
+def _legacy_parse_sberbank_log(analyzer: PaymentTerminalAnalyzer, log_path: str,
+                               target_date: str) -> List[SberbankTransaction]:
+    """Прежняя реализация _parse_sberbank_log (readlines и окно в 20 строк)"""
+    transactions = []
+    target_day_month = f"{target_date[8:10]}.{target_date[5:7]}"
+
+    with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+        lines = f.readlines()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if 'SBKRNL:' in line and 'Command = 4000' in line and target_day_month in line:
+            data = {}
+            m = re.search(r'(\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2}\.\d{3})', line)
+            if m:
+                data['date'], data['time'] = m.group(1), m.group(2)
+            m = re.search(r'Amount\s*=\s*([\d\.]+)', line)
+            if m:
+                data['amount'] = m.group(1)
+            m = re.search(r'Department\s*=\s*(\d+)', line)
+            if m:
+                data['department'] = m.group(1)
+
+            for j in range(i + 1, min(i + 20, len(lines))):
+                next_line = lines[j]
+                if 'Version:' in next_line and 'MSBuild' not in next_line:
+                    m = re.search(r'Version:([\d\.]+)', next_line)
+                    if m:
+                        data['version'] = m.group(1)
+                if 'Result' in next_line and 'GUID' in next_line:
+                    m = re.search(r'Result\s*=\s*(\d+)', next_line)
+                    if m:
+                        data['status'] = analyzer._convert_sberbank_result(m.group(1))
+                    m = re.search(r'GUID=([A-F0-9]+)', next_line)
+                    if m:
+                        data['guid'] = m.group(1)
+                    m = re.search(r'\*\*\*\*\*\*\*\*\*\*\*\*(\d{4})', next_line)
+                    if m:
+                        data['card_last4'] = m.group(1)
+
+            if all(k in data for k in ['date', 'time', 'amount', 'status']):
+                transactions.append(SberbankTransaction(
+                    timestamp=f"{data['date']} {data['time']}",
+                    amount=data['amount'],
+                    status=data['status'],
+                    version=data.get('version', ''),
+                    card_last4=data.get('card_last4', ''),
+                    guid=data.get('guid', ''),
+                    department=data.get('department', '')
+                ))
+            i = j
+        else:
+            i += 1
+
+    return transactions
+
+
+def generate_inpas_log(path: str, target_date: str, slips: int, noise_lines: int = 40):
+    """Генерация синтетического лога DualConnector с чеками и служебным шумом"""
+    with open(path, 'w', encoding='utf-8') as f:
+        _write_inpas_slips(f, target_date, slips, noise_lines)
+
+
+def generate_inpas_history(path: str, target_date: str, days: int, slips_per_day: int,
+                           noise_lines: int = 40):
+    """Лог DualConnector за days суток, целевая дата - в середине периода"""
+    first_day = datetime.strptime(target_date, "%Y-%m-%d") - timedelta(days=days // 2)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        for day in range(days):
+            date = (first_day + timedelta(days=day)).strftime("%Y-%m-%d")
+            _write_inpas_slips(f, date, slips_per_day, noise_lines)
+
+
+def _write_inpas_slips(f, date: str, slips: int, noise_lines: int):
+    slip_date = f"{date[8:10]}.{date[5:7]}.{date[2:4]}"
+    for n in range(slips):
+        for k in range(noise_lines):
+            f.write(f"[{k:04d}] DC: exchange packet {n}:{k} state=READY len=512\n")
+        hh, mm, ss = (n // 3600) % 24, (n // 60) % 60, n % 60
+        f.write("ПАО СБЕРБАНК\n")
+        f.write("МАГАЗИН 'ПРОДУКТЫ'\n")
+        f.write("ОПЛАТА ПОКУПКИ\n")
+        f.write("ОДОБРЕНО\n")
+        f.write(f"{slip_date} {hh:02d}:{mm:02d}:{ss:02d}\n")
+        f.write(f"ТЕРМИНАЛ: {10000000 + n % 4}\n")
+        f.write("КАРТА VISA\n")
+        f.write("**** **** **** **** 1234\n")
+        f.write(f"СУММА (RUB) {100 + n % 900}.00\n")
+        f.write(f"КОД АВТОРИЗАЦИИ: {100000 + n}\n")
+        f.write(f"№ ССЫЛКИ: {500000000000 + n}\n")
+
+
+def generate_sberbank_driver(driver_dir: str, target_date: str, terminals: int, days: int,
+                             payments_per_day: int = 400, noise_lines: int = 60):
+    """Генерация папки драйвера Сбербанка: подпапки 1..N с логом sbkernel за каждый день"""
+    end_date = datetime.strptime(target_date, "%Y-%m-%d")
+    guid_counter = 0
+
+    for terminal in range(1, terminals + 1):
+        subdir = os.path.join(driver_dir, str(terminal))
+        os.makedirs(subdir, exist_ok=True)
+
+        with open(os.path.join(subdir, "sbkernel.log"), 'w', encoding='utf-8') as f:
+            for day in range(days - 1, -1, -1):
+                day_month = (end_date - timedelta(days=day)).strftime("%d.%m")
+                for n in range(payments_per_day):
+                    hh, mm, ss = 8 + n // 60 % 14, n % 60, (n * 7) % 60
+                    stamp = f"{day_month} {hh:02d}:{mm:02d}:{ss:02d}.{n % 1000:03d}"
+                    for k in range(noise_lines):
+                        f.write(f"{stamp} PILOT: poll device state={k} queue=0\n")
+                    f.write(f"{stamp} SBKRNL: Command = 4000, Amount = {100 + n}.00, Department = {terminal}\n")
+                    f.write(f"{stamp} SBKRNL: Version:{terminal}.22.0.1\n")
+                    guid_counter += 1
+                    f.write(f"{stamp} SBKRNL: Result = 0, GUID={guid_counter:016X}, card ************{1000 + n % 9000}\n")
+
+
+# События синтетического журнала: (код, источник, уровень, вес)
+_EVTX_EVENT_MIX = [
+    (7036, "Service Control Manager", 4, 600),
+    (10016, "Microsoft-Windows-DistributedCOM", 3, 150),
+    (1014, "Microsoft-Windows-DNS Client Events", 3, 100),
+    (16, "Microsoft-Windows-Kernel-General", 4, 80),
+    (6013, "EventLog", 4, 40),
+    (7031, "Service Control Manager", 2, 8),
+    (7000, "Service Control Manager", 2, 6),
+    (7001, "Service Control Manager", 2, 4),
+    (41, "Microsoft-Windows-Kernel-Power", 1, 2),
+    (6008, "EventLog", 2, 2),
+    (6005, "EventLog", 4, 3),
+    (6006, "EventLog", 4, 3),
+    (1001, "Microsoft-Windows-WER-SystemErrorReporting", 2, 2),
+]
+
+_EVTX_TEMPLATE_ID = 0x5A5A0001
+_EVTX_TEMPLATE_GUID = bytes(range(16))
+_FILETIME_EPOCH = datetime(1601, 1, 1)
+
+
+def _filetime(moment: datetime) -> int:
+    return int((moment - _FILETIME_EPOCH).total_seconds() * 10_000_000)
+
+
+def _wstring(text: str) -> bytes:
+    return (text + "\x00").encode("utf-16-le")
+
+
+class _EvtxChunkWriter:
+    """Чанк синтетического EVTX: один шаблон, имена и шаблон записаны в потоке.
+
+    Подстановки System расположены как в шаблонах Windows: 0 - Level,
+    3 - EventID, 6 - TimeCreated, 14 - Provider; Channel и Computer - литералы.
+    """
+
+    def __init__(self, first_record_id: int, channel: str = "System"):
+        self.channel = channel
+        self.buf = bytearray(CHUNK_SIZE)
+        self.pos = CHUNK_HEADER_SIZE
+        self.names = {}
+        self.template_offset = None
+        self.first_record_id = first_record_id
+        self.last_record_id = first_record_id - 1
+        self.last_record_offset = 0
+
+    def _name(self, out: bytearray, base: int, name: str):
+        offset = self.names.get(name)
+        if offset is None:
+            offset = base + len(out) + 4
+            self.names[name] = offset
+            out += struct.pack('<I', offset) + struct.pack('<IHH', 0, 0, len(name)) + _wstring(name)
+        else:
+            out += struct.pack('<I', offset)
+
+    def _open(self, out: bytearray, base: int, name: str, attributes=()):
+        out += bytes([0x41 if attributes else 0x01]) + struct.pack('<HI', 0xFFFF, 0)
+        self._name(out, base, name)
+        if attributes:
+            out += struct.pack('<I', 0)
+        for n, (attribute, value) in enumerate(attributes):
+            out += bytes([0x46 if n + 1 < len(attributes) else 0x06])
+            self._name(out, base, attribute)
+            self._value(out, value)
+
+    @staticmethod
+    def _value(out: bytearray, value):
+        if isinstance(value, str):
+            out += bytes([0x05, 0x01]) + struct.pack('<H', len(value)) + value.encode("utf-16-le")
+        else:
+            index, value_type = value
+            out += bytes([0x0e]) + struct.pack('<HB', index, value_type)
+
+    def _element(self, out: bytearray, base: int, name: str, attributes=(), content=None):
+        self._open(out, base, name, attributes)
+        if content is None:
+            out += b'\x03'
+        else:
+            out += b'\x02'
+            self._value(out, content)
+            out += b'\x04'
+
+    def _template(self, out: bytearray, base: int):
+        out += b'\x0f\x01\x01\x00'
+        self._open(out, base, "Event", [("xmlns", "http://schemas.microsoft.com/win/2004/08/events/event")])
+        out += b'\x02'
+        self._open(out, base, "System")
+        out += b'\x02'
+        self._element(out, base, "Provider", [("Name", (14, 0x01))])
+        self._element(out, base, "EventID", [("Qualifiers", (4, 0x06))], (3, 0x06))
+        self._element(out, base, "Version", content=(11, 0x04))
+        self._element(out, base, "Level", content=(0, 0x04))
+        self._element(out, base, "Task", content=(2, 0x06))
+        self._element(out, base, "Opcode", content=(1, 0x04))
+        self._element(out, base, "Keywords", content=(5, 0x15))
+        self._element(out, base, "TimeCreated", [("SystemTime", (6, 0x11))])
+        self._element(out, base, "EventRecordID", content=(10, 0x0a))
+        self._element(out, base, "Execution", [("ProcessID", (8, 0x08)), ("ThreadID", (9, 0x08))])
+        self._element(out, base, "Channel", content=self.channel)
+        self._element(out, base, "Computer", content="POS-01")
+        out += b'\x04'
+        self._open(out, base, "EventData")
+        out += b'\x02'
+        self._element(out, base, "Data", [("Name", "param1")], (17, 0x01))
+        self._element(out, base, "Data", [("Name", "param2")], (18, 0x01))
+        out += b'\x04\x04\x00'
+
+    def add_record(self, record_id: int, written: int, values: list) -> bool:
+        """Запись события; False - запись не помещается в чанк"""
+        base = self.pos
+        names_backup = dict(self.names)
+
+        out = bytearray(struct.pack('<4sIQQ', b'**\x00\x00', 0, record_id, written))
+        out += b'\x0f\x01\x01\x00\x0c\x01' + struct.pack('<I', _EVTX_TEMPLATE_ID)
+        template_offset = self.template_offset
+        if template_offset is None:
+            template_offset = base + len(out) + 4
+            out += struct.pack('<I', template_offset)
+            out += struct.pack('<I', 0) + _EVTX_TEMPLATE_GUID + struct.pack('<I', 0)
+            data_start = len(out)
+            self._template(out, base)
+            struct.pack_into('<I', out, data_start - 4, len(out) - data_start)
+        else:
+            out += struct.pack('<I', template_offset)
+
+        out += struct.pack('<I', len(values))
+        for value_type, raw in values:
+            out += struct.pack('<HBx', len(raw), value_type)
+        for _, raw in values:
+            out += raw
+
+        size = len(out) + 4
+        struct.pack_into('<I', out, 4, size)
+        out += struct.pack('<I', size)
+        if base + size > CHUNK_SIZE:
+            self.names = names_backup
+            return False
+
+        self.buf[base:base + size] = out
+        self.template_offset = template_offset
+        self.last_record_offset = base
+        self.last_record_id = record_id
+        self.pos += size
+        return True
+
+    def finish(self) -> bytes:
+        buf = self.buf
+        struct.pack_into('<8sQQQQIIII', buf, 0, CHUNK_MAGIC,
+                         self.first_record_id, self.last_record_id,
+                         self.first_record_id, self.last_record_id,
+                         0x80, self.last_record_offset, self.pos,
+                         zlib.crc32(buf[CHUNK_HEADER_SIZE:self.pos]))
+        struct.pack_into('<I', buf, 0x7C, zlib.crc32(buf[:0x78] + buf[0x80:CHUNK_HEADER_SIZE]))
+        return bytes(buf)
+
+
+def generate_evtx(path: str, records: int, channel: str = "System", end_date: str = "2024-01-15",
+                  days: int = 30, seed: int = 1):
+    """Генерация синтетического EVTX за days суток до end_date включительно"""
+    rng = random.Random(seed)
+    weights = [mix[3] for mix in _EVTX_EVENT_MIX]
+    start = datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=days - 1)
+    step = days * 86400 / max(records, 1)
+
+    chunk_count = 0
+    with open(path, 'wb') as f:
+        f.write(bytes(FILE_HEADER_SIZE))
+        chunk = _EvtxChunkWriter(1, channel)
+
+        for record_id in range(1, records + 1):
+            code, source, level, _ = rng.choices(_EVTX_EVENT_MIX, weights)[0]
+            written = _filetime(start + timedelta(seconds=record_id * step))
+            values = [
+                (0x04, struct.pack('<B', level)),              # 0 Level
+                (0x04, struct.pack('<B', 0)),                  # 1 Opcode
+                (0x06, struct.pack('<H', 0)),                  # 2 Task
+                (0x06, struct.pack('<H', code)),               # 3 EventID
+                (0x06, struct.pack('<H', 0)),                  # 4 Qualifiers
+                (0x15, struct.pack('<Q', 0x8080000000000000)),  # 5 Keywords
+                (0x11, struct.pack('<Q', written)),            # 6 TimeCreated
+                (0x00, b''),                                   # 7 ActivityID
+                (0x08, struct.pack('<I', 4)),                  # 8 ProcessID
+                (0x08, struct.pack('<I', 8)),                  # 9 ThreadID
+                (0x0a, struct.pack('<Q', record_id)),          # 10 EventRecordID
+                (0x04, struct.pack('<B', 0)),                  # 11 Version
+                (0x00, b''),                                   # 12 UserID
+                (0x00, b''),                                   # 13 RelatedActivityID
+                (0x01, _wstring(source)),                      # 14 Provider
+                (0x00, b''),                                   # 15 Provider Guid
+                (0x00, b''),                                   # 16 EventSourceName
+                (0x01, _wstring(f"Служба {rng.randint(1, 300)}")),
+                (0x01, _wstring(rng.choice(["работает", "остановлена", "завершена неожиданно"]))),
+            ]
+            if not chunk.add_record(record_id, written, values):
+                f.write(chunk.finish())
+                chunk_count += 1
+                chunk = _EvtxChunkWriter(record_id, channel)
+                chunk.add_record(record_id, written, values)
+
+        f.write(chunk.finish())
+        chunk_count += 1
+
+        header = bytearray(struct.pack('<8sQQQIHHHH', FILE_MAGIC, 0, chunk_count - 1, records + 1,
+                                       0x80, 1, 3, FILE_HEADER_SIZE, chunk_count % 0x10000))
+        header += bytes(0x78 - len(header))
+        header += struct.pack('<II', 0, zlib.crc32(header[:0x78]))
+        f.seek(0)
+        f.write(header)
+
+
+def _measure(name: str, func: Callable[[], list]) -> list:
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:28} {elapsed:8.3f} с   пик памяти {peak / 1024 / 1024:8.1f} МБ   транзакций: {len(result)}")
+    return result
+
+
+def benchmark_inpas(log_path: str, target_date: str):
+    """Сравнение прежнего и потокового парсера INPAS на одном файле"""
+    analyzer = PaymentTerminalAnalyzer()
+    size_mb = os.path.getsize(log_path) / 1024 / 1024
+    print(f"Файл: {log_path} ({size_mb:.1f} МБ), дата: {target_date}")
+
+    legacy = _measure("прежний (readlines)", lambda: _legacy_parse_inpas_log(log_path, target_date))
+    streaming = _measure("потоковый (InpasLogParser)", lambda: analyzer._parse_inpas_log(log_path, target_date))
+
+    legacy_keys = {(t.timestamp, t.amount, t.rrn) for t in legacy}
+    streaming_keys = {(t.timestamp, t.amount, t.rrn) for t in streaming}
+    print(f"Совпадающих транзакций: {len(legacy_keys & streaming_keys)}, "
+          f"только в потоковом: {len(streaming_keys - legacy_keys)}, "
+          f"только в прежнем: {len(legacy_keys - streaming_keys)}")
+
+
+def benchmark_sberbank(driver_dir: str, target_date: str):
+    """Сравнение прежнего последовательного и нового параллельного анализа sbkernel"""
+    analyzer = PaymentTerminalAnalyzer()
+    print(f"Папка драйвера: {driver_dir}, дата: {target_date}, ядер: {os.cpu_count()}")
+
+    legacy = _measure("прежний (последовательно)",
+                      lambda: _legacy_analyze_sberbank_driver(analyzer, driver_dir, target_date))
+    streaming = _measure("потоковый (пул процессов)",
+                         lambda: analyzer.analyze_sberbank_driver(driver_dir, target_date))
+
+    legacy_guids = {t.guid for t in legacy}
+    streaming_guids = {t.guid for t in streaming}
+    print(f"Набор GUID совпадает: {'да' if legacy_guids == streaming_guids else 'нет'}")
+
+
+def benchmark_seek(log_path: str, target_date: str):
+    """Полное чтение лога против перехода к целевой дате по индексу меток времени"""
+    size_mb = os.path.getsize(log_path) / 1024 / 1024
+    print(f"Файл: {log_path} ({size_mb:.1f} МБ), дата: {target_date}")
+
+    def full_scan():
+        parser = InpasLogParser(target_date)
+        with open(log_path, 'r', encoding=parser.encoding, errors='ignore') as f:
+            return list(parser.parse_lines(f))
+
+    full = _measure("полное чтение", full_scan)
+    seek = _measure("индекс + переход (первый)", lambda: list(InpasLogParser(target_date).parse_file(log_path)))
+    _measure("индекс из кэша", lambda: list(InpasLogParser(target_date).parse_file(log_path)))
+
+    seek_index = LogSeekIndex.get(log_path, InpasLogParser(target_date))
+    if seek_index is not None:
+        start, end = seek_index.byte_range(InpasLogParser(target_date).target_date_key())
+        end = os.path.getsize(log_path) if end is None else end
+        print(f"Точек индекса: {len(seek_index.keys)}, прочитано ~{(end - start) / 1024 / 1024:.1f} МБ")
+    print(f"Результаты совпадают: {'да' if [t.rrn for t in full] == [t.rrn for t in seek] else 'нет'}")
+
+
+def benchmark_evtx(evtx_path: str):
+    """Чтение BinXml с фильтром до рендеринга против рендеринга XML через python-evtx"""
+    analyzer = BasicMechanismsAnalyzer()
+    size_mb = os.path.getsize(evtx_path) / 1024 / 1024
+    print(f"Журнал: {evtx_path} ({size_mb:.1f} МБ), коды: {', '.join(analyzer.default_patterns)}")
+
+    native = _measure("BinXml (фильтр до XML)", lambda: analyzer._parse_binary_evtx(evtx_path, "Журнал системы"))
+    if not analyzer.has_evtx:
+        print("python-evtx не установлен, сравнение с рендерингом XML пропущено")
+        return
+
+    rendered = _measure("python-evtx + XML", lambda: analyzer._parse_rendered_evtx(evtx_path, "Журнал системы"))
+    native_keys = {(e.timestamp[:19], e.event_code, e.source, e.description) for e in native}
+    rendered_keys = {(e.timestamp[:19], e.event_code, e.source, e.description) for e in rendered}
+    print(f"События совпадают: {'да' if native_keys == rendered_keys else 'нет'}")
+
+
+def benchmark_evtx_parallel(evtx_paths: List[str], workers_list: List[int]):
+    """Масштабирование разбора EVTX по чанкам в зависимости от числа процессов"""
+    analyzer = BasicMechanismsAnalyzer()
+    event_ids = analyzer._pattern_event_ids()
+    print(f"Ядер: {os.cpu_count()}")
+
+    for evtx_path in evtx_paths:
+        size_mb = os.path.getsize(evtx_path) / 1024 / 1024
+        print(f"\nЖурнал: {evtx_path} ({size_mb:.1f} МБ)")
+
+        baseline = None
+        reference = None
+        for workers in workers_list:
+            started = time.perf_counter()
+            records = read_records_concurrently(evtx_path, event_ids, max_workers=workers)
+            elapsed = time.perf_counter() - started
+
+            baseline = baseline or elapsed
+            record_ids = [record.record_id for record in records]
+            if reference is None:
+                reference = record_ids
+            print(f"процессов: {workers:2}   {elapsed:8.3f} с   ускорение x{baseline / elapsed:4.1f}   "
+                  f"{size_mb / elapsed:7.1f} МБ/с   событий: {len(records)}   "
+                  f"порядок {'совпадает' if record_ids == reference else 'НЕ совпадает'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности парсеров логов")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    inpas = subparsers.add_parser("inpas", help="парсер DualConnector (INPAS)")
+    inpas.add_argument("log_path", nargs="?", help="лог DualConnector; без него генерируется синтетический")
+    inpas.add_argument("--date", default="2024-01-15", help="целевая дата YYYY-MM-DD")
+    inpas.add_argument("--slips", type=int, default=50000, help="число чеков в синтетическом логе")
+
+    sberbank = subparsers.add_parser("sberbank", help="парсер sbkernel (Сбербанк)")
+    sberbank.add_argument("driver_dir", nargs="?", help="папка драйвера; без нее генерируется синтетическая")
+    sberbank.add_argument("--date", default="2024-01-15", help="целевая дата YYYY-MM-DD")
+    sberbank.add_argument("--terminals", type=int, default=4, help="число терминалов (подпапок)")
+    sberbank.add_argument("--days", type=int, default=30, help="дней истории в каждом логе")
+
+    seek = subparsers.add_parser("seek", help="переход к дате по индексу меток времени (INPAS)")
+    seek.add_argument("log_path", nargs="?", help="лог DualConnector; без него генерируется синтетический")
+    seek.add_argument("--date", default="2024-01-15", help="целевая дата YYYY-MM-DD")
+    seek.add_argument("--days", type=int, default=365, help="дней истории в синтетическом логе")
+    seek.add_argument("--slips", type=int, default=300, help="чеков в сутки в синтетическом логе")
+
+    evtx = subparsers.add_parser("evtx", help="разбор бинарного журнала Windows (EVTX)")
+    evtx.add_argument("evtx_path", nargs="?", help="файл .evtx; без него генерируется синтетический")
+    evtx.add_argument("--records", type=int, default=100000, help="число записей в синтетическом журнале")
+
+    evtx_parallel = subparsers.add_parser("evtx-parallel", help="параллельный разбор EVTX по чанкам")
+    evtx_parallel.add_argument("evtx_paths", nargs="*", help="файлы .evtx; без них генерируются Application и System")
+    evtx_parallel.add_argument("--size-mb", type=int, default=120, help="размер каждого синтетического журнала")
+    evtx_parallel.add_argument("--workers", default="1,2,4,8", help="список числа процессов через запятую")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "inpas":
+        if args.log_path:
+            benchmark_inpas(args.log_path, args.date)
+        else:
+            with tempfile.TemporaryDirectory(prefix="bench_inpas_") as temp_dir:
+                log_path = os.path.join(temp_dir, "DualConnector.log")
+                generate_inpas_log(log_path, args.date, args.slips)
+                benchmark_inpas(log_path, args.date)
+
+    elif args.command == "sberbank":
+        if args.driver_dir:
+            benchmark_sberbank(args.driver_dir, args.date)
+        else:
+            with tempfile.TemporaryDirectory(prefix="bench_sber_") as temp_dir:
+                generate_sberbank_driver(temp_dir, args.date, args.terminals, args.days)
+                benchmark_sberbank(temp_dir, args.date)
+
+    elif args.command == "seek":
+        if args.log_path:
+            benchmark_seek(args.log_path, args.date)
+        else:
+            with tempfile.TemporaryDirectory(prefix="bench_seek_") as temp_dir:
+                log_path = os.path.join(temp_dir, "DualConnector.log")
+                generate_inpas_history(log_path, args.date, args.days, args.slips)
+                benchmark_seek(log_path, args.date)
+
+    elif args.command == "evtx":
+        if args.evtx_path:
+            benchmark_evtx(args.evtx_path)
+        else:
+            with tempfile.TemporaryDirectory(prefix="bench_evtx_") as temp_dir:
+                evtx_path = os.path.join(temp_dir, "System.evtx")
+                generate_evtx(evtx_path, args.records)
+                benchmark_evtx(evtx_path)
+
+    elif args.command == "evtx-parallel":
+        workers_list = [int(n) for n in args.workers.split(',') if n.strip()]
+        if args.evtx_paths:
+            benchmark_evtx_parallel(args.evtx_paths, workers_list)
+        else:
+            with tempfile.TemporaryDirectory(prefix="bench_evtx_") as temp_dir:
+                evtx_paths = []
+                # ~4300 записей синтетического журнала на мегабайт
+                records = args.size_mb * 4300
+                for seed, channel in enumerate(("Application", "System"), start=1):
+                    evtx_path = os.path.join(temp_dir, f"{channel}.evtx")
+                    generate_evtx(evtx_path, records, channel=channel, days=180, seed=seed)
+                    evtx_paths.append(evtx_path)
+                benchmark_evtx_parallel(evtx_paths, workers_list)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
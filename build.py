@@ -46,7 +46,11 @@ def build_app():
         f'--add-data=update_manager.py{separator}.',
         f'--add-data=marking_analyzer.py{separator}.',
         f'--add-data=basic_mechanisms_analyzer.py{separator}.',
+        f'--add-data=evtx_reader.py{separator}.',
         f'--add-data=payment_terminal_analyzer.py{separator}.',
+        f'--add-data=payment_reconciliation.py{separator}.',
+        f'--add-data=structured_export.py{separator}.',
+        f'--add-data=lazy_text.py{separator}.',
         # Конфигурационный файл
         f'--add-data=config.txt{separator}.',
         # Модули
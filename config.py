@@ -18,9 +18,10 @@ BASE_DIR = Path(__file__).parent
 REPORTS_DIR = BASE_DIR / "reports"
 LOG_DIR = BASE_DIR / "logs"
 TEMP_DIR = BASE_DIR / "temp"
+CACHE_DIR = BASE_DIR / "cache"
 
 # Создаем необходимые директории
-for directory in [REPORTS_DIR, LOG_DIR, TEMP_DIR]:
+for directory in [REPORTS_DIR, LOG_DIR, TEMP_DIR, CACHE_DIR]:
     directory.mkdir(exist_ok=True)
 
 # Настройки логирования
@@ -45,6 +46,12 @@ MONTHS = {
 # Текущий год
 CURRENT_YEAR = datetime.now().year
 
+# SLA по умолчанию: срок работы над ошибкой (дней) по серьезности, меняется в настройках
+DEFAULT_SLA_DAYS = {
+    "Значительная": 14,
+    "Критическая": 1
+}
+
 # Настройки лицензирования
 LICENSE_SERVER_URL = "http://155.212.171.112:5000"
 
@@ -0,0 +1,754 @@
+# evtx_reader.py
+"""
+Чтение бинарных журналов Windows (EVTX) без построения XML
+"""
+
+import os
+import mmap
+import struct
+import logging
+from datetime import datetime, timedelta
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+FILE_MAGIC = b'ElfFile\x00'
+CHUNK_MAGIC = b'ElfChnk\x00'
+RECORD_MAGIC = b'**\x00\x00'
+
+FILE_HEADER_SIZE = 0x1000
+CHUNK_SIZE = 0x10000
+# Заголовок чанка вместе с таблицами строк и шаблонов
+CHUNK_HEADER_SIZE = 0x200
+
+# Токены BinXml (младшие 4 бита; бит 0x40 - признак "есть продолжение")
+_TOKEN_EOF = 0x00
+_TOKEN_OPEN_START = 0x01
+_TOKEN_CLOSE_START = 0x02
+_TOKEN_CLOSE_EMPTY = 0x03
+_TOKEN_END_ELEMENT = 0x04
+_TOKEN_VALUE = 0x05
+_TOKEN_ATTRIBUTE = 0x06
+_TOKEN_CDATA = 0x07
+_TOKEN_CHAR_REF = 0x08
+_TOKEN_ENTITY_REF = 0x09
+_TOKEN_PI_TARGET = 0x0a
+_TOKEN_PI_DATA = 0x0b
+_TOKEN_TEMPLATE_INSTANCE = 0x0c
+_TOKEN_NORMAL_SUBSTITUTION = 0x0d
+_TOKEN_OPTIONAL_SUBSTITUTION = 0x0e
+_TOKEN_FRAGMENT_HEADER = 0x0f
+
+# Типы значений
+_TYPE_NULL = 0x00
+_TYPE_WSTRING = 0x01
+_TYPE_STRING = 0x02
+_TYPE_BOOL = 0x0d
+_TYPE_BINARY = 0x0e
+_TYPE_GUID = 0x0f
+_TYPE_SIZE_T = 0x10
+_TYPE_FILETIME = 0x11
+_TYPE_SYSTEMTIME = 0x12
+_TYPE_SID = 0x13
+_TYPE_HEX32 = 0x14
+_TYPE_HEX64 = 0x15
+_TYPE_BINXML = 0x21
+_TYPE_ARRAY = 0x80
+
+_NUMBER_STRUCTS = {
+    0x03: struct.Struct('<b'),
+    0x04: struct.Struct('<B'),
+    0x05: struct.Struct('<h'),
+    0x06: struct.Struct('<H'),
+    0x07: struct.Struct('<i'),
+    0x08: struct.Struct('<I'),
+    0x09: struct.Struct('<q'),
+    0x0a: struct.Struct('<Q'),
+    0x0b: struct.Struct('<f'),
+    0x0c: struct.Struct('<d'),
+    _TYPE_BOOL: struct.Struct('<I'),
+    _TYPE_FILETIME: struct.Struct('<Q'),
+    _TYPE_HEX32: struct.Struct('<I'),
+    _TYPE_HEX64: struct.Struct('<Q'),
+}
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_RECORD_HEADER = struct.Struct('<4sIQQ')
+_SUBSTITUTION_DESCRIPTOR = struct.Struct('<HBx')
+
+# Поля System, которые читаются до рендеринга: (элемент, атрибут) -> поле записи
+_SYSTEM_FIELDS = {
+    ('Provider', 'Name'): 'provider',
+    ('EventID', None): 'event_id',
+    ('Level', None): 'level',
+    ('TimeCreated', 'SystemTime'): 'time_created',
+    ('Channel', None): 'channel',
+    ('Computer', None): 'computer',
+}
+
+_FILETIME_EPOCH = datetime(1601, 1, 1)
+
+# Интервал времени [начало, конец) в FILETIME; любая граница может быть None
+TimeWindow = Tuple[Optional[int], Optional[int]]
+
+class EvtxFormatError(ValueError):
+    """Нарушена структура файла EVTX"""
+
+def filetime_to_datetime(value: int) -> Optional[datetime]:
+    """FILETIME (100 нс с 01.01.1601, UTC) в datetime"""
+    if not value:
+        return None
+    try:
+        return _FILETIME_EPOCH + timedelta(microseconds=value // 10)
+    except OverflowError:
+        return None
+
+def datetime_to_filetime(value: datetime) -> int:
+    """datetime (UTC, без часового пояса) в FILETIME"""
+    delta = value - _FILETIME_EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10_000_000 + delta.microseconds * 10
+
+def make_time_window(start: Optional[datetime], end: Optional[datetime]) -> Optional[TimeWindow]:
+    """Интервал datetime в FILETIME (None - без ограничения)"""
+    if start is None and end is None:
+        return None
+    return (datetime_to_filetime(start) if start else None,
+            datetime_to_filetime(end) if end else None)
+
+@dataclass
+class EvtxRecord:
+    """Запись журнала: поля System и (для прошедших фильтр) данные события"""
+    record_id: int
+    written_time: int  # FILETIME из заголовка записи
+    event_id: int = 0
+    level: int = 0
+    time_created: Optional[datetime] = None
+    provider: str = ""
+    channel: str = ""
+    computer: str = ""
+    data: List[str] = field(default_factory=list)
+
+    @property
+    def timestamp(self) -> Optional[datetime]:
+        return self.time_created or filetime_to_datetime(self.written_time)
+
+class _TemplateSpec:
+    """Разобранный шаблон: где в массиве подстановок лежат нужные поля.
+
+    Элемент списков - пара (является_подстановкой, индекс или текст литерала).
+    """
+
+    __slots__ = ('fields', 'data', 'content')
+
+    def __init__(self):
+        self.fields: Dict[str, Tuple[bool, object]] = {}
+        self.data: List[Tuple[bool, object]] = []     # содержимое EventData/UserData
+        self.content: List[Tuple[bool, object]] = []  # все текстовое содержимое
+
+class EvtxChunk:
+    """Чанк EVTX (64 КБ) со своими таблицами строк и шаблонов.
+
+    Шаблон разбирается один раз на чанк; для каждой записи читается только
+    массив подстановок. Описание события декодируется лишь для записей,
+    которые принял фильтр accept (он получает запись с заполненными полями
+    System).
+    """
+
+    def __init__(self, data: bytes, index: int = 0):
+        if data[:8] != CHUNK_MAGIC:
+            raise EvtxFormatError("Нет сигнатуры чанка")
+        self.data = data
+        self.index = index
+        self.first_record_id, self.last_record_id = struct.unpack_from('<QQ', data, 0x18)
+        self.free_space_offset = _U32.unpack_from(data, 0x30)[0]
+        self._names: Dict[int, str] = {}
+        self._templates: Dict[int, _TemplateSpec] = {}
+
+    def records(self, accept: Optional[Callable[[EvtxRecord], bool]] = None,
+                event_ids: Optional[Set[int]] = None,
+                time_window: Optional[TimeWindow] = None,
+                levels: Optional[Set[int]] = None) -> Iterator[EvtxRecord]:
+        """Записи чанка.
+
+        time_window проверяется по времени записи из ее заголовка, до чтения
+        BinXml; event_ids отсекает записи сразу после чтения EventID (кроме
+        записей с уровнем из levels), accept - после чтения остальных полей
+        System. Данные события декодируются только для записей, прошедших
+        все фильтры.
+        """
+        data = self.data
+        end = min(self.free_space_offset, CHUNK_SIZE)
+        pos = CHUNK_HEADER_SIZE
+        window_start, window_end = time_window or (None, None)
+
+        while pos + 24 <= end:
+            magic, size, record_id, written_time = _RECORD_HEADER.unpack_from(data, pos)
+            if magic != RECORD_MAGIC or size < 28 or pos + size > CHUNK_SIZE:
+                break
+
+            if (window_start is not None and written_time < window_start) or \
+                    (window_end is not None and written_time >= window_end):
+                pos += size
+                continue
+
+            try:
+                record = self._read_record(pos + 24, record_id, written_time, accept, event_ids, levels)
+                if record is not None:
+                    yield record
+            except (EvtxFormatError, struct.error, IndexError, ValueError, OverflowError) as e:
+                logger.debug(f"Запись {record_id} чанка {self.index} пропущена: {e}")
+
+            pos += size
+
+    def _read_record(self, pos: int, record_id: int, written_time: int,
+                     accept: Optional[Callable[[EvtxRecord], bool]],
+                     event_ids: Optional[Set[int]],
+                     levels: Optional[Set[int]] = None) -> Optional[EvtxRecord]:
+        data = self.data
+        if data[pos] & 0x0f == _TOKEN_FRAGMENT_HEADER:
+            pos += 4
+        if data[pos] & 0x0f != _TOKEN_TEMPLATE_INSTANCE:
+            raise EvtxFormatError("Запись не начинается с экземпляра шаблона")
+
+        spec, pos = self._template_instance(pos)
+        values = self._substitutions(pos)
+
+        item = spec.fields.get('event_id')
+        event_id = self._item_value(item, values) if item is not None else None
+        event_id = int(event_id) if event_id is not None else 0
+        if event_ids is not None and event_id not in event_ids:
+            if levels is None:
+                return None
+            item = spec.fields.get('level')
+            level = self._item_value(item, values) if item is not None else None
+            if level is None or int(level) not in levels:
+                return None
+
+        record = EvtxRecord(record_id, written_time, event_id)
+        for name, item in spec.fields.items():
+            if name == 'event_id':
+                continue
+            value = self._item_value(item, values)
+            if value is None:
+                continue
+            if name == 'level':
+                value = int(value) if not isinstance(value, int) else value
+            elif name == 'time_created':
+                if not isinstance(value, datetime):
+                    continue
+            else:
+                value = str(value)
+            setattr(record, name, value)
+
+        if accept is not None and not accept(record):
+            return None
+
+        record.data = [text for item in spec.data for text in self._item_texts(item, values)]
+        return record
+
+    def _template_instance(self, pos: int) -> Tuple[_TemplateSpec, int]:
+        """Шаблон экземпляра в pos и позиция массива подстановок после него"""
+        definition_offset = _U32.unpack_from(self.data, pos + 6)[0]
+        instance_end = pos + 10
+
+        spec = self._templates.get(definition_offset)
+        if spec is None:
+            data_length = _U32.unpack_from(self.data, definition_offset + 0x14)[0]
+            start = definition_offset + 0x18
+            spec = self._compile(start, start + data_length)
+            self._templates[definition_offset] = spec
+
+        if definition_offset > pos:
+            # Определение шаблона записано сразу за экземпляром
+            data_length = _U32.unpack_from(self.data, definition_offset + 0x14)[0]
+            instance_end = definition_offset + 0x18 + data_length
+
+        return spec, instance_end
+
+    def _substitutions(self, pos: int) -> List[Tuple[int, int, int]]:
+        """Массив подстановок: (тип, смещение, размер) каждого значения"""
+        count = _U32.unpack_from(self.data, pos)[0]
+        pos += 4
+        value_pos = pos + 4 * count
+        if value_pos > CHUNK_SIZE:
+            raise EvtxFormatError("Массив подстановок за пределами чанка")
+
+        values = []
+        for size, value_type in _SUBSTITUTION_DESCRIPTOR.iter_unpack(self.data[pos:value_pos]):
+            values.append((value_type, value_pos, size))
+            value_pos += size
+        return values
+
+    def _name(self, offset: int) -> str:
+        name = self._names.get(offset)
+        if name is None:
+            length = _U16.unpack_from(self.data, offset + 6)[0]
+            name = self.data[offset + 8:offset + 8 + 2 * length].decode('utf-16-le', errors='replace')
+            self._names[offset] = name
+        return name
+
+    def _skip_name(self, name_offset: int, token_pos: int, pos: int) -> int:
+        """Пропуск имени, записанного прямо в потоке токенов"""
+        if name_offset > token_pos:
+            length = _U16.unpack_from(self.data, name_offset + 6)[0]
+            return pos + 10 + 2 * length
+        return pos
+
+    def _compile(self, pos: int, end: int) -> _TemplateSpec:
+        """Однократный разбор потока токенов шаблона"""
+        data = self.data
+        spec = _TemplateSpec()
+        stack: List[str] = []
+        attribute = None
+
+        def place(item):
+            if not stack:
+                return
+            in_system = len(stack) >= 2 and stack[-2] == 'System'
+            if attribute is not None:
+                key = (stack[-1], attribute)
+                if in_system and key in _SYSTEM_FIELDS:
+                    spec.fields.setdefault(_SYSTEM_FIELDS[key], item)
+                return
+
+            spec.content.append(item)
+            if in_system:
+                key = (stack[-1], None)
+                if key in _SYSTEM_FIELDS:
+                    spec.fields.setdefault(_SYSTEM_FIELDS[key], item)
+            elif 'EventData' in stack or 'UserData' in stack:
+                spec.data.append(item)
+
+        while pos < end:
+            token = data[pos]
+            kind = token & 0x0f
+
+            if kind == _TOKEN_EOF:
+                break
+            elif kind == _TOKEN_OPEN_START:
+                name_offset = _U32.unpack_from(data, pos + 7)[0]
+                token_pos = pos
+                pos += 15 if token & 0x40 else 11
+                pos = self._skip_name(name_offset, token_pos, pos)
+                stack.append(self._name(name_offset))
+                attribute = None
+            elif kind == _TOKEN_CLOSE_START:
+                pos += 1
+                attribute = None
+            elif kind == _TOKEN_CLOSE_EMPTY or kind == _TOKEN_END_ELEMENT:
+                pos += 1
+                attribute = None
+                if stack:
+                    stack.pop()
+            elif kind == _TOKEN_ATTRIBUTE:
+                name_offset = _U32.unpack_from(data, pos + 1)[0]
+                token_pos = pos
+                pos = self._skip_name(name_offset, token_pos, pos + 5)
+                attribute = self._name(name_offset)
+            elif kind == _TOKEN_VALUE:
+                value_type = data[pos + 1]
+                if value_type != _TYPE_WSTRING:
+                    raise EvtxFormatError(f"Неподдерживаемый тип значения {value_type:#x}")
+                length = _U16.unpack_from(data, pos + 2)[0]
+                place((False, data[pos + 4:pos + 4 + 2 * length].decode('utf-16-le', errors='replace')))
+                pos += 4 + 2 * length
+            elif kind == _TOKEN_NORMAL_SUBSTITUTION or kind == _TOKEN_OPTIONAL_SUBSTITUTION:
+                place((True, _U16.unpack_from(data, pos + 1)[0]))
+                pos += 4
+            elif kind == _TOKEN_CDATA:
+                length = _U16.unpack_from(data, pos + 1)[0]
+                place((False, data[pos + 3:pos + 3 + 2 * length].decode('utf-16-le', errors='replace')))
+                pos += 3 + 2 * length
+            elif kind == _TOKEN_CHAR_REF:
+                place((False, chr(_U16.unpack_from(data, pos + 1)[0])))
+                pos += 3
+            elif kind == _TOKEN_ENTITY_REF or kind == _TOKEN_PI_TARGET:
+                name_offset = _U32.unpack_from(data, pos + 1)[0]
+                token_pos = pos
+                pos = self._skip_name(name_offset, token_pos, pos + 5)
+            elif kind == _TOKEN_PI_DATA:
+                length = _U16.unpack_from(data, pos + 1)[0]
+                pos += 3 + 2 * length
+            elif kind == _TOKEN_FRAGMENT_HEADER:
+                pos += 4
+            else:
+                raise EvtxFormatError(f"Неожиданный токен {token:#x} в шаблоне")
+
+        return spec
+
+    def _item_value(self, item: Tuple[bool, object], values: List[Tuple[int, int, int]]):
+        is_substitution, ref = item
+        if not is_substitution:
+            return ref
+        if ref >= len(values):
+            return None
+        return self._value(*values[ref])
+
+    def _item_texts(self, item: Tuple[bool, object], values: List[Tuple[int, int, int]]) -> List[str]:
+        value = self._item_value(item, values)
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return value
+        return [value_to_text(value)]
+
+    def _value(self, value_type: int, offset: int, size: int):
+        """Значение подстановки в виде объекта Python"""
+        data = self.data
+        if value_type == _TYPE_NULL or size == 0:
+            return None
+        if value_type == _TYPE_WSTRING:
+            return data[offset:offset + size].decode('utf-16-le', errors='replace').rstrip('\x00')
+        if value_type == _TYPE_STRING:
+            return data[offset:offset + size].decode('cp1252', errors='replace').rstrip('\x00')
+
+        number = _NUMBER_STRUCTS.get(value_type)
+        if number is not None:
+            value = number.unpack_from(data, offset)[0]
+            if value_type == _TYPE_BOOL:
+                return bool(value)
+            if value_type == _TYPE_FILETIME:
+                return filetime_to_datetime(value)
+            if value_type == _TYPE_HEX32 or value_type == _TYPE_HEX64:
+                return f"0x{value:x}"
+            return value
+
+        if value_type == _TYPE_BINARY:
+            return data[offset:offset + size].hex().upper()
+        if value_type == _TYPE_GUID:
+            d1, d2, d3 = struct.unpack_from('<IHH', data, offset)
+            tail = data[offset + 8:offset + 16].hex().upper()
+            return f"{{{d1:08X}-{d2:04X}-{d3:04X}-{tail[:4]}-{tail[4:]}}}"
+        if value_type == _TYPE_SIZE_T:
+            fmt = '<Q' if size == 8 else '<I'
+            return f"0x{struct.unpack_from(fmt, data, offset)[0]:x}"
+        if value_type == _TYPE_SYSTEMTIME:
+            year, month, _, day, hour, minute, second, millis = struct.unpack_from('<8H', data, offset)
+            return datetime(year, month, day, hour, minute, second, millis * 1000)
+        if value_type == _TYPE_SID:
+            revision, count = data[offset], data[offset + 1]
+            authority = int.from_bytes(data[offset + 2:offset + 8], 'big')
+            sub_authorities = struct.unpack_from(f'<{count}I', data, offset + 8)
+            return f"S-{revision}-{authority}" + "".join(f"-{sub}" for sub in sub_authorities)
+        if value_type == _TYPE_BINXML:
+            return self._render_fragment(offset, offset + size)
+        if value_type == _TYPE_ARRAY | _TYPE_WSTRING:
+            text = data[offset:offset + size].decode('utf-16-le', errors='replace')
+            return [part for part in text.split('\x00') if part]
+        if value_type & _TYPE_ARRAY:
+            number = _NUMBER_STRUCTS.get(value_type & 0x7f)
+            if number is not None:
+                return [value_to_text(item[0]) for item in number.iter_unpack(data[offset:offset + size])]
+        return data[offset:offset + size].hex().upper()
+
+    def _render_fragment(self, pos: int, end: int) -> List[str]:
+        """Текстовое содержимое вложенного BinXml (подстановка типа 0x21)"""
+        data = self.data
+        if data[pos] & 0x0f == _TOKEN_FRAGMENT_HEADER:
+            pos += 4
+        if data[pos] & 0x0f == _TOKEN_TEMPLATE_INSTANCE:
+            spec, pos = self._template_instance(pos)
+            values = self._substitutions(pos)
+        else:
+            spec = self._compile(pos, end)
+            values = []
+        return [text for item in spec.content for text in self._item_texts(item, values)]
+
+def value_to_text(value) -> str:
+    """Текстовое представление значения подстановки"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ", ".join(value)
+    return str(value)
+
+class EvtxReader:
+    """Последовательное чтение файла EVTX по чанкам"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def chunks(self, time_window: Optional[TimeWindow] = None) -> Iterator[EvtxChunk]:
+        with open(self.file_path, 'rb') as f:
+            header = f.read(FILE_HEADER_SIZE)
+            if header[:8] != FILE_MAGIC:
+                raise EvtxFormatError(f"{self.file_path}: нет сигнатуры ElfFile")
+            yield from _iter_chunks(f, 0, count_chunks(self.file_path), time_window)
+
+    def records(self, accept: Optional[Callable[[EvtxRecord], bool]] = None,
+                event_ids: Optional[Set[int]] = None,
+                time_window: Optional[TimeWindow] = None,
+                levels: Optional[Set[int]] = None) -> Iterator[EvtxRecord]:
+        """Записи всех чанков (фильтры - как в EvtxChunk.records)"""
+        for chunk in self.chunks(time_window):
+            yield from chunk.records(accept, event_ids, time_window, levels)
+
+def _iter_chunks(f, first_chunk: int, last_chunk: int,
+                 time_window: Optional[TimeWindow] = None) -> Iterator[EvtxChunk]:
+    """Чанки [first_chunk, last_chunk) открытого файла.
+
+    При заданном интервале сначала читаются только заголовок чанка и времена
+    первой и последней записи; чанк целиком вне интервала не читается.
+    """
+    window_start, window_end = time_window or (None, None)
+
+    for index in range(first_chunk, last_chunk):
+        chunk_offset = FILE_HEADER_SIZE + index * CHUNK_SIZE
+        f.seek(chunk_offset)
+
+        if time_window is not None:
+            head = f.read(CHUNK_HEADER_SIZE + 24)
+            if len(head) < CHUNK_HEADER_SIZE + 24:
+                break
+            # Незаполненные чанки в конце файла заполнены нулями
+            if head[:8] != CHUNK_MAGIC:
+                continue
+
+            first_time = _U64.unpack_from(head, CHUNK_HEADER_SIZE + 16)[0]
+            last_record_offset = _U32.unpack_from(head, 0x2C)[0]
+            last_time = first_time
+            if CHUNK_HEADER_SIZE < last_record_offset <= CHUNK_SIZE - 24:
+                f.seek(chunk_offset + last_record_offset + 16)
+                last_time = _U64.unpack_from(f.read(8).ljust(8, b'\x00'))[0] or first_time
+
+            if (window_start is not None and last_time < window_start) or \
+                    (window_end is not None and first_time >= window_end):
+                continue
+            f.seek(chunk_offset)
+
+        data = f.read(CHUNK_SIZE)
+        if len(data) < CHUNK_SIZE:
+            break
+        if data[:8] == CHUNK_MAGIC:
+            yield EvtxChunk(data, index)
+
+def count_chunks(file_path: str) -> int:
+    """Число чанков по размеру файла (после заголовка)"""
+    return max(0, (os.path.getsize(file_path) - FILE_HEADER_SIZE) // CHUNK_SIZE)
+
+def read_chunk_range(file_path: str, first_chunk: int, last_chunk: int,
+                     event_ids: Optional[Set[int]] = None,
+                     time_window: Optional[TimeWindow] = None,
+                     levels: Optional[Set[int]] = None) -> List[Tuple[int, List[EvtxRecord]]]:
+    """Чтение чанков [first_chunk, last_chunk) (функция верхнего уровня для пула процессов).
+
+    Возвращает пары (номер первой записи чанка, записи чанка).
+    """
+    result = []
+    with open(file_path, 'rb') as f:
+        for chunk in _iter_chunks(f, first_chunk, last_chunk, time_window):
+            records = list(chunk.records(event_ids=event_ids, time_window=time_window, levels=levels))
+            result.append((chunk.first_record_id, records))
+    return result
+
+def _run_chunk_ranges(executor: ProcessPoolExecutor, file_path: str, ranges: List[Tuple[int, int]],
+                      event_ids: Optional[Set[int]], time_window: Optional[TimeWindow],
+                      levels: Optional[Set[int]]) -> List[List[Tuple[int, List[EvtxRecord]]]]:
+    """Разбор групп чанков в пуле процессов"""
+    futures = [executor.submit(read_chunk_range, file_path, first, last, event_ids, time_window, levels)
+               for first, last in ranges]
+    return [future.result() for future in futures]
+
+def read_records_concurrently(file_path: str, event_ids: Optional[Set[int]] = None,
+                              max_workers: Optional[int] = None,
+                              min_chunks_per_task: int = 16,
+                              time_window: Optional[TimeWindow] = None,
+                              levels: Optional[Set[int]] = None,
+                              executor: Optional[ProcessPoolExecutor] = None) -> List[EvtxRecord]:
+    """Параллельное чтение записей EVTX по группам чанков в пуле процессов.
+
+    Чанки независимы (у каждого свои таблицы строк и шаблонов), поэтому
+    группы подряд идущих чанков разбираются в разных процессах. Результат
+    упорядочивается по номеру первой записи чанка, то есть в порядке записей
+    и для кольцевого журнала. Если пул процессов недоступен, чанки читаются
+    последовательно в текущем процессе.
+
+    executor - общий пул для нескольких журналов: в него отправляются и
+    небольшие файлы, а закрывает его вызывающая сторона.
+    """
+    with open(file_path, 'rb') as f:
+        if f.read(8) != FILE_MAGIC:
+            raise EvtxFormatError(f"{file_path}: нет сигнатуры ElfFile")
+
+    chunk_total = count_chunks(file_path)
+    workers = max_workers or os.cpu_count() or 1
+    task_size = max(min_chunks_per_task, -(-chunk_total // (workers * 4)))
+
+    if executor is None and (workers <= 1 or chunk_total <= task_size):
+        parts = [read_chunk_range(file_path, 0, chunk_total, event_ids, time_window, levels)]
+    else:
+        ranges = [(start, min(start + task_size, chunk_total)) for start in range(0, chunk_total, task_size)]
+        try:
+            if executor is not None:
+                parts = _run_chunk_ranges(executor, file_path, ranges, event_ids, time_window, levels)
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as own_executor:
+                    parts = _run_chunk_ranges(own_executor, file_path, ranges, event_ids, time_window, levels)
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(f"Пул процессов недоступен, последовательное чтение {file_path}: {e}")
+            parts = [read_chunk_range(file_path, 0, chunk_total, event_ids, time_window, levels)]
+
+    chunks = [chunk for part in parts for chunk in part]
+    chunks.sort(key=lambda chunk: chunk[0])
+    return [record for _, records in chunks for record in records]
+
+# Позиции полей в массиве подстановок стандартного шаблона System событий Windows
+_SYSTEM_LEVEL_INDEX = 0
+_SYSTEM_EVENT_ID_INDEX = 3
+_SYSTEM_TIME_CREATED_INDEX = 6
+_SYSTEM_PROVIDER_INDEX = 14
+# С этого индекса идут данные события
+_SYSTEM_DATA_INDEX = 17
+
+# Заголовок фрагмента BinXml, с которого начинается определение шаблона
+_FRAGMENT_HEADER = b'\x0f\x01\x01\x00'
+
+def scan_records(file_path: str, event_ids: Optional[Set[int]] = None,
+                 time_window: Optional[TimeWindow] = None,
+                 levels: Optional[Set[int]] = None) -> Iterator[EvtxRecord]:
+    """Поиск записей по сигнатуре **\\0\\0 без опоры на заголовки файла и чанков.
+
+    Резервный разбор поврежденных и вырезанных журналов. Файл отображается в
+    память, запись принимается, если ее размер повторен в последних 4 байтах.
+    Если на границе чанка записи цела сигнатура ElfChnk, поля читаются по
+    шаблону, как в EvtxChunk; иначе - по позициям стандартного шаблона System
+    в массиве подстановок, а данные события - из строк UTF-16 подстановок.
+    Фильтры - как в EvtxChunk.records.
+    """
+    window_start, window_end = time_window or (None, None)
+
+    with open(file_path, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Пустой файл
+            return
+
+    with buf:
+        total = len(buf)
+        chunks: Dict[int, Optional[EvtxChunk]] = {}
+        pos = buf.find(RECORD_MAGIC)
+
+        while pos != -1 and pos + 28 <= total:
+            size = _U32.unpack_from(buf, pos + 4)[0]
+            if size < 28 or size > CHUNK_SIZE - CHUNK_HEADER_SIZE or pos + size > total or \
+                    _U32.unpack_from(buf, pos + size - 4)[0] != size:
+                pos = buf.find(RECORD_MAGIC, pos + 1)
+                continue
+
+            _, _, record_id, written_time = _RECORD_HEADER.unpack_from(buf, pos)
+            if (window_start is None or written_time >= window_start) and \
+                    (window_end is None or written_time < window_end):
+                record = _scan_record(buf, pos, size, record_id, written_time, chunks, event_ids, levels)
+                if record is not None:
+                    yield record
+
+            pos = buf.find(RECORD_MAGIC, pos + size)
+
+def _scan_record(buf, pos: int, size: int, record_id: int, written_time: int,
+                 chunks: Dict[int, Optional['EvtxChunk']],
+                 event_ids: Optional[Set[int]], levels: Optional[Set[int]]) -> Optional[EvtxRecord]:
+    """Запись, найденная сканером: по шаблону чанка или по массиву подстановок"""
+    chunk_base, chunk = _scan_chunk(buf, pos, chunks)
+    if chunk is not None:
+        try:
+            return chunk._read_record(pos - chunk_base + 24, record_id, written_time, None, event_ids, levels)
+        except (EvtxFormatError, struct.error, IndexError, ValueError, OverflowError) as e:
+            logger.debug(f"Запись {record_id}: шаблон чанка не прочитан ({e}), разбор подстановок")
+
+    try:
+        return _record_from_substitutions(buf, pos + 24, pos + size - 4, record_id, written_time,
+                                          event_ids, levels)
+    except (struct.error, IndexError, ValueError, OverflowError) as e:
+        logger.debug(f"Запись {record_id} пропущена: {e}")
+        return None
+
+def _scan_chunk(buf, pos: int, chunks: Dict[int, Optional['EvtxChunk']]) -> Tuple[int, Optional['EvtxChunk']]:
+    """Чанк записи с целой сигнатурой: выравнивание от заголовка файла или от начала (вырезанные чанки)"""
+    for base in (pos - (pos - FILE_HEADER_SIZE) % CHUNK_SIZE, pos - pos % CHUNK_SIZE):
+        if base < 0 or pos - base < CHUNK_HEADER_SIZE:
+            continue
+        if base not in chunks:
+            if len(chunks) > 4:
+                chunks.clear()
+            data = buf[base:base + CHUNK_SIZE]
+            chunks[base] = EvtxChunk(data, base // CHUNK_SIZE) \
+                if len(data) == CHUNK_SIZE and data[:8] == CHUNK_MAGIC else None
+        if chunks[base] is not None:
+            return base, chunks[base]
+    return 0, None
+
+def _raw_substitutions(buf, pos: int, end: int) -> Optional[List[Tuple[int, int, int]]]:
+    """Массив подстановок экземпляра шаблона без разбора самого шаблона"""
+    if buf[pos] & 0x0f == _TOKEN_FRAGMENT_HEADER:
+        pos += 4
+    if pos >= end or buf[pos] & 0x0f != _TOKEN_TEMPLATE_INSTANCE:
+        return None
+    pos += 10
+
+    # Определение шаблона, записанное в самой записи: 24 байта заголовка и BinXml
+    if buf[pos + 24:pos + 28] == _FRAGMENT_HEADER:
+        pos += 24 + _U32.unpack_from(buf, pos + 20)[0]
+    if pos + 4 > end:
+        return None
+
+    count = _U32.unpack_from(buf, pos)[0]
+    value_pos = pos + 4 + 4 * count
+    if count == 0 or value_pos > end:
+        return None
+
+    values = []
+    for value_size, value_type in _SUBSTITUTION_DESCRIPTOR.iter_unpack(buf[pos + 4:value_pos]):
+        if value_pos + value_size > end:
+            return None
+        values.append((value_type, value_pos, value_size))
+        value_pos += value_size
+    return values
+
+def _record_from_substitutions(buf, pos: int, end: int, record_id: int, written_time: int,
+                               event_ids: Optional[Set[int]],
+                               levels: Optional[Set[int]]) -> Optional[EvtxRecord]:
+    """Запись по позициям стандартного шаблона System (None - не похоже на событие или не прошла фильтр)"""
+    values = _raw_substitutions(buf, pos, end)
+    if values is None or len(values) <= _SYSTEM_PROVIDER_INDEX:
+        return None
+
+    id_type, id_offset, _ = values[_SYSTEM_EVENT_ID_INDEX]
+    time_type, time_offset, _ = values[_SYSTEM_TIME_CREATED_INDEX]
+    if id_type != 0x06 or time_type != _TYPE_FILETIME:
+        return None
+
+    event_id = _U16.unpack_from(buf, id_offset)[0]
+    level_type, level_offset, level_size = values[_SYSTEM_LEVEL_INDEX]
+    level = buf[level_offset] if level_type == 0x04 and level_size else 0
+    if event_ids is not None and event_id not in event_ids and (levels is None or level not in levels):
+        return None
+
+    record = EvtxRecord(record_id, written_time, event_id, level)
+    record.time_created = filetime_to_datetime(_U64.unpack_from(buf, time_offset)[0])
+    provider_type, provider_offset, provider_size = values[_SYSTEM_PROVIDER_INDEX]
+    if provider_type == _TYPE_WSTRING:
+        record.provider = buf[provider_offset:provider_offset + provider_size].decode(
+            'utf-16-le', errors='replace').rstrip('\x00')
+    record.data = _utf16_texts(buf, values[_SYSTEM_DATA_INDEX:])
+    return record
+
+def _utf16_texts(buf, values: List[Tuple[int, int, int]]) -> List[str]:
+    """Строки UTF-16 из подстановок, включая вложенные фрагменты BinXml"""
+    texts = []
+    for value_type, offset, size in values:
+        if value_type == _TYPE_WSTRING or value_type == _TYPE_ARRAY | _TYPE_WSTRING:
+            text = buf[offset:offset + size].decode('utf-16-le', errors='replace')
+            texts.extend(part for part in text.split('\x00') if part)
+        elif value_type == _TYPE_BINXML and size:
+            nested = _raw_substitutions(buf, offset, offset + size)
+            if nested:
+                texts.extend(_utf16_texts(buf, nested))
+    return texts
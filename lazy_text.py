@@ -0,0 +1,74 @@
+# lazy_text.py
+"""
+Отложенное форматирование текстовых отчетов анализа.
+
+Потоки анализа кладут в результат не готовую строку, а LazyText с функцией
+форматирования (format_*_result) и ее аргументами. Текст строится только
+при показе (chunks) или экспорте (write_to) и передается в виджет и в файл
+порциями; табличные результаты, которые не показываются текстом, так и не
+форматируются, если их не экспортируют.
+"""
+
+from typing import Callable, Iterator, List, Optional, Union, TextIO
+
+class LazyText:
+    """Текст, который строится при первом обращении"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, render: Callable[..., str], *args):
+        self._render = render
+        self._args = args
+        self._text: Optional[str] = None
+
+    @classmethod
+    def join(cls, parts: List[Union['LazyText', str]], separator: str = "\n\n") -> 'LazyText':
+        """Объединение нескольких отчетов; пустые части пропускаются.
+
+        Тексты частей не сохраняются в самих частях, а после объединения
+        объединенный текст не держит и ссылки на части.
+        """
+        parts = list(parts)
+
+        def render():
+            texts = [part._build() if isinstance(part, LazyText) else part for part in parts]
+            parts.clear()
+            return separator.join(text for text in texts if text)
+        return cls(render)
+
+    @property
+    def is_rendered(self) -> bool:
+        return self._text is not None
+
+    def _build(self) -> str:
+        """Текст без сохранения (для объединения)"""
+        return self._text if self._text is not None else self._render(*self._args)
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._render(*self._args)
+            # Аргументы (списки записей) больше не нужны
+            self._render = None
+            self._args = ()
+        return self._text
+
+    def chunks(self, size: int = CHUNK_SIZE) -> Iterator[str]:
+        """Текст порциями около size символов, разрез по концу строки"""
+        text = self.text()
+        start = 0
+        while start < len(text):
+            end = start + size
+            if end < len(text):
+                newline = text.rfind('\n', start, end)
+                if newline >= start:
+                    end = newline + 1
+            yield text[start:end]
+            start = end
+
+    def write_to(self, f: TextIO):
+        """Запись текста в открытый файл порциями"""
+        for chunk in self.chunks():
+            f.write(chunk)
+
+    def __str__(self) -> str:
+        return self.text()
@@ -30,7 +30,8 @@ class LogEntry:
 class ReceiptOperation:
     """Класс для представления операции с чеком - УЛУЧШЕННАЯ ВЕРСИЯ 1.4.1"""
     def __init__(self, time: str, print_status: str, amount: str, fiscal_type: str, 
-                 sale_number: str, operation_type: str, payment_method: str, rnm: str):
+                 sale_number: str, operation_type: str, payment_method: str, rnm: str,
+                 card_sum: float = 0.0):
         self.time = time
         self.print_status = print_status
         self.amount = amount
@@ -39,6 +40,7 @@ class ReceiptOperation:
         self.operation_type = operation_type
         self.payment_method = payment_method
         self.rnm = rnm
+        self.card_sum = card_sum  # BankCardSum, руб.
     
     def to_table_row(self) -> List[str]:
         """Преобразование в строку таблицы"""
@@ -269,6 +271,15 @@ class SupportLogAnalyzer:
             self.logger.warning(f"Ошибка парсинга способа оплаты: {e}")
             return "Не удалось определить"
     
+    def _parse_card_sum(self, line: str) -> float:
+        """Извлечение суммы оплаты картой (BankCardSum)"""
+        try:
+            bank_card_match = re.search(r'"BankCardSum":(\d+\.?\d*)', line)
+            return float(bank_card_match.group(1)) if bank_card_match else 0.0
+        except Exception as e:
+            self.logger.warning(f"Ошибка парсинга суммы по карте: {e}")
+            return 0.0
+    
     def _parse_rnm(self, line: str) -> str:
         """Извлечение РНМ из строки лога"""
         try:
@@ -333,11 +344,13 @@ class SupportLogAnalyzer:
                             operation_type = self._parse_operation_type(line)
                             payment_method = self._parse_payment_method(line)
                             rnm = self._parse_rnm(line)
+                            card_sum = self._parse_card_sum(line)
                             
                             # Создаем объект операции
                             operation = ReceiptOperation(
                                 time_part, status, sum_text, fiscal_text,
-                                sale_number, operation_type, payment_method, rnm
+                                sale_number, operation_type, payment_method, rnm,
+                                card_sum
                             )
                             operations.append(operation)
             except Exception as e:
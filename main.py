@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from pathlib import Path
 from PyQt5.QtWidgets import QApplication
 import logging
@@ -96,4 +97,6 @@ def main():
             return 1
 
 if __name__ == "__main__":
+    # Нужно для пула процессов в собранном PyInstaller exe
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
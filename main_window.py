@@ -16,26 +16,28 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QStackedWidget, QListWidget, QListWidgetItem,
                              QFormLayout, QDialog, QDateEdit, QCheckBox,
                              QTableWidget, QTableWidgetItem, QHeaderView,
-                             QToolButton, QRadioButton, QButtonGroup, QSplitter)
+                             QToolButton, QRadioButton, QButtonGroup, QSplitter,
+                             QProgressDialog)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings, QTimer, QUrl
-from PyQt5.QtGui import QFont, QColor, QDesktopServices, QIcon
+from PyQt5.QtGui import QFont, QColor, QDesktopServices, QIcon, QTextCursor
 
 from analyzer import ErrorAnalyzer
-from report_generator import ReportGenerator
-from pdf_generator import PDFReportGenerator
+from report_generator import ReportGenerator, TrendReportGenerator, ComparisonReportGenerator
+from pdf_generator import PDFReportGenerator, TrendPDFReportGenerator, comparison_pack_jobs
 from license_client import LicenseClient
 from license_window import LicenseDialog
 from config import DEPARTMENTS, MONTHS, CURRENT_YEAR, APP_VERSION, CONTACT_INFO
 from update_manager import UpdateManager, UpdateChecker
 from log_analyzer import SupportLogAnalyzer
 from marking_analyzer import MarkingLogAnalyzer
-from basic_mechanisms_analyzer import BasicMechanismsAnalyzer
+from basic_mechanisms_analyzer import BasicMechanismsAnalyzer, journal_title
+from lazy_text import LazyText
 from payment_terminal_analyzer import PaymentTerminalAnalyzer
 from modules.settings_manager import SettingsManager
 from modules.log_downloader import LogDownloader
 
 # Импортируем модули с компонентами
-from ui_components.dialogs import OperationsHelpDialog, UpdateDialog
+from ui_components.dialogs import OperationsHelpDialog, UpdateDialog, DepartmentFilesDialog
 from ui_components.threads import (AnalysisThread, ServerCheckThread, LogAnalysisThread, 
                                    MarkingAnalysisThread, BasicMechanismsThread, PaymentTerminalThread)
 from ui_components.pages import (create_home_page, create_error_analyzer_page, 
@@ -59,6 +61,10 @@ class MainWindow(QMainWindow):
         self.logger = logging.getLogger(__name__)
         self.current_file = None
         self.analysis_result = None
+        self.error_cube = None
+        self.trend_result = None
+        self.comparison_result = None
+        self._text_streams = {}
         self.current_log_archive = None
         self.current_log_analysis_result = None
         self.current_marking_archive = None
@@ -315,6 +321,43 @@ class MainWindow(QMainWindow):
         last_check = self.settings_manager.get_last_update_check()
         if last_check:
             self.last_update_check_label.setText(f"Дата последней проверки: {last_check}")
+        
+        self._fill_sla_table(self.settings_manager.get_sla_limits())
+    
+    def _fill_sla_table(self, limits):
+        """Заполнение таблицы SLA на странице настроек"""
+        self.sla_table.setRowCount(0)
+        for seriousness, days in limits.items():
+            row = self.sla_table.rowCount()
+            self.sla_table.insertRow(row)
+            self.sla_table.setItem(row, 0, QTableWidgetItem(seriousness))
+            self.sla_table.setItem(row, 1, QTableWidgetItem(str(days)))
+    
+    def _save_sla_settings(self):
+        """Сохранение таблицы SLA из настроек"""
+        limits = {}
+        for row in range(self.sla_table.rowCount()):
+            name_item = self.sla_table.item(row, 0)
+            days_item = self.sla_table.item(row, 1)
+            seriousness = name_item.text().strip() if name_item else ""
+            days_text = days_item.text().strip() if days_item else ""
+            if not seriousness and not days_text:
+                continue
+            if not seriousness or not days_text.isdigit():
+                self._show_silent_message(
+                    "Ошибка",
+                    f"Строка {row + 1}: укажите серьезность и целое число дней"
+                )
+                return
+            limits[seriousness] = int(days_text)
+        
+        self.settings_manager.set_sla_limits(limits)
+        self._fill_sla_table(limits)
+        self.ready_status.setText("Таблица SLA сохранена")
+        
+        # Текущий отчет пересчитывается по кубу с новыми лимитами
+        if self.error_cube is not None:
+            self._apply_error_filters()
     
     def _on_auto_update_changed(self, state):
         """Обработчик изменения настройки автообновления"""
@@ -559,8 +602,13 @@ class MainWindow(QMainWindow):
             self.month_combo.setEnabled(enabled)
         if hasattr(self, 'analyze_btn'):
             self.analyze_btn.setEnabled(enabled and self.current_file is not None)
+        if hasattr(self, 'trend_btn'):
+            self.trend_btn.setEnabled(enabled)
+        if hasattr(self, 'comparison_btn'):
+            self.comparison_btn.setEnabled(enabled)
         if hasattr(self, 'export_btn'):
-            self.export_btn.setEnabled(enabled and self.analysis_result is not None)
+            self.export_btn.setEnabled(enabled and (self.analysis_result is not None or self.trend_result is not None
+                                                    or self.comparison_result is not None))
     
     def _show_license_dialog(self, required=False):
         """Показать диалог активации лицензии"""
@@ -793,7 +841,8 @@ class MainWindow(QMainWindow):
         self.analysis_thread = AnalysisThread(
             self.current_file,
             self.department_combo.currentText(),
-            self.month_combo.currentText()
+            self.month_combo.currentText(),
+            self.settings_manager.get_sla_limits()
         )
         
         self.analysis_thread.analysis_finished.connect(self._on_analysis_finished)
@@ -802,15 +851,160 @@ class MainWindow(QMainWindow):
         
         self.analysis_thread.start()
     
+    def _start_trend_analysis(self):
+        """Запуск анализа тренда по выгрузкам за несколько месяцев"""
+        if not self.license_client.is_license_active():
+            self._show_silent_message(
+                "Лицензия не активирована",
+                "Для выполнения анализа необходимо активировать лицензию."
+            )
+            self._show_license_dialog()
+            return
+        
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Выберите выгрузки за несколько месяцев",
+            "",
+            "Excel Files (*.xlsx *.xls);;All Files (*)"
+        )
+        
+        if not file_paths:
+            return
+        
+        if len(file_paths) < 2:
+            self._show_silent_message("Ошибка", "Для тренда выберите выгрузки минимум за два месяца")
+            return
+        
+        validation = self.license_client.validate_license()
+        if not validation.get('valid'):
+            self._show_silent_message(
+                "Проблема с лицензией",
+                f"Не удалось проверить лицензию:\n{validation.get('error')}\n\nПожалуйста, активируйте лицензию заново."
+            )
+            self._show_license_dialog()
+            return
+        
+        from analyzer import exports_by_month
+        exports = exports_by_month(file_paths)
+        
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.analyze_btn.setEnabled(False)
+        self.trend_btn.setEnabled(False)
+        self.ready_status.setText(f"Выполняется анализ тренда: {', '.join(exports)}...")
+        
+        from ui_components.threads import TrendAnalysisThread
+        self.trend_analysis_thread = TrendAnalysisThread(exports, self.settings_manager.get_sla_limits())
+        
+        self.trend_analysis_thread.analysis_finished.connect(self._on_trend_analysis_finished)
+        self.trend_analysis_thread.analysis_error.connect(self._on_analysis_error)
+        self.trend_analysis_thread.progress_updated.connect(self.progress_bar.setValue)
+        
+        self.trend_analysis_thread.start()
+    
+    def _on_trend_analysis_finished(self, result):
+        """Обработка завершения анализа тренда"""
+        self.trend_result = result
+        self.analysis_result = None
+        self.comparison_result = None
+        self._set_error_cube(None)
+        self.progress_bar.setVisible(False)
+        self.analyze_btn.setEnabled(self.current_file is not None)
+        self.trend_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.ready_status.setText("Анализ тренда завершен")
+        
+        try:
+            self.text_report.setPlainText(TrendReportGenerator(result, CURRENT_YEAR).generate_text_report())
+        except Exception as e:
+            self.logger.error(f"Ошибка генерации отчета по тренду: {e}")
+            self._show_silent_message("Ошибка", f"Ошибка при генерации отчетов: {e}")
+        
+        tabs = self.error_analyzer_page.findChild(QTabWidget)
+        if tabs:
+            tabs.setCurrentIndex(1)
+        
+        self.logger.info(f"Анализ тренда завершен: {', '.join(result['months'])}")
+    
+    def _start_department_comparison(self):
+        """Запуск сравнения отделов по выгрузкам за выбранный месяц"""
+        if not self.license_client.is_license_active():
+            self._show_silent_message(
+                "Лицензия не активирована",
+                "Для выполнения анализа необходимо активировать лицензию."
+            )
+            self._show_license_dialog()
+            return
+        
+        dialog = DepartmentFilesDialog(self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        exports = dialog.selected_exports()
+        
+        validation = self.license_client.validate_license()
+        if not validation.get('valid'):
+            self._show_silent_message(
+                "Проблема с лицензией",
+                f"Не удалось проверить лицензию:\n{validation.get('error')}\n\nПожалуйста, активируйте лицензию заново."
+            )
+            self._show_license_dialog()
+            return
+        
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.analyze_btn.setEnabled(False)
+        self.trend_btn.setEnabled(False)
+        self.comparison_btn.setEnabled(False)
+        self.ready_status.setText(f"Выполняется сравнение отделов: {len(exports)}...")
+        
+        from ui_components.threads import ComparisonAnalysisThread
+        self.comparison_thread = ComparisonAnalysisThread(exports, self.settings_manager.get_sla_limits())
+        
+        self.comparison_thread.analysis_finished.connect(self._on_comparison_finished)
+        self.comparison_thread.analysis_error.connect(self._on_analysis_error)
+        self.comparison_thread.progress_updated.connect(self.progress_bar.setValue)
+        
+        self.comparison_thread.start()
+    
+    def _on_comparison_finished(self, result):
+        """Обработка завершения сравнения отделов"""
+        self.comparison_result = result
+        self.analysis_result = None
+        self.trend_result = None
+        self._set_error_cube(None)
+        self.progress_bar.setVisible(False)
+        self.analyze_btn.setEnabled(self.current_file is not None)
+        self.trend_btn.setEnabled(True)
+        self.comparison_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.ready_status.setText("Сравнение отделов завершено")
+        
+        try:
+            self.text_report.setPlainText(ComparisonReportGenerator(
+                result, self.month_combo.currentText(), CURRENT_YEAR
+            ).generate_text_report())
+        except Exception as e:
+            self.logger.error(f"Ошибка генерации отчета сравнения: {e}")
+            self._show_silent_message("Ошибка", f"Ошибка при генерации отчетов: {e}")
+        
+        tabs = self.error_analyzer_page.findChild(QTabWidget)
+        if tabs:
+            tabs.setCurrentIndex(1)
+        
+        self.logger.info(f"Сравнение отделов завершено: {len(result['departments'])}")
+    
     def _on_analysis_finished(self, result):
         """Обработка завершения анализа ошибок"""
-        self.analysis_result = result
+        self.analysis_result = result['analysis']
+        self.trend_result = None
+        self.comparison_result = None
+        self._set_error_cube(result['cube'])
         self.progress_bar.setVisible(False)
         self.analyze_btn.setEnabled(True)
         self.export_btn.setEnabled(True)
         self.ready_status.setText("Анализ завершен")
         
-        self._generate_reports(result)
+        self._generate_reports(self.analysis_result)
         
         tabs = self.error_analyzer_page.findChild(QTabWidget)
         if tabs:
@@ -821,7 +1015,9 @@ class MainWindow(QMainWindow):
     def _on_analysis_error(self, error_message):
         """Обработка ошибки анализа"""
         self.progress_bar.setVisible(False)
-        self.analyze_btn.setEnabled(True)
+        self.analyze_btn.setEnabled(self.current_file is not None)
+        self.trend_btn.setEnabled(True)
+        self.comparison_btn.setEnabled(True)
         self.ready_status.setText("Ошибка анализа")
         
         self._show_silent_message(
@@ -831,6 +1027,40 @@ class MainWindow(QMainWindow):
         
         self.logger.error(f"Ошибка анализа: {error_message}")
     
+    def _set_error_cube(self, cube):
+        """Куб выгрузки для фильтров: заполнение списков значений"""
+        self.error_cube = cube
+        for column, combo in self.error_filter_combos.items():
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem("Все")
+            if cube is not None:
+                combo.addItems(cube.values(column))
+            combo.setEnabled(cube is not None)
+            combo.blockSignals(False)
+        self.reset_filters_btn.setEnabled(cube is not None)
+    
+    def _apply_error_filters(self):
+        """Отчет по срезу: фильтры применяются к кубу, DataFrame не используется"""
+        if self.error_cube is None:
+            return
+        
+        filters = {column: [combo.currentText()] for column, combo in self.error_filter_combos.items()
+                   if combo.currentIndex() > 0}
+        self.analysis_result = self.error_cube.filter(**filters).analysis(self.settings_manager.get_sla_limits())
+        self._generate_reports(self.analysis_result)
+        
+        total = self.analysis_result['total_errors']
+        self.ready_status.setText(f"Срез: {total} ошибок" if filters else "Анализ завершен")
+    
+    def _reset_error_filters(self):
+        """Сброс фильтров среза"""
+        for combo in self.error_filter_combos.values():
+            combo.blockSignals(True)
+            combo.setCurrentIndex(0)
+            combo.blockSignals(False)
+        self._apply_error_filters()
+    
     def _generate_reports(self, analysis_data):
         """Генерация текстовых отчетов"""
         try:
@@ -856,7 +1086,7 @@ class MainWindow(QMainWindow):
             self._show_license_dialog()
             return
         
-        if not self.analysis_result:
+        if not self.analysis_result and not self.trend_result and not self.comparison_result:
             self._show_silent_message("Ошибка", "Сначала выполните анализ")
             return
         
@@ -869,22 +1099,39 @@ class MainWindow(QMainWindow):
                 )
                 return
             
-            pdf_generator = PDFReportGenerator(
-                self.analysis_result,
-                self.month_combo.currentText(),
-                CURRENT_YEAR,
-                self.department_combo.currentText()
-            )
-            
-            file_path = pdf_generator.generate_pdf(self)
+            if self.comparison_result:
+                # Сравнение выгружается пакетом: сводный PDF и отчет каждого отдела
+                output_dir = QFileDialog.getExistingDirectory(self, "Папка для пакета отчетов по отделам")
+                if not output_dir:
+                    return
+                
+                self._start_pdf_export(comparison_pack_jobs(
+                    self.comparison_result,
+                    self.month_combo.currentText(),
+                    CURRENT_YEAR,
+                    output_dir
+                ))
+                return
             
-            if file_path:
-                self._show_silent_message(
-                    "Экспорт завершен",
-                    f"✅ PDF отчет успешно сохранен:\n{file_path}"
+            if self.trend_result:
+                pdf_generator = TrendPDFReportGenerator(
+                    self.trend_result,
+                    CURRENT_YEAR,
+                    self.department_combo.currentText()
+                )
+            else:
+                pdf_generator = PDFReportGenerator(
+                    self.analysis_result,
+                    self.month_combo.currentText(),
+                    CURRENT_YEAR,
+                    self.department_combo.currentText()
                 )
-                
-                self.logger.info(f"PDF отчет сохранен: {file_path}")
+            
+            file_path = pdf_generator.ask_file_path(self)
+            if not file_path:
+                return
+            
+            self._start_pdf_export([(pdf_generator, file_path)])
             
         except Exception as e:
             self.logger.error(f"Ошибка экспорта в PDF: {e}")
@@ -893,6 +1140,133 @@ class MainWindow(QMainWindow):
                 f"Не удалось экспортировать отчет в PDF:\n{str(e)}"
             )
 
+    def _start_pdf_export(self, jobs):
+        """Сборка PDF в фоновом потоке: окно не блокируется, сборку можно отменить"""
+        from ui_components.threads import PDFExportThread
+        
+        self.export_btn.setEnabled(False)
+        self.pdf_progress = QProgressDialog("Создание PDF отчета...", "Отмена", 0, 100, self)
+        self.pdf_progress.setWindowTitle("Экспорт в PDF")
+        self.pdf_progress.setWindowModality(Qt.WindowModal)
+        self.pdf_progress.setAutoClose(False)
+        self.pdf_progress.setAutoReset(False)
+        
+        self.pdf_export_thread = PDFExportThread(jobs)
+        self.pdf_export_thread.progress_updated.connect(self.pdf_progress.setValue)
+        self.pdf_export_thread.export_finished.connect(self._on_pdf_export_finished)
+        self.pdf_export_thread.export_error.connect(self._on_pdf_export_error)
+        self.pdf_export_thread.export_cancelled.connect(self._on_pdf_export_cancelled)
+        self.pdf_progress.canceled.connect(self.pdf_export_thread.cancel)
+        
+        self.pdf_progress.show()
+        self.pdf_export_thread.start()
+    
+    def _finish_pdf_export(self):
+        self.pdf_progress.close()
+        self.export_btn.setEnabled(True)
+    
+    def _on_pdf_export_finished(self, file_paths):
+        """Обработка завершения сборки PDF"""
+        self._finish_pdf_export()
+        files_text = "\n".join(file_paths)
+        self._show_silent_message(
+            "Экспорт завершен",
+            f"✅ PDF отчет успешно сохранен:\n{files_text}"
+        )
+        self.logger.info(f"PDF отчет сохранен: {', '.join(file_paths)}")
+    
+    def _on_pdf_export_cancelled(self):
+        self._finish_pdf_export()
+        self.ready_status.setText("Экспорт в PDF отменен")
+        self.logger.info("Экспорт в PDF отменен пользователем")
+    
+    def _on_pdf_export_error(self, error_message):
+        self._finish_pdf_export()
+        self.logger.error(f"Ошибка экспорта в PDF: {error_message}")
+        self._show_silent_message(
+            "Ошибка экспорта",
+            f"Не удалось экспортировать отчет в PDF:\n{error_message}"
+        )
+
+    def _stream_text(self, text_edit, text):
+        """Вывод отчета в виджет порциями через цикл событий: окно не замирает на больших текстах"""
+        previous = self._text_streams.pop(text_edit, None)
+        if previous is not None:
+            previous.stop()
+        text_edit.clear()
+        
+        chunks = text.chunks()
+        timer = QTimer(self)
+        
+        def insert_next_chunk():
+            chunk = next(chunks, None)
+            if chunk is None:
+                timer.stop()
+                self._text_streams.pop(text_edit, None)
+                text_edit.moveCursor(QTextCursor.Start)
+                return
+            cursor = text_edit.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(chunk)
+        
+        timer.timeout.connect(insert_next_chunk)
+        self._text_streams[text_edit] = timer
+        insert_next_chunk()
+        timer.start(0)
+    
+    def _ask_export_path(self, title, default_name):
+        """Выбор файла экспорта: TXT - текстовый отчет, XLSX/CSV/NDJSON - все записи результата"""
+        from structured_export import EXPORT_FORMATS
+        
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self,
+            title,
+            default_name,
+            ";;".join(["Text Files (*.txt)", *EXPORT_FORMATS.values(), "All Files (*)"])
+        )
+        
+        if not file_path:
+            return ""
+        
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == '.txt' or extension in EXPORT_FORMATS:
+            return file_path
+        
+        # Расширение по выбранному фильтру
+        for format_extension, format_filter in EXPORT_FORMATS.items():
+            if selected_filter == format_filter:
+                return file_path + format_extension
+        return file_path + '.txt'
+    
+    def _start_structured_export(self, sections, file_path):
+        """Экспорт полных результатов в фоновом потоке"""
+        from ui_components.threads import StructuredExportThread
+        
+        self.ready_status.setText(f"Экспорт: {os.path.basename(file_path)}...")
+        self.structured_export_thread = StructuredExportThread(sections, file_path)
+        self.structured_export_thread.rows_written.connect(
+            lambda rows: self.ready_status.setText(f"Экспорт: записано строк {rows}...")
+        )
+        self.structured_export_thread.export_finished.connect(self._on_structured_export_finished)
+        self.structured_export_thread.export_error.connect(self._on_structured_export_error)
+        self.structured_export_thread.start()
+    
+    def _on_structured_export_finished(self, file_paths):
+        files_text = "\n".join(file_paths)
+        self._show_silent_message(
+            "Экспорт завершен",
+            f"✅ Результаты анализа успешно экспортированы:\n{files_text}"
+        )
+        self.ready_status.setText(f"Экспортировано: {', '.join(os.path.basename(path) for path in file_paths)}")
+    
+    def _on_structured_export_error(self, error_message):
+        self.logger.error(f"Ошибка экспорта: {error_message}")
+        self.ready_status.setText("Ошибка экспорта")
+        self._show_silent_message(
+            "Ошибка экспорта",
+            f"Не удалось экспортировать результаты:\n{error_message}"
+        )
+
     # ===== АНАЛИЗ ЛОГОВ ПОДДЕРЖКИ =====
     def _start_log_analysis(self):
         """Запуск анализа логов поддержки"""
@@ -917,6 +1291,7 @@ class MainWindow(QMainWindow):
                 self.current_log_archive,
                 analysis_date
             )
+            self.log_analysis_thread.driver_progress.connect(self.ready_status.setText)
         else:
             # Используем стандартный поток для анализа логов
             from ui_components.threads import LogAnalysisThread
@@ -959,7 +1334,7 @@ class MainWindow(QMainWindow):
         self.operations_summary_label.setVisible(False)
         self.operations_help_btn.setVisible(False)
         
-        self.log_analysis_result_text.setPlainText(result['formatted_text'])
+        self._stream_text(self.log_analysis_result_text, result['formatted_text'])
 
     def _display_receipt_analysis_result(self, result):
         """Отображение результата анализа операций"""
@@ -1020,7 +1395,7 @@ class MainWindow(QMainWindow):
         self.operations_summary_label.setVisible(False)
         self.operations_help_btn.setVisible(False)
         
-        self.log_analysis_result_text.setPlainText(result['formatted_text'])
+        self._stream_text(self.log_analysis_result_text, result['formatted_text'])
         
         # Если есть транзакции INPAS, показываем их в таблице
         if 'inpas_transactions' in result and result['inpas_transactions']:
@@ -1059,7 +1434,7 @@ class MainWindow(QMainWindow):
         self.log_analysis_result_text.setPlainText(f"❌ Ошибка: {error_message}")
 
     def _export_log_analysis(self):
-        """Экспорт результатов анализа логов поддержки в TXT"""
+        """Экспорт результатов анализа логов поддержки в TXT, XLSX, CSV или NDJSON"""
         if not hasattr(self, 'current_log_analysis_result'):
             self._show_silent_message("Ошибка", "Нет результатов для экспорта")
             return
@@ -1073,18 +1448,14 @@ class MainWindow(QMainWindow):
             else:
                 default_name = f"анализ_логов_{timestamp}.txt"
             
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Сохранить результаты анализа",
-                default_name,
-                "Text Files (*.txt);;All Files (*)"
-            )
-            
+            file_path = self._ask_export_path("Сохранить результаты анализа", default_name)
             if not file_path:
                 return
             
             if not file_path.lower().endswith('.txt'):
-                file_path += '.txt'
+                from structured_export import log_analysis_sections
+                self._start_structured_export(log_analysis_sections(self.current_log_analysis_result), file_path)
+                return
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write("=== АНАЛИЗ ЛОГОВ SABY HELPER ===\n\n")
@@ -1092,7 +1463,7 @@ class MainWindow(QMainWindow):
                 f.write(f"Метод анализа: {self.analysis_method_combo.currentText()}\n")
                 f.write(f"Дата логов: {self.analysis_date_edit.date().toString('yyyy-MM-dd')}\n")
                 f.write("\n" + "="*50 + "\n\n")
-                f.write(self.current_log_analysis_result['formatted_text'])
+                self.current_log_analysis_result['formatted_text'].write_to(f)
             
             self._show_silent_message(
                 "Экспорт завершен", 
@@ -1286,7 +1657,7 @@ class MainWindow(QMainWindow):
         self.marking_result_text.setVisible(True)
         
         if logins:
-            self.marking_result_text.setPlainText(result['formatted_text'])
+            self._stream_text(self.marking_result_text, result['formatted_text'])
         else:
             self.marking_result_text.setPlainText("Данных авторизации не найдено")
 
@@ -1337,18 +1708,14 @@ class MainWindow(QMainWindow):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             default_name = f"анализ_маркировки_{timestamp}.txt"
             
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Сохранить результаты анализа маркировки",
-                default_name,
-                "Text Files (*.txt);;All Files (*)"
-            )
-            
+            file_path = self._ask_export_path("Сохранить результаты анализа маркировки", default_name)
             if not file_path:
                 return
             
             if not file_path.lower().endswith('.txt'):
-                file_path += '.txt'
+                from structured_export import marking_sections
+                self._start_structured_export(marking_sections(self.current_marking_analysis_result), file_path)
+                return
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write("=== АНАЛИЗ МАРКИРОВКИ SABY HELPER ===\n\n")
@@ -1356,7 +1723,7 @@ class MainWindow(QMainWindow):
                 f.write(f"Метод анализа: {self.marking_method_combo.currentText()}\n")
                 f.write(f"Принцип работы: {'Devices' if self.devices_radio.isChecked() else 'Console'}\n")
                 f.write("\n" + "="*50 + "\n\n")
-                f.write(self.current_marking_analysis_result['formatted_text'])
+                self.current_marking_analysis_result['formatted_text'].write_to(f)
             
             self._show_silent_message(
                 "Экспорт завершен", 
@@ -1471,19 +1838,58 @@ class MainWindow(QMainWindow):
         
         self.current_basic_analysis_result = result
         
-        # Отображаем результаты
+        # Отображаем результаты (с фильтром событий, если он задан)
+        if self._os_event_filter() != (None, "", ""):
+            self._apply_os_event_filter()
+        else:
+            self._display_basic_analysis_result(result)
+
+    def _os_event_filter(self):
+        """Фильтр событий со страницы: (уровни или None, источник, текст)"""
+        level = self.os_level_filter_combo.currentData()
+        return ({level} if level else None,
+                self.os_source_filter_input.text().strip(),
+                self.os_text_filter_input.text().strip())
+
+    def _apply_os_event_filter(self, *args):
+        """Повторный отбор событий из разобранных журналов - без распаковки архива и разбора файлов"""
+        result = getattr(self, 'current_basic_analysis_result', None)
+        if not result or 'analyzer' not in result:
+            return
+        
+        analyzer = result['analyzer']
+        analyzer.apply_pattern_settings(self.use_custom_patterns_check.isChecked(),
+                                        self.custom_patterns_input.text())
+        levels, source, text = self._os_event_filter()
+        journals = analyzer.refilter_journals(levels, source, text)
+        if journals is None:
+            self.ready_status.setText("Коды шаблона не входят в разобранные события - запустите анализ заново")
+            return
+        
+        result['journals'] = journals
+        result['formatted_text'] = LazyText(analyzer.format_os_logs_result, journals)
+        result['total_events'] = sum(len(events) for events in journals.values())
         self._display_basic_analysis_result(result)
+        self.ready_status.setText(f"Отобрано событий: {result['total_events']}")
 
     def _display_basic_analysis_result(self, result):
         """Отображение результатов анализа базовых механизмов"""
-        # Показываем переключатель журналов
+        # Заполняем переключатель найденными журналами, сохраняя выбранный журнал
+        selected_channel = self.os_log_switch_combo.currentData()
+        self.os_log_switch_combo.blockSignals(True)
+        self.os_log_switch_combo.clear()
+        for channel, events in result['journals'].items():
+            self.os_log_switch_combo.addItem(f"{journal_title(channel)} ({len(events)})", channel)
+        selected_index = max(self.os_log_switch_combo.findData(selected_channel), 0)
+        self.os_log_switch_combo.setCurrentIndex(selected_index)
+        self.os_log_switch_combo.blockSignals(False)
         self.os_log_switch_combo.setVisible(True)
         
         # Отображаем события в таблице
-        self._display_os_events_by_log_type(0)  # По умолчанию показываем журнал приложения
+        self._display_os_events_by_log_type(selected_index)
         
         # Также показываем текстовое представление
-        self.basic_result_text.setPlainText(result['formatted_text'])
+        self._stream_text(self.basic_result_text, result['formatted_text'])
         self.basic_result_text.setVisible(True)
         self.os_events_table.setVisible(True)
 
@@ -1492,13 +1898,9 @@ class MainWindow(QMainWindow):
         if not hasattr(self, 'current_basic_analysis_result'):
             return
         
-        # 0 - Журнал приложения, 1 - Журнал системы
-        if log_type_index == 0:
-            events = self.current_basic_analysis_result['application_events']
-            log_name = "Журнал приложения"
-        else:
-            events = self.current_basic_analysis_result['system_events']
-            log_name = "Журнал системы"
+        # Канал журнала хранится в данных пункта переключателя
+        channel = self.os_log_switch_combo.itemData(log_type_index)
+        events = self.current_basic_analysis_result['journals'].get(channel, []) if channel else []
         
         # Заполняем таблицу
         self.os_events_table.setRowCount(len(events))
@@ -1544,18 +1946,14 @@ class MainWindow(QMainWindow):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             default_name = f"анализ_журналов_ос_{timestamp}.txt"
             
-            file_path, _ = QFileDialog.getSaveFileName(
-                self,
-                "Сохранить результаты анализа журналов ОС",
-                default_name,
-                "Text Files (*.txt);;All Files (*)"
-            )
-            
+            file_path = self._ask_export_path("Сохранить результаты анализа журналов ОС", default_name)
             if not file_path:
                 return
             
             if not file_path.lower().endswith('.txt'):
-                file_path += '.txt'
+                from structured_export import os_journal_sections
+                self._start_structured_export(os_journal_sections(self.current_basic_analysis_result), file_path)
+                return
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write("=== АНАЛИЗ ЖУРНАЛОВ ОС WINDOWS ===\n\n")
@@ -1565,7 +1963,7 @@ class MainWindow(QMainWindow):
                 if self.use_custom_patterns_check.isChecked() and self.custom_patterns_input.text():
                     f.write(f"Шаблон кодов: {self.custom_patterns_input.text()}\n")
                 f.write("\n" + "="*50 + "\n\n")
-                f.write(self.current_basic_analysis_result['formatted_text'])
+                self.current_basic_analysis_result['formatted_text'].write_to(f)
             
             self._show_silent_message(
                 "Экспорт завершен", 
@@ -442,14 +442,14 @@ class MarkingLogAnalyzer:
         if not results:
             return "Данных авторизации не найдено"
         
-        output = f"Найдено уникальных авторизаций: {len(results)}\n\n"
-        output += "Время       | Закодированные данные | Раскодированные данные\n"
-        output += "-" * 100 + "\n"
+        output = [f"Найдено уникальных авторизаций: {len(results)}\n\n"]
+        output.append("Время       | Закодированные данные | Раскодированные данные\n")
+        output.append("-" * 100 + "\n")
         
         for result in results:
-            output += f"{result.timestamp} | {result.encoded_auth} | {result.decoded_auth}\n"
+            output.append(f"{result.timestamp} | {result.encoded_auth} | {result.decoded_auth}\n")
         
-        return output
+        return "".join(output)
     
     def format_opening_check_result(self, results: List[OpeningCheckResult]) -> str:
         """Форматирование проверки вскрытия - ТОЛЬКО ДЛЯ ЭКСПОРТА"""
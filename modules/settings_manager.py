@@ -3,9 +3,13 @@
 Модуль для управления настройками приложения
 """
 
+import json
 import logging
+from typing import Dict
 from PyQt5.QtCore import QSettings
 
+from config import DEFAULT_SLA_DAYS
+
 logger = logging.getLogger(__name__)
 
 class SettingsManager:
@@ -38,4 +42,21 @@ class SettingsManager:
     
     def set_update_check_frequency(self, days: int):
         """Установить частоту проверки обновлений"""
-        self.settings.setValue("update_check_frequency", days)
\ No newline at end of file
+        self.settings.setValue("update_check_frequency", days)
+    
+    def get_sla_limits(self) -> Dict[str, int]:
+        """Получить таблицу SLA: серьезность -> допустимое число дней в работе"""
+        value = self.settings.value("sla_limits", "")
+        if not value:
+            return dict(DEFAULT_SLA_DAYS)
+        try:
+            limits = json.loads(value)
+            return {str(seriousness): int(days) for seriousness, days in limits.items()}
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Некорректная таблица SLA в настройках, используются значения по умолчанию: {e}")
+            return dict(DEFAULT_SLA_DAYS)
+    
+    def set_sla_limits(self, limits: Dict[str, int]):
+        """Установить таблицу SLA"""
+        self.settings.setValue("sla_limits", json.dumps(limits, ensure_ascii=False))
+        logger.info(f"Таблица SLA установлена: {limits}")
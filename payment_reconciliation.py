@@ -0,0 +1,320 @@
+# payment_reconciliation.py
+"""
+Сверка оплат по терминалу с фискальными чеками
+"""
+
+import re
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Any, Callable
+
+from log_analyzer import ReceiptOperation
+from payment_terminal_analyzer import InpasTransaction, SberbankTransaction, ArcusTransaction
+
+logger = logging.getLogger(__name__)
+
+_TIME_RE = re.compile(r'(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,3}))?')
+
+@dataclass
+class CardPayment:
+    """Оплата картой по данным терминала"""
+    moment: datetime    # дата и время оплаты
+    amount: int         # копейки
+    timestamp: str
+    source: str         # INPAS, SBERBANK или ARCUS2
+    transaction: Any = None
+    # Сумма при другом прочтении единицы (целое Amount Сбербанка - копейки или рубли)
+    alternative_amount: Optional[int] = None
+
+    @property
+    def amount_text(self) -> str:
+        if self.alternative_amount is None:
+            return f"{self.amount / 100:.2f}"
+        return f"{self.amount / 100:.2f} или {self.alternative_amount / 100:.2f}"
+
+@dataclass
+class CardReceipt:
+    """Фискальный чек с оплатой картой"""
+    moment: datetime
+    amount: int
+    timestamp: str
+    operation: Any = None
+
+@dataclass
+class ReconciliationResult:
+    """Результат сверки"""
+    matched: List[Tuple[CardPayment, CardReceipt]] = field(default_factory=list)
+    orphan_payments: List[CardPayment] = field(default_factory=list)
+    orphan_receipts: List[CardReceipt] = field(default_factory=list)
+    # Пары, где единица суммы оплаты не определена и подобрана по чеку
+    ambiguous_matches: List[Tuple[CardPayment, CardReceipt]] = field(default_factory=list)
+    tolerance_seconds: float = 0
+
+    @property
+    def is_consistent(self) -> bool:
+        return not self.orphan_payments and not self.orphan_receipts
+
+def _time_to_seconds(text: str) -> Optional[float]:
+    """Секунды от начала суток по первой метке ЧЧ:ММ:СС[.ммм] в строке"""
+    match = _TIME_RE.search(text or "")
+    if not match:
+        return None
+    hours, minutes, seconds, millis = match.groups()
+    total = int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+    if millis:
+        total += int(millis.ljust(3, '0')) / 1000
+    return total
+
+def _parse_moment(text: str, date_format: str) -> Optional[datetime]:
+    """Дата и время метки "<дата> ЧЧ:ММ:СС[.ммм]", дата - в формате date_format"""
+    parts = (text or "").split(maxsplit=1)
+    seconds = _time_to_seconds(parts[1]) if len(parts) == 2 else None
+    if seconds is None:
+        return None
+    try:
+        day = datetime.strptime(parts[0], date_format)
+    except ValueError:
+        return None
+    return day + timedelta(seconds=seconds)
+
+def _has_fraction(value: str) -> bool:
+    return '.' in value or ',' in value
+
+def _rubles_to_kopecks(value: str) -> Optional[int]:
+    try:
+        return int(round(float(value.replace(',', '.')) * 100))
+    except (ValueError, AttributeError):
+        return None
+
+class PaymentReconciler:
+    """Сверка оплат картой с чеками через оконное слияние отсортированных списков.
+
+    Обе стороны сортируются по (сумма, дата и время) - O(n log n), затем для
+    каждой суммы выполняется однопроходное слияние: оплата и чек сопоставляются,
+    если разница во времени не больше tolerance_seconds. Сравниваются полные
+    дата и время, поэтому оплата перед полуночью сопоставляется с чеком после
+    нее, а одинаковое время разных суток не совпадает. Жадное слияние
+    отсортированных по времени последовательностей дает максимальное число пар.
+    """
+
+    SUCCESS_MARKERS = ('ОДОБРЕНО', 'УСПЕШНО')
+
+    def __init__(self, tolerance_seconds: float = 120, only_successful: bool = True):
+        self.tolerance_seconds = tolerance_seconds
+        self.only_successful = only_successful
+        self.logger = logging.getLogger(__name__)
+
+    def payments_from_inpas(self, transactions: List[InpasTransaction]) -> List[CardPayment]:
+        """Оплаты INPAS (метка "ДД.ММ.ГГ ЧЧ:ММ:СС", сумма в рублях)"""
+        payments = []
+        for txn in transactions:
+            if self.only_successful and not self._is_successful(txn.status):
+                continue
+            moment = _parse_moment(txn.timestamp, "%d.%m.%y")
+            amount = _rubles_to_kopecks(txn.amount)
+            if moment is None or amount is None:
+                continue
+            payments.append(CardPayment(moment, amount, txn.timestamp, "INPAS", txn))
+        return payments
+
+    def payments_from_sberbank(self, transactions: List[SberbankTransaction], year: int) -> List[CardPayment]:
+        """Оплаты Сбербанка (метка "ДД.ММ ЧЧ:ММ:СС.ммм", год берется из даты анализа).
+
+        Сумма с дробной частью - рубли. Версии sbkernel, которые в этом логе
+        пишут дробную часть, пишут суммы в рублях, и целое значение у них -
+        целые рубли. Для остальных версий целое Amount может быть и копейками,
+        и рублями: у такой оплаты заполняется alternative_amount, а единица
+        подбирается при сверке и попадает в ambiguous_matches.
+        """
+        rubles_versions = {txn.version for txn in transactions if _has_fraction(txn.amount)}
+
+        payments = []
+        for txn in transactions:
+            if self.only_successful and not self._is_successful(txn.status):
+                continue
+            moment = _parse_moment(f"{year}.{txn.timestamp}", "%Y.%d.%m")
+            amount = _rubles_to_kopecks(txn.amount)
+            if moment is None or amount is None:
+                continue
+            if _has_fraction(txn.amount) or txn.version in rubles_versions:
+                payments.append(CardPayment(moment, amount, txn.timestamp, "SBERBANK", txn))
+            else:
+                payments.append(CardPayment(moment, int(txn.amount), txn.timestamp, "SBERBANK", txn,
+                                            alternative_amount=amount))
+        return payments
+
+    def payments_from_arcus(self, transactions: List[ArcusTransaction]) -> List[CardPayment]:
+        """Оплаты ARCUS2 (метка "YYYY-MM-DD ЧЧ:ММ:СС", сумма в рублях, только операции оплаты)"""
+        payments = []
+        for txn in transactions:
+            if txn.operation != 'Оплата':
+                continue
+            if self.only_successful and not self._is_successful(txn.status):
+                continue
+            moment = _parse_moment(txn.timestamp, "%Y-%m-%d")
+            amount = _rubles_to_kopecks(txn.amount)
+            if moment is None or amount is None:
+                continue
+            payments.append(CardPayment(moment, amount, txn.timestamp, "ARCUS2", txn))
+        return payments
+    
+    def receipts_from_operations(self, operations: List[ReceiptOperation], date: str) -> List[CardReceipt]:
+        """Чеки продажи с ненулевой BankCardSum из логов кассы за дату date (YYYY-MM-DD)"""
+        receipts = []
+        for operation in operations:
+            card_sum = getattr(operation, 'card_sum', 0.0)
+            if not card_sum or operation.operation_type == "Возврат":
+                continue
+            moment = _parse_moment(f"{date} {operation.time}", "%Y-%m-%d")
+            if moment is None:
+                continue
+            receipts.append(CardReceipt(moment, int(round(card_sum * 100)), operation.time, operation))
+        return receipts
+
+    def reconcile(self, payments: List[CardPayment], receipts: List[CardReceipt]) -> ReconciliationResult:
+        """Сопоставление оплат и чеков.
+
+        Сначала сопоставляются оплаты с известной единицей суммы. Оплаты с
+        неоднозначной единицей сверяются с оставшимися чеками сначала как
+        копейки, затем как рубли; найденные так пары идут в ambiguous_matches.
+        """
+        result = ReconciliationResult(tolerance_seconds=self.tolerance_seconds)
+
+        definite = [p for p in payments if p.alternative_amount is None]
+        ambiguous = [p for p in payments if p.alternative_amount is not None]
+
+        result.matched, result.orphan_payments, result.orphan_receipts = self._merge(
+            definite, receipts, lambda p: p.amount)
+
+        if ambiguous:
+            as_kopecks, ambiguous, result.orphan_receipts = self._merge(
+                ambiguous, result.orphan_receipts, lambda p: p.amount)
+            as_rubles, ambiguous, result.orphan_receipts = self._merge(
+                ambiguous, result.orphan_receipts, lambda p: p.alternative_amount)
+            result.ambiguous_matches = as_kopecks + as_rubles
+            result.orphan_payments += ambiguous
+
+        # Для отчета возвращаем все списки в хронологическом порядке
+        result.matched.sort(key=lambda pair: pair[0].moment)
+        result.ambiguous_matches.sort(key=lambda pair: pair[0].moment)
+        result.orphan_payments.sort(key=lambda p: p.moment)
+        result.orphan_receipts.sort(key=lambda r: r.moment)
+
+        self.logger.info(
+            f"Сверка: пар {len(result.matched)}, с неоднозначной суммой {len(result.ambiguous_matches)}, "
+            f"оплат без чека {len(result.orphan_payments)}, чеков без оплаты {len(result.orphan_receipts)}"
+        )
+        return result
+
+    def _merge(self, payments: List[CardPayment], receipts: List[CardReceipt],
+               amount: Callable[[CardPayment], int]):
+        """Слияние отсортированных по (сумма, дата и время) списков.
+
+        Возвращает (пары, оплаты без чека, чеки без оплаты).
+        """
+        payments = sorted(payments, key=lambda p: (amount(p), p.moment))
+        receipts = sorted(receipts, key=lambda r: (r.amount, r.moment))
+        matched, orphan_payments, orphan_receipts = [], [], []
+
+        i = j = 0
+        while i < len(payments) and j < len(receipts):
+            payment = payments[i]
+            receipt = receipts[j]
+            payment_amount = amount(payment)
+
+            if payment_amount < receipt.amount:
+                orphan_payments.append(payment)
+                i += 1
+            elif payment_amount > receipt.amount:
+                orphan_receipts.append(receipt)
+                j += 1
+            elif abs((payment.moment - receipt.moment).total_seconds()) <= self.tolerance_seconds:
+                matched.append((payment, receipt))
+                i += 1
+                j += 1
+            elif payment.moment < receipt.moment:
+                orphan_payments.append(payment)
+                i += 1
+            else:
+                orphan_receipts.append(receipt)
+                j += 1
+
+        orphan_payments.extend(payments[i:])
+        orphan_receipts.extend(receipts[j:])
+        return matched, orphan_payments, orphan_receipts
+
+    def reconcile_all(self, analysis_date: str,
+                      inpas_transactions: List[InpasTransaction],
+                      sberbank_transactions: List[SberbankTransaction],
+                      operations: List[ReceiptOperation],
+                      arcus_transactions: Optional[List[ArcusTransaction]] = None,
+                      next_day_operations: Optional[List[ReceiptOperation]] = None) -> ReconciliationResult:
+        """Сверка всех оплат терминалов за analysis_date (YYYY-MM-DD) с операциями чеков.
+
+        Чек по оплате перед полуночью печатается уже на следующие сутки, поэтому
+        из next_day_operations берутся чеки в пределах допуска после полуночи.
+        Такие чеки, оставшиеся без оплаты, относятся к следующим суткам и в
+        результат не попадают.
+        """
+        day_start = datetime.strptime(analysis_date, "%Y-%m-%d")
+        day_end = day_start + timedelta(days=1)
+
+        payments = (self.payments_from_inpas(inpas_transactions) +
+                    self.payments_from_sberbank(sberbank_transactions, day_start.year))
+        if arcus_transactions:
+            payments += self.payments_from_arcus(arcus_transactions)
+        receipts = self.receipts_from_operations(operations, analysis_date)
+        if next_day_operations:
+            late = timedelta(seconds=self.tolerance_seconds)
+            receipts += [receipt for receipt in
+                         self.receipts_from_operations(next_day_operations, day_end.strftime("%Y-%m-%d"))
+                         if receipt.moment <= day_end + late]
+
+        result = self.reconcile(payments, receipts)
+        result.orphan_receipts = [receipt for receipt in result.orphan_receipts if receipt.moment < day_end]
+        return result
+
+    def _is_successful(self, status: str) -> bool:
+        status_upper = (status or "").upper()
+        return any(marker in status_upper for marker in self.SUCCESS_MARKERS)
+
+    def format_result(self, result: ReconciliationResult) -> str:
+        """Форматирование результата сверки"""
+        output = ["=== СВЕРКА ОПЛАТ ПО КАРТЕ С ЧЕКАМИ ===\n\n"]
+        output.append(f"Допуск по времени: {result.tolerance_seconds:g} с\n")
+        output.append(f"• Сопоставлено: {len(result.matched)}\n")
+        if result.ambiguous_matches:
+            output.append(f"• Сопоставлено при неоднозначной единице суммы: {len(result.ambiguous_matches)}\n")
+        output.append(f"• Оплаты без чека: {len(result.orphan_payments)}\n")
+        output.append(f"• Чеки без оплаты: {len(result.orphan_receipts)}\n")
+
+        if result.ambiguous_matches:
+            output.append("\n--- ЕДИНИЦА СУММЫ НЕ ОПРЕДЕЛЕНА ПО ЛОГУ (ПРОВЕРЬТЕ) ---\n")
+            output.append("Дата и время           | Amount     | Принято как | № операции\n")
+            output.append("-" * 60 + "\n")
+            for payment, receipt in result.ambiguous_matches:
+                unit = "копейки" if receipt.amount == payment.amount else "рубли"
+                sale_number = receipt.operation.sale_number if receipt.operation is not None else ""
+                output.append(f"{payment.timestamp:22} | {payment.transaction.amount:10} | {unit:11} | {sale_number}\n")
+
+        if result.is_consistent:
+            output.append("\nРасхождений не найдено\n")
+            return "".join(output)
+
+        if result.orphan_payments:
+            output.append("\n--- ОПЛАТЫ БЕЗ ЧЕКА ---\n")
+            output.append("Дата и время           | Сумма      | Терминал\n")
+            output.append("-" * 60 + "\n")
+            for payment in result.orphan_payments:
+                output.append(f"{payment.timestamp:22} | {payment.amount_text:>10} | {payment.source}\n")
+
+        if result.orphan_receipts:
+            output.append("\n--- ЧЕКИ БЕЗ ОПЛАТЫ ---\n")
+            output.append("Время        | Сумма картой | № операции\n")
+            output.append("-" * 60 + "\n")
+            for receipt in result.orphan_receipts:
+                sale_number = receipt.operation.sale_number if receipt.operation is not None else ""
+                output.append(f"{receipt.timestamp:12} | {receipt.amount / 100:12.2f} | {sale_number}\n")
+
+        return "".join(output)
@@ -5,13 +5,21 @@
 
 import os
 import re
+import heapq
+import bisect
+import fnmatch
+import hashlib
 import logging
 import tempfile
+import threading
 import zipfile
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Iterable, Iterator
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +34,7 @@ class InpasTransaction:
     card_type: str
     auth_code: str
     rrn: str
+    driver_name: str = ""
     
     def to_table_row(self) -> List[str]:
         return [
@@ -49,6 +58,7 @@ class SberbankTransaction:
     card_last4: str
     guid: str
     department: str
+    driver_name: str = ""
     
     def to_table_row(self) -> List[str]:
         return [
@@ -61,6 +71,33 @@ class SberbankTransaction:
             self.department
         ]
 
+@dataclass
+class ArcusTransaction:
+    """Транзакция терминала ARCUS2"""
+    timestamp: str  # YYYY-MM-DD HH:MM:SS
+    amount: str
+    operation: str
+    status: str
+    response_code: str
+    card_last4: str
+    auth_code: str
+    rrn: str
+    terminal: str
+    driver_name: str = ""
+    
+    def to_table_row(self) -> List[str]:
+        return [
+            self.timestamp,
+            self.amount,
+            self.operation,
+            self.status,
+            self.response_code,
+            self.card_last4,
+            self.auth_code,
+            self.rrn,
+            self.terminal
+        ]
+
 @dataclass
 class TerminalDriverInfo:
     """Информация о драйвере терминала"""
@@ -73,13 +110,844 @@ class TerminalDriverInfo:
         status = "✅ Найден" if self.found else "❌ Не найден"
         return f"{self.driver_name} ({self.driver_type}): {status}, транзакций: {self.transactions_count}"
 
+@dataclass
+class DriverAnalysisResult:
+    """Результат анализа одного драйвера терминала"""
+    driver_name: str
+    driver_type: str
+    transactions: list = field(default_factory=list)
+    error: str = ""
+    
+    def to_text(self) -> str:
+        if self.error:
+            return f"{self.driver_name} ({self.driver_type}): ошибка - {self.error}"
+        return f"{self.driver_name} ({self.driver_type}): транзакций {len(self.transactions)}"
+
+class StreamingLogParser:
+    """Базовый однопроходный парсер лога терминала.
+
+    Файл читается построчно, состояние текущей транзакции хранится в парсере,
+    поэтому расход памяти не зависит от размера лога. Наследник реализует
+    feed() (обработка строки) и finish() (конец файла); оба возвращают
+    завершенную транзакцию или None.
+    """
+
+    encoding = 'utf-8'
+
+    # Файлы меньше этого размера читаются целиком, без индекса перехода
+    SEEK_MIN_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, target_date: str = ""):
+        self.target_date = target_date
+
+    def feed(self, line: str):
+        raise NotImplementedError
+
+    def finish(self):
+        return None
+
+    def is_idle(self) -> bool:
+        """Нет незавершенной транзакции (чтение можно прервать без потерь)"""
+        return True
+
+    def date_key(self, line: str) -> Optional[str]:
+        """Сортируемый ключ даты строки лога или None, если даты в строке нет.
+
+        Наследник, реализовавший этот метод вместе с target_date_key(),
+        получает переход к целевой дате по индексу меток времени.
+        """
+        return None
+
+    def target_date_key(self) -> Optional[str]:
+        """Ключ целевой даты в формате date_key()"""
+        return None
+
+    def parse_lines(self, lines: Iterable[str]) -> Iterator:
+        """Разбор последовательности строк с выдачей транзакций по мере готовности"""
+        feed = self.feed
+        for line in lines:
+            transaction = feed(line)
+            if transaction is not None:
+                yield transaction
+
+        transaction = self.finish()
+        if transaction is not None:
+            yield transaction
+
+    def parse_file(self, log_path: str) -> Iterator:
+        """Потоковый разбор файла.
+
+        Для больших файлов при заданной дате разбирается только диапазон байт,
+        найденный двоичным поиском по индексу меток времени.
+        """
+        byte_range = self.seek_range(log_path)
+        if byte_range is not None:
+            yield from self.parse_range(log_path, *byte_range)
+            return
+
+        yield from self.parse_whole_file(log_path)
+
+    def seek_range(self, log_path: str) -> Optional[Tuple[int, Optional[int]]]:
+        """Диапазон байт целевой даты по индексу (None - файл читается целиком)"""
+        target_key = self.target_date_key()
+        if not target_key or os.path.getsize(log_path) < self.SEEK_MIN_SIZE:
+            return None
+        seek_index = LogSeekIndex.get(log_path, self)
+        if seek_index is None:
+            return None
+        return seek_index.byte_range(target_key)
+
+    def parse_whole_file(self, log_path: str) -> Iterator:
+        """Разбор всего файла без индекса"""
+        with open(log_path, 'r', encoding=self.encoding, errors='ignore') as f:
+            yield from self.parse_lines(f)
+
+    def parse_range(self, log_path: str, start: int, end: Optional[int]) -> Iterator:
+        """Разбор файла с байтового смещения start (начало строки) до end.
+
+        После end чтение продолжается только до завершения текущей транзакции.
+        """
+        feed = self.feed
+        encoding = self.encoding
+        position = start
+
+        with open(log_path, 'rb') as f:
+            f.seek(start)
+            for raw_line in f:
+                if end is not None and position >= end and self.is_idle():
+                    break
+                position += len(raw_line)
+                transaction = feed(raw_line.decode(encoding, errors='ignore'))
+                if transaction is not None:
+                    yield transaction
+
+        transaction = self.finish()
+        if transaction is not None:
+            yield transaction
+
+class LogSeekIndex:
+    """Разреженный индекс "байтовое смещение -> дата" для большого лога.
+
+    Файл не читается целиком: через каждые step байт берется первая строка
+    с датой (не дальше PROBE_LINES строк). По отсортированным ключам дат
+    двоичным поиском находится диапазон байт целевых суток. Если даты в
+    файле идут не по возрастанию (например, переход через год в логе без
+    года), индекс не используется.
+
+    Индекс строится в основном процессе (рабочим процессам пула передается
+    готовый диапазон байт) и хранится в LRU-кэше процесса по размеру,
+    времени изменения, хэшу начала файла и формату дат парсера - без пути,
+    поэтому тот же лог из повторно распакованного архива индекс не строит.
+    """
+
+    SAMPLES = 1024
+    MIN_STEP = 256 * 1024
+    PROBE_LINES = 512
+    # Размер начала файла для отпечатка и число индексов в кэше
+    HEAD_BYTES = 64 * 1024
+    MAX_CACHED = 64
+
+    _cache: "OrderedDict[tuple, Optional[LogSeekIndex]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, offsets: List[int], keys: List[str]):
+        self.offsets = offsets
+        self.keys = keys
+
+    @classmethod
+    def get(cls, log_path: str, parser: StreamingLogParser) -> Optional['LogSeekIndex']:
+        """Индекс файла из кэша или новый (None - переход невозможен)"""
+        try:
+            stat = os.stat(log_path)
+            with open(log_path, 'rb') as f:
+                head_hash = hashlib.blake2b(f.read(cls.HEAD_BYTES), digest_size=16).hexdigest()
+        except OSError:
+            return None
+
+        cache_key = (stat.st_size, stat.st_mtime_ns, head_hash, type(parser).__name__)
+        with cls._lock:
+            if cache_key in cls._cache:
+                cls._cache.move_to_end(cache_key)
+                return cls._cache[cache_key]
+
+        seek_index = cls.build(log_path, parser, stat.st_size)
+        with cls._lock:
+            cls._cache[cache_key] = seek_index
+            while len(cls._cache) > cls.MAX_CACHED:
+                cls._cache.popitem(last=False)
+        return seek_index
+
+    @classmethod
+    def build(cls, log_path: str, parser: StreamingLogParser, size: int) -> Optional['LogSeekIndex']:
+        step = max(cls.MIN_STEP, size // cls.SAMPLES)
+        offsets = []
+        keys = []
+
+        try:
+            with open(log_path, 'rb') as f:
+                for sample_offset in range(0, size, step):
+                    f.seek(sample_offset)
+                    if sample_offset:
+                        f.readline()  # неполная строка
+                    line_start = f.tell()
+                    if offsets and line_start <= offsets[-1]:
+                        continue
+
+                    for _ in range(cls.PROBE_LINES):
+                        raw_line = f.readline()
+                        if not raw_line:
+                            break
+                        key = parser.date_key(raw_line.decode(parser.encoding, errors='ignore'))
+                        if key:
+                            offsets.append(line_start)
+                            keys.append(key)
+                            break
+                        line_start += len(raw_line)
+        except OSError as e:
+            logger.warning(f"Не удалось построить индекс {log_path}: {e}")
+            return None
+
+        if not keys or any(keys[i] > keys[i + 1] for i in range(len(keys) - 1)):
+            logger.info(f"Индекс дат не применим к {log_path}, файл будет прочитан целиком")
+            return None
+
+        logger.info(f"Индекс дат {log_path}: {len(keys)} точек, шаг {step} байт")
+        return cls(offsets, keys)
+
+    def byte_range(self, target_key: str) -> Tuple[int, Optional[int]]:
+        """Диапазон байт, гарантированно содержащий все строки целевой даты.
+
+        Начало - последняя точка с датой раньше целевой, конец - первая точка
+        с датой позже целевой (None - до конца файла).
+        """
+        left = bisect.bisect_left(self.keys, target_key)
+        right = bisect.bisect_right(self.keys, target_key)
+        start = self.offsets[left - 1] if left > 0 else 0
+        end = self.offsets[right] if right < len(self.offsets) else None
+        return start, end
+
+# Предкомпилированные шаблоны чека INPAS
+_INPAS_DATETIME_RE = re.compile(r'(\d{2}\.\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2})')
+_INPAS_TERMINAL_RE = re.compile(r'ТЕРМИНАЛ:\s*(\d+)')
+_INPAS_CARD_TYPE_RE = re.compile(r'КАРТА\s+([A-Za-z ]+)')
+_INPAS_AMOUNT_RE = re.compile(r'СУММА \(RUB\)\s+([\d\.]+)')
+_INPAS_AUTH_RE = re.compile(r'КОД АВТОРИЗАЦИИ:\s+(\d+)')
+_INPAS_RRN_RE = re.compile(r'№ ССЫЛКИ:\s+(\d+)')
+
+class InpasLogParser(StreamingLogParser):
+    """Потоковый парсер чеков DualConnector (INPAS).
+
+    Состояния: ожидание строки банка -> ожидание "ОПЛАТА ПОКУПКИ" (не дальше
+    15 строк от банка) -> сбор полей чека (10 строк начиная с "ОПЛАТА ПОКУПКИ").
+    Чек выдается сразу, как только собраны все поля или закончилось окно;
+    строка банка следующего чека запоминается даже во время сбора текущего,
+    поэтому соседние чеки не теряются.
+    """
+
+    BANK_WINDOW = 15
+    SLIP_WINDOW = 10
+    REQUIRED_FIELDS = ('date', 'time', 'amount', 'terminal', 'status', 'bank')
+
+    def __init__(self, target_date: str = ""):
+        super().__init__(target_date)
+        # Дата в формате чека: ДД.ММ.ГГ
+        self.target_slip_date = ""
+        if len(target_date) == 10:
+            self.target_slip_date = f"{target_date[8:10]}.{target_date[5:7]}.{target_date[2:4]}"
+
+        self.line_no = 0
+        self.bank = None
+        self.bank_line_no = 0
+        self.slip = None
+        self.slip_line_no = 0
+
+    def feed(self, line: str) -> Optional[InpasTransaction]:
+        self.line_no += 1
+        completed = None
+
+        if 'ОПЛАТА ПОКУПКИ' in line:
+            # Начало нового чека закрывает предыдущий
+            if self.slip is not None:
+                completed = self._close_slip()
+
+            if self.bank is not None and self.line_no - self.bank_line_no < self.BANK_WINDOW:
+                self.slip = {'bank': self.bank}
+                self.slip_line_no = self.line_no
+                self.bank = None
+                self._collect(line)
+                return completed
+
+            self.bank = None
+
+        if self.slip is not None:
+            offset = self.line_no - self.slip_line_no
+            if offset >= self.SLIP_WINDOW:
+                completed = self._close_slip()
+            else:
+                if offset == 1:
+                    self.slip['status'] = line.strip()
+                self._collect(line)
+                if 'rrn' in self.slip and self._has_all_fields():
+                    completed = self._close_slip()
+
+        if self.bank is not None and self.line_no - self.bank_line_no >= self.BANK_WINDOW:
+            self.bank = None
+
+        if self.bank is None and ('ПАО' in line or 'АО' in line or 'БАНК' in line):
+            self.bank = line.strip()
+            self.bank_line_no = self.line_no
+
+        return completed
+
+    def finish(self) -> Optional[InpasTransaction]:
+        if self.slip is not None:
+            return self._close_slip()
+        return None
+
+    def is_idle(self) -> bool:
+        return self.slip is None
+
+    def date_key(self, line: str) -> Optional[str]:
+        match = _INPAS_DATETIME_RE.search(line) if ':' in line else None
+        if not match:
+            return None
+        day, month, year = match.group(1).split('.')
+        return year + month + day
+
+    def target_date_key(self) -> Optional[str]:
+        if not self.target_slip_date:
+            return None
+        day, month, year = self.target_slip_date.split('.')
+        return year + month + day
+
+    def _collect(self, line: str):
+        """Извлечение полей чека из строки"""
+        slip = self.slip
+
+        if ':' in line:
+            match = _INPAS_DATETIME_RE.search(line)
+            if match:
+                slip['date'] = match.group(1)
+                slip['time'] = match.group(2)
+
+            if 'ТЕРМИНАЛ:' in line:
+                match = _INPAS_TERMINAL_RE.search(line)
+                if match:
+                    slip['terminal'] = match.group(1)
+
+            if 'КОД АВТОРИЗАЦИИ:' in line:
+                match = _INPAS_AUTH_RE.search(line)
+                if match:
+                    slip['auth_code'] = match.group(1)
+
+            if '№ ССЫЛКИ:' in line:
+                match = _INPAS_RRN_RE.search(line)
+                if match:
+                    slip['rrn'] = match.group(1)
+
+        if 'КАРТА' in line:
+            match = _INPAS_CARD_TYPE_RE.search(line)
+            if match:
+                slip['card_type'] = match.group(1).strip()
+
+        if 'СУММА (RUB)' in line:
+            match = _INPAS_AMOUNT_RE.search(line)
+            if match:
+                slip['amount'] = match.group(1)
+
+    def _has_all_fields(self) -> bool:
+        """Собраны ли все поля чека, включая необязательные"""
+        return all(k in self.slip for k in self.REQUIRED_FIELDS + ('card_type', 'auth_code', 'rrn'))
+
+    def _close_slip(self) -> Optional[InpasTransaction]:
+        """Завершение текущего чека и проверка даты"""
+        slip = self.slip
+        self.slip = None
+
+        if 'status' not in slip or not all(k in slip for k in self.REQUIRED_FIELDS):
+            return None
+
+        if self.target_slip_date and slip['date'] != self.target_slip_date:
+            return None
+
+        return InpasTransaction(
+            timestamp=f"{slip['date']} {slip['time']}",
+            amount=slip['amount'],
+            terminal=slip['terminal'],
+            status=slip['status'],
+            bank=slip['bank'],
+            card_type=slip.get('card_type', ''),
+            auth_code=slip.get('auth_code', ''),
+            rrn=slip.get('rrn', '')
+        )
+
+# Предкомпилированные шаблоны sbkernel (Сбербанк)
+_SBER_TIME_RE = re.compile(r'(\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2}\.\d{3})')
+_SBER_AMOUNT_RE = re.compile(r'Amount\s*=\s*([\d\.]+)')
+_SBER_DEPARTMENT_RE = re.compile(r'Department\s*=\s*(\d+)')
+_SBER_VERSION_RE = re.compile(r'Version:([\d\.]+)')
+_SBER_RESULT_RE = re.compile(r'Result\s*=\s*(\d+)')
+_SBER_GUID_RE = re.compile(r'GUID=([A-F0-9]+)')
+_SBER_CARD_RE = re.compile(r'\*{12}(\d{4})')
+
+# Коды результата Сбербанка
+SBERBANK_RESULT_CODES = {
+    '0': 'Успешно',
+    '99': 'Потеряна связь',
+    '2000': 'Отменено пользователем',
+    '2001': 'Таймаут',
+    '2002': 'Ошибка карты',
+    '2003': 'Отказ банка'
+}
+
+def convert_sberbank_result(result_code: str) -> str:
+    """Конвертация кода результата Сбербанка в текст"""
+    return SBERBANK_RESULT_CODES.get(result_code, f"Код {result_code}")
+
+class SberbankLogParser(StreamingLogParser):
+    """Потоковый парсер sbkernel (Сбербанк).
+
+    Транзакция начинается строкой "SBKRNL: ... Command = 4000" за целевую дату,
+    версия и результат (Result/GUID/карта) ищутся в следующих 19 строках.
+    Новая команда оплаты закрывает предыдущую транзакцию.
+    """
+
+    RESULT_WINDOW = 19
+
+    def __init__(self, target_date: str = ""):
+        super().__init__(target_date)
+        # Дата в формате лога: ДД.ММ
+        self.target_day_month = f"{target_date[8:10]}.{target_date[5:7]}" if len(target_date) == 10 else ""
+
+        self.line_no = 0
+        self.pending = None
+        self.pending_line_no = 0
+
+    def feed(self, line: str) -> Optional[SberbankTransaction]:
+        self.line_no += 1
+        completed = None
+
+        if self.pending is not None and self.line_no - self.pending_line_no > self.RESULT_WINDOW:
+            completed = self._close()
+
+        if 'Command = 4000' in line and 'SBKRNL:' in line and self.target_day_month in line:
+            if self.pending is not None:
+                completed = self._close()
+            self._start(line)
+            return completed
+
+        if self.pending is not None:
+            if 'Version:' in line and 'MSBuild' not in line:
+                match = _SBER_VERSION_RE.search(line)
+                if match:
+                    self.pending['version'] = match.group(1)
+
+            if 'GUID' in line and 'Result' in line:
+                self._collect_result(line)
+
+        return completed
+
+    def finish(self) -> Optional[SberbankTransaction]:
+        if self.pending is not None:
+            return self._close()
+        return None
+
+    def is_idle(self) -> bool:
+        return self.pending is None
+
+    def date_key(self, line: str) -> Optional[str]:
+        # В sbkernel год не пишется, ключ - ММДД
+        match = _SBER_TIME_RE.search(line) if ':' in line else None
+        if not match:
+            return None
+        date_part = match.group(1)
+        return date_part[3:5] + date_part[:2]
+
+    def target_date_key(self) -> Optional[str]:
+        if not self.target_day_month:
+            return None
+        return self.target_day_month[3:5] + self.target_day_month[:2]
+
+    def _start(self, line: str):
+        """Начало транзакции по строке команды оплаты"""
+        pending = {}
+
+        match = _SBER_TIME_RE.search(line)
+        if match:
+            pending['date'] = match.group(1)
+            pending['time'] = match.group(2)
+
+        match = _SBER_AMOUNT_RE.search(line)
+        if match:
+            pending['amount'] = match.group(1)
+
+        match = _SBER_DEPARTMENT_RE.search(line)
+        if match:
+            pending['department'] = match.group(1)
+
+        self.pending = pending
+        self.pending_line_no = self.line_no
+
+    def _collect_result(self, line: str):
+        """Извлечение результата, GUID и номера карты"""
+        pending = self.pending
+
+        match = _SBER_RESULT_RE.search(line)
+        if match:
+            pending['status'] = convert_sberbank_result(match.group(1))
+
+        match = _SBER_GUID_RE.search(line)
+        if match:
+            pending['guid'] = match.group(1)
+
+        match = _SBER_CARD_RE.search(line)
+        if match:
+            pending['card_last4'] = match.group(1)
+
+    def _close(self) -> Optional[SberbankTransaction]:
+        pending = self.pending
+        self.pending = None
+
+        if not all(k in pending for k in ('date', 'time', 'amount', 'status')):
+            return None
+
+        return SberbankTransaction(
+            timestamp=f"{pending['date']} {pending['time']}",
+            amount=pending['amount'],
+            status=pending['status'],
+            version=pending.get('version', ''),
+            card_last4=pending.get('card_last4', ''),
+            guid=pending.get('guid', ''),
+            department=pending.get('department', '')
+        )
+
+# Предкомпилированные шаблоны операционного лога ARCUS2
+_ARCUS_STAMP_RE = re.compile(r'(\d{2})\.(\d{2})\.(\d{4})[ T](\d{2}:\d{2}:\d{2})|(\d{4})-(\d{2})-(\d{2})[ T](\d{2}:\d{2}:\d{2})')
+_ARCUS_START_RE = re.compile(r'(?:Start operation|Начало операции|Operation\s*=)\s*(\d+)', re.IGNORECASE)
+_ARCUS_END_RE = re.compile(r'End operation|Завершение операции', re.IGNORECASE)
+_ARCUS_AMOUNT_RE = re.compile(r'(?:Amount|Сумма)\s*[:=]\s*([\d\.,]+)', re.IGNORECASE)
+_ARCUS_RESPONSE_RE = re.compile(r'\b(?:Response code|Код ответа|RC)\s*[:=]\s*(\d+)', re.IGNORECASE)
+_ARCUS_AUTH_RE = re.compile(r'(?:Auth code|Код авторизации)\s*[:=]\s*(\w+)', re.IGNORECASE)
+_ARCUS_RRN_RE = re.compile(r'\bRRN\s*[:=]\s*(\d+)', re.IGNORECASE)
+_ARCUS_TERMINAL_RE = re.compile(r'\b(?:TID|Terminal ID|Терминал)\s*[:=]\s*(\d+)', re.IGNORECASE)
+_ARCUS_PAN_RE = re.compile(r'(?:\*{4,}|X{4,})(\d{4})')
+
+# Коды операций ARCUS2
+ARCUS_OPERATIONS = {
+    '1': 'Оплата',
+    '2': 'Оплата',
+    '3': 'Возврат',
+    '4': 'Отмена',
+    '7': 'Сверка итогов'
+}
+
+class ArcusLogParser(StreamingLogParser):
+    """Потоковый парсер операционного лога ARCUS2.
+
+    Операция начинается строкой с меткой времени и "Start operation N"
+    (или "Operation = N"), поля Amount/Response code/Auth code/RRN/TID/PAN
+    собираются до "End operation", начала следующей операции или конца окна
+    в 40 строк. Дата берется из метки времени строки начала операции.
+    """
+
+    OPERATION_WINDOW = 40
+
+    def __init__(self, target_date: str = ""):
+        super().__init__(target_date)
+        self.line_no = 0
+        self.pending = None
+        self.pending_line_no = 0
+
+    def feed(self, line: str) -> Optional[ArcusTransaction]:
+        self.line_no += 1
+        completed = None
+
+        if self.pending is not None and self.line_no - self.pending_line_no > self.OPERATION_WINDOW:
+            completed = self._close()
+
+        start = _ARCUS_START_RE.search(line) if 'peration' in line or 'операции' in line else None
+        if start:
+            stamp = self._parse_stamp(line)
+            if stamp is not None:
+                if self.pending is not None:
+                    completed = self._close()
+                self.pending = {'timestamp': stamp, 'operation': start.group(1)}
+                self.pending_line_no = self.line_no
+                self._collect(line)
+                return completed
+
+        if self.pending is not None:
+            self._collect(line)
+            if _ARCUS_END_RE.search(line):
+                completed = self._close()
+
+        return completed
+
+    def finish(self) -> Optional[ArcusTransaction]:
+        if self.pending is not None:
+            return self._close()
+        return None
+
+    def is_idle(self) -> bool:
+        return self.pending is None
+
+    def date_key(self, line: str) -> Optional[str]:
+        stamp = self._parse_stamp(line)
+        return stamp[:10] if stamp else None
+
+    def target_date_key(self) -> Optional[str]:
+        return self.target_date or None
+
+    def _parse_stamp(self, line: str) -> Optional[str]:
+        """Метка времени строки в виде YYYY-MM-DD HH:MM:SS"""
+        match = _ARCUS_STAMP_RE.search(line)
+        if not match:
+            return None
+        if match.group(1):
+            day, month, year, time_part = match.group(1, 2, 3, 4)
+        else:
+            year, month, day, time_part = match.group(5, 6, 7, 8)
+        return f"{year}-{month}-{day} {time_part}"
+
+    def _collect(self, line: str):
+        pending = self.pending
+
+        for key, pattern in (('amount', _ARCUS_AMOUNT_RE), ('response_code', _ARCUS_RESPONSE_RE),
+                             ('auth_code', _ARCUS_AUTH_RE), ('rrn', _ARCUS_RRN_RE),
+                             ('terminal', _ARCUS_TERMINAL_RE)):
+            if key not in pending:
+                match = pattern.search(line)
+                if match:
+                    pending[key] = match.group(1)
+
+        if 'card_last4' not in pending:
+            match = _ARCUS_PAN_RE.search(line)
+            if match:
+                pending['card_last4'] = match.group(1)
+
+    def _close(self) -> Optional[ArcusTransaction]:
+        pending = self.pending
+        self.pending = None
+
+        if 'amount' not in pending:
+            return None
+
+        if self.target_date and not pending['timestamp'].startswith(self.target_date):
+            return None
+
+        response_code = pending.get('response_code', '')
+        if response_code in ('0', '00', '000'):
+            status = 'Одобрено'
+        elif response_code:
+            status = f"Отказ (код {response_code})"
+        else:
+            status = 'Нет ответа'
+
+        return ArcusTransaction(
+            timestamp=pending['timestamp'],
+            amount=pending['amount'].replace(',', '.'),
+            operation=ARCUS_OPERATIONS.get(pending['operation'], f"Операция {pending['operation']}"),
+            status=status,
+            response_code=response_code,
+            card_last4=pending.get('card_last4', ''),
+            auth_code=pending.get('auth_code', ''),
+            rrn=pending.get('rrn', ''),
+            terminal=pending.get('terminal', '')
+        )
+
+def sberbank_sort_key(transaction: SberbankTransaction) -> Tuple[str, str, str]:
+    """Ключ сортировки по времени для меток вида ДД.ММ ЧЧ:ММ:СС.ммм"""
+    date_part, _, time_part = transaction.timestamp.partition(' ')
+    return (date_part[3:5], date_part[:2], time_part)
+
+def parse_log_file(parser_class, log_path: str, target_date: str) -> list:
+    """Разбор одного файла парсером (индекс дат строится в текущем процессе)"""
+    return list(parser_class(target_date).parse_file(log_path))
+
+def parse_log_range(parser_class, log_path: str, target_date: str,
+                    byte_range: Optional[Tuple[int, Optional[int]]]) -> list:
+    """Разбор диапазона байт, найденного в основном процессе (None - весь файл).
+
+    Функция верхнего уровня для пула процессов: рабочий процесс индекс не строит.
+    """
+    parser = parser_class(target_date)
+    if byte_range is None:
+        return list(parser.parse_whole_file(log_path))
+    return list(parser.parse_range(log_path, *byte_range))
+
+def parse_log_files_concurrently(parser_class, log_files: List[str], target_date: str,
+                                 max_workers: Optional[int] = None,
+                                 executor: Optional[ProcessPoolExecutor] = None) -> List[list]:
+    """Параллельный разбор файлов в пуле процессов.
+
+    Возвращает списки транзакций в порядке log_files. Если пул процессов
+    недоступен (например, запрет на создание процессов), файлы разбираются
+    последовательно в текущем процессе.
+
+    executor - общий пул для файлов нескольких драйверов: в него
+    отправляются и одиночные файлы, а закрывает его вызывающая сторона.
+    Диапазоны байт целевой даты находятся здесь же, по кэшу индексов
+    основного процесса.
+    """
+    tasks = [(path, parser_class(target_date).seek_range(path)) for path in log_files]
+
+    if executor is None and len(log_files) <= 1:
+        return [parse_log_range(parser_class, path, target_date, byte_range) for path, byte_range in tasks]
+
+    try:
+        if executor is not None:
+            futures = [executor.submit(parse_log_range, parser_class, path, target_date, byte_range)
+                       for path, byte_range in tasks]
+            return [future.result() for future in futures]
+
+        workers = min(len(log_files), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as own_executor:
+            futures = [own_executor.submit(parse_log_range, parser_class, path, target_date, byte_range)
+                       for path, byte_range in tasks]
+            return [future.result() for future in futures]
+    except (OSError, BrokenProcessPool) as e:
+        logger.warning(f"Пул процессов недоступен, последовательный разбор: {e}")
+        return [parse_log_range(parser_class, path, target_date, byte_range) for path, byte_range in tasks]
+
+@dataclass
+class LogFileInfo:
+    """Файл лога в индексе pts_vendor"""
+    path: str
+    name: str
+    size: int
+    mtime: float
+    file_date: Optional[str] = None  # YYYY-MM-DD, если дата читается из имени файла
+
+# Даты в именах файлов: YYYYMMDD или YYMMDD (DualConnector20240115.log, DualConnector240115.log)
+_FILE_DATE_RE = re.compile(r'(?<!\d)(20\d{2}|\d{2})(\d{2})(\d{2})(?!\d)')
+
+def parse_file_name_date(name: str) -> Optional[str]:
+    """Дата из имени файла лога (None, если имя не содержит полной даты)"""
+    match = _FILE_DATE_RE.search(name)
+    if not match:
+        return None
+
+    year, month, day = match.groups()
+    if len(year) == 2:
+        year = f"20{year}"
+    try:
+        return datetime(int(year), int(month), int(day)).strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+class PtsVendorIndex:
+    """Индекс файлов pts_vendor, построенный одним обходом os.scandir.
+
+    Структура: драйвер -> подпапка первого уровня ('' для файлов в корне
+    драйвера) -> файлы. Все запросы по драйверам и шаблонам имен файлов
+    обслуживаются из памяти без повторных обходов диска.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self.drivers: Dict[str, Dict[str, List[LogFileInfo]]] = {}
+
+    @classmethod
+    def build(cls, root: str) -> 'PtsVendorIndex':
+        index = cls(root)
+
+        with os.scandir(index.root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    index.drivers[entry.name] = index._scan_driver(entry.path)
+
+        return index
+
+    def _scan_driver(self, driver_path: str) -> Dict[str, List[LogFileInfo]]:
+        subfolders: Dict[str, List[LogFileInfo]] = {'': []}
+
+        # Обход в глубину со стеком: (путь, подпапка первого уровня)
+        stack = [(driver_path, None)]
+        while stack:
+            path, subfolder = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            top = subfolder if subfolder is not None else entry.name
+                            subfolders.setdefault(top, [])
+                            stack.append((entry.path, top))
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            subfolders[subfolder or ''].append(LogFileInfo(
+                                path=entry.path,
+                                name=entry.name,
+                                size=stat.st_size,
+                                mtime=stat.st_mtime,
+                                file_date=parse_file_name_date(entry.name)
+                            ))
+            except OSError as e:
+                logger.warning(f"Не удалось прочитать директорию {path}: {e}")
+
+        for files in subfolders.values():
+            files.sort(key=lambda info: info.path)
+
+        return subfolders
+
+    def driver_for_path(self, driver_dir: str) -> Optional[str]:
+        """Имя драйвера по пути к его директории"""
+        driver_dir = os.path.normpath(driver_dir)
+        if os.path.dirname(driver_dir) != self.root:
+            return None
+        name = os.path.basename(driver_dir)
+        return name if name in self.drivers else None
+
+    def subfolders(self, driver: str) -> List[str]:
+        return [name for name in self.drivers.get(driver, {}) if name]
+
+    def numbered_subfolders(self, driver: str) -> List[str]:
+        """Нумерованные подпапки терминалов (1, 2, 3, 4)"""
+        return sorted((name for name in self.subfolders(driver) if name.isdigit()), key=int)
+
+    def files(self, driver: str, pattern: str = "*", subfolder: Optional[str] = None) -> List[LogFileInfo]:
+        """Файлы драйвера (рекурсивно), имя которых подходит под шаблон fnmatch"""
+        subfolders = self.drivers.get(driver, {})
+        if subfolder is not None:
+            groups = [subfolders.get(subfolder, [])]
+        else:
+            groups = subfolders.values()
+
+        return [info for files in groups for info in files if fnmatch.fnmatch(info.name, pattern)]
+
+    def find_first(self, driver: str, patterns: List[str], subfolder: Optional[str] = None) -> List[LogFileInfo]:
+        """Файлы по первому шаблону из списка, для которого что-то нашлось"""
+        for pattern in patterns:
+            found = self.files(driver, pattern, subfolder)
+            if found:
+                return found
+        return []
+
+    def count_logs(self, driver: str) -> int:
+        return len(self.files(driver, "*.log"))
+
 class PaymentTerminalAnalyzer:
     """Анализатор платежных терминалов"""
     
     def __init__(self):
         self.temp_dir = None
+        self.index = None
+        # Общий пул процессов на время analyze_drivers
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         self.logger = logging.getLogger(__name__)
     
+    def build_index(self, pts_dir: str) -> PtsVendorIndex:
+        """Однократный обход pts_vendor и построение индекса файлов"""
+        self.index = PtsVendorIndex.build(pts_dir)
+        self.logger.info(f"Проиндексировано драйверов: {len(self.index.drivers)}")
+        return self.index
+    
+    def _index_driver(self, driver_dir: str) -> Tuple[PtsVendorIndex, str]:
+        """Индекс и имя драйвера для его директории (индекс строится при первом обращении)"""
+        driver_dir = os.path.normpath(driver_dir)
+        if self.index is None or self.index.driver_for_path(driver_dir) is None:
+            self.build_index(os.path.dirname(driver_dir))
+        return self.index, os.path.basename(driver_dir)
+    
     def extract_archive(self, archive_path: str) -> Optional[str]:
         """Распаковка архива логов"""
         try:
@@ -87,6 +955,15 @@ class PaymentTerminalAnalyzer:
             
             with zipfile.ZipFile(archive_path, 'r') as zip_ref:
                 zip_ref.extractall(self.temp_dir)
+                # Время изменения из архива - часть ключа кэша индексов дат
+                for member in zip_ref.infolist():
+                    if member.is_dir():
+                        continue
+                    try:
+                        modified = datetime(*member.date_time).timestamp()
+                        os.utime(os.path.join(self.temp_dir, member.filename), (modified, modified))
+                    except (OSError, ValueError, OverflowError):
+                        continue
             
             self.logger.info(f"Архив распакован в: {self.temp_dir}")
             return self.temp_dir
@@ -130,22 +1007,22 @@ class PaymentTerminalAnalyzer:
             if not pts_path.exists():
                 return [TerminalDriverInfo("pts_vendor", "NOT_FOUND", False, 0)]
             
-            # Сканируем поддиректории
-            for item in pts_path.iterdir():
-                if item.is_dir():
-                    driver_name = item.name
-                    driver_type = self._classify_driver(driver_name)
-                    
-                    # Проверяем наличие логов
-                    log_count = self._count_logs_in_driver(str(item))
-                    
-                    driver_info = TerminalDriverInfo(
-                        driver_name=driver_name,
-                        driver_type=driver_type,
-                        found=True,
-                        transactions_count=log_count
-                    )
-                    drivers.append(driver_info)
+            # Один обход дерева, дальше все запросы идут к индексу
+            index = self.build_index(pts_dir)
+            
+            for driver_name in sorted(index.drivers):
+                driver_type = self._classify_driver(driver_name)
+                
+                # Проверяем наличие логов
+                log_count = index.count_logs(driver_name)
+                
+                driver_info = TerminalDriverInfo(
+                    driver_name=driver_name,
+                    driver_type=driver_type,
+                    found=True,
+                    transactions_count=log_count
+                )
+                drivers.append(driver_info)
             
             if not drivers:
                 drivers.append(TerminalDriverInfo("Драйверы не найдены", "UNKNOWN", False, 0))
@@ -174,330 +1051,302 @@ class PaymentTerminalAnalyzer:
     def _count_logs_in_driver(self, driver_dir: str) -> int:
         """Подсчет лог-файлов в директории драйвера"""
         try:
-            count = 0
-            driver_path = Path(driver_dir)
-            
-            for item in driver_path.rglob("*.log"):
-                if item.is_file():
-                    count += 1
-            
-            return count
+            index, driver_name = self._index_driver(driver_dir)
+            return index.count_logs(driver_name)
         except:
             return 0
     
-    def analyze_inpas_driver(self, driver_dir: str, target_date: str) -> List[InpasTransaction]:
-        """Анализ драйвера INPAS"""
-        transactions = []
+    def _get_driver_handler(self, driver_type: str):
+        """Метод анализа для типа драйвера (None, если тип не поддерживается)"""
+        handlers = {
+            "INPAS": self.analyze_inpas_driver,
+            "SBERBANK": self.analyze_sberbank_driver,
+            "SC552": self.analyze_sberbank_driver,
+            "ARCUS2": self.analyze_arcus_driver
+        }
+        return handlers.get(driver_type)
+    
+    def analyze_drivers(self, pts_dir: str, drivers: List[TerminalDriverInfo], target_date: str,
+                        progress_callback=None) -> List[DriverAnalysisResult]:
+        """Параллельный анализ всех найденных драйверов.
+        
+        Каждый драйвер анализируется в своем потоке, а файлы всех драйверов
+        разбираются одним общим пулом процессов (не больше числа ядер), так что
+        драйверы не создают собственных пулов и не делят диск и ядра между
+        N×CPU процессами. progress_callback(driver_name, done, total)
+        вызывается по завершении каждого драйвера.
+        """
+        tasks = [
+            driver for driver in drivers
+            if driver.found and self._get_driver_handler(driver.driver_type) is not None
+        ]
+        if not tasks:
+            return []
         
+        # Индекс строится до запуска потоков, чтобы они его не перестраивали
+        if self.index is None or os.path.normpath(pts_dir) != self.index.root:
+            self.build_index(pts_dir)
+        
+        results = {}
+        self._process_pool = self._create_process_pool()
         try:
-            # Ищем файлы логов INPAS
-            log_patterns = [
-                f"DualConnector{target_date.replace('-', '')}.log",
-                f"DualConnector{target_date[2:].replace('-', '')}.log",  # Без 20 в году
-                "DualConnector*.log"
-            ]
-            
-            driver_path = Path(driver_dir)
-            log_files = []
-            
-            for pattern in log_patterns:
-                found_files = list(driver_path.rglob(pattern))
-                if found_files:
-                    log_files.extend(found_files)
-                    break
-            
-            if not log_files:
-                # Ищем любые log файлы в директории
-                log_files = list(driver_path.rglob("*.log"))
-            
-            for log_file in log_files:
-                self.logger.info(f"Анализ файла INPAS: {log_file}")
-                transactions.extend(self._parse_inpas_log(str(log_file), target_date))
+            with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                futures = {
+                    executor.submit(
+                        self._get_driver_handler(driver.driver_type),
+                        os.path.join(pts_dir, driver.driver_name),
+                        target_date
+                    ): driver
+                    for driver in tasks
+                }
                 
-        except Exception as e:
-            self.logger.error(f"Ошибка анализа драйвера INPAS: {e}")
+                for done, future in enumerate(as_completed(futures), 1):
+                    driver = futures[future]
+                    result = DriverAnalysisResult(driver.driver_name, driver.driver_type)
+                    try:
+                        result.transactions = future.result()
+                        for transaction in result.transactions:
+                            transaction.driver_name = driver.driver_name
+                    except Exception as e:
+                        # Ошибка драйвера видна в итогах, остальные драйверы анализируются дальше
+                        self.logger.error(f"Ошибка анализа драйвера {driver.driver_name}: {e}")
+                        result.error = str(e) or type(e).__name__
+                    
+                    results[driver.driver_name] = result
+                    if progress_callback:
+                        progress_callback(driver.driver_name, done, len(tasks))
+        finally:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+                self._process_pool = None
+        
+        # Порядок результатов - как в списке драйверов
+        return [results[driver.driver_name] for driver in tasks]
+    
+    def _create_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Общий пул процессов для файлов всех драйверов (None на одноядерной машине)"""
+        workers = os.cpu_count() or 1
+        if workers <= 1:
+            return None
+        try:
+            return ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            self.logger.warning(f"Пул процессов недоступен: {e}")
+            return None
+    
+    def analyze_inpas_driver(self, driver_dir: str, target_date: str) -> List[InpasTransaction]:
+        """Анализ драйвера INPAS (ошибки разбора передаются в analyze_drivers)"""
+        transactions = []
+        
+        # Ищем файлы логов INPAS
+        log_patterns = [
+            f"DualConnector{target_date.replace('-', '')}.log",
+            f"DualConnector{target_date[2:].replace('-', '')}.log",  # Без 20 в году
+            "DualConnector*.log"
+        ]
+        
+        index, driver_name = self._index_driver(driver_dir)
+        log_files = [info.path for info in index.find_first(driver_name, log_patterns)]
+        
+        if not log_files:
+            # Ищем любые log файлы в директории
+            log_files = [info.path for info in index.files(driver_name, "*.log")]
+        
+        for log_file in log_files:
+            self.logger.info(f"Анализ файла INPAS: {log_file}")
+        
+        per_file = parse_log_files_concurrently(InpasLogParser, log_files, target_date,
+                                                executor=self._process_pool)
+        for file_transactions in per_file:
+            transactions.extend(file_transactions)
         
         return transactions
     
     def _parse_inpas_log(self, log_path: str, target_date: str) -> List[InpasTransaction]:
-        """Парсинг лог-файла INPAS"""
+        """Парсинг лог-файла INPAS (однопроходный потоковый разбор)"""
         transactions = []
         
         try:
-            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                # Ищем начало транзакции (банковское название)
-                if 'ПАО' in line or 'АО' in line or 'БАНК' in line:
-                    transaction_data = {}
-                    
-                    # Собираем данные транзакции
-                    transaction_data['bank'] = line.strip()
-                    
-                    # Следующие строки могут содержать информацию о магазине и т.д.
-                    # Пропускаем несколько строк до "ОПЛАТА ПОКУПКИ"
-                    for j in range(i, min(i + 15, len(lines))):
-                        if 'ОПЛАТА ПОКУПКИ' in lines[j]:
-                            # Нашли транзакцию
-                            transaction_data['payment_type'] = 'ОПЛАТА ПОКУПКИ'
-                            
-                            # Ищем статус (обычно на следующей строке)
-                            if j + 1 < len(lines):
-                                status_line = lines[j + 1].strip()
-                                transaction_data['status'] = status_line
-                            
-                            # Ищем дату и время
-                            for k in range(j, min(j + 10, len(lines))):
-                                if target_date[:2] in lines[k]:  # Ищем день месяца
-                                    date_time_match = re.search(r'(\d{2}\.\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2})', lines[k])
-                                    if date_time_match:
-                                        transaction_data['date'] = date_time_match.group(1)
-                                        transaction_data['time'] = date_time_match.group(2)
-                                
-                                if 'ТЕРМИНАЛ:' in lines[k]:
-                                    terminal_match = re.search(r'ТЕРМИНАЛ:\s*(\d+)', lines[k])
-                                    if terminal_match:
-                                        transaction_data['terminal'] = terminal_match.group(1)
-                                
-                                if 'КАРТА' in lines[k]:
-                                    card_match = re.search(r'КАРТА\s+([A-Za-z ]+)', lines[k])
-                                    if card_match:
-                                        transaction_data['card_type'] = card_match.group(1).strip()
-                                
-                                if '**** **** **** ****' in lines[k]:
-                                    card_number_match = re.search(r'\*\*\*\*\s+\*\*\*\*\s+\*\*\*\*\s+\*\*\*\*\s+(\d{4})', lines[k])
-                                    if card_number_match:
-                                        transaction_data['card_last4'] = card_number_match.group(1)
-                                
-                                if 'СУММА (RUB)' in lines[k]:
-                                    amount_match = re.search(r'СУММА \(RUB\)\s+([\d\.]+)', lines[k])
-                                    if amount_match:
-                                        transaction_data['amount'] = amount_match.group(1)
-                                
-                                if 'КОД АВТОРИЗАЦИИ:' in lines[k]:
-                                    auth_match = re.search(r'КОД АВТОРИЗАЦИИ:\s+(\d+)', lines[k])
-                                    if auth_match:
-                                        transaction_data['auth_code'] = auth_match.group(1)
-                                
-                                if '№ ССЫЛКИ:' in lines[k]:
-                                    rrn_match = re.search(r'№ ССЫЛКИ:\s+(\d+)', lines[k])
-                                    if rrn_match:
-                                        transaction_data['rrn'] = rrn_match.group(1)
-                            
-                            # Если собрали все необходимые данные, создаем транзакцию
-                            if all(k in transaction_data for k in ['date', 'time', 'amount', 'terminal', 'status', 'bank']):
-                                transaction = InpasTransaction(
-                                    timestamp=f"{transaction_data['date']} {transaction_data['time']}",
-                                    amount=transaction_data['amount'],
-                                    terminal=transaction_data['terminal'],
-                                    status=transaction_data['status'],
-                                    bank=transaction_data['bank'],
-                                    card_type=transaction_data.get('card_type', ''),
-                                    auth_code=transaction_data.get('auth_code', ''),
-                                    rrn=transaction_data.get('rrn', '')
-                                )
-                                transactions.append(transaction)
-                            
-                            break  # Выходим из внутреннего цикла
-                    
-                    i = j + 10  # Пропускаем обработанные строки
-                else:
-                    i += 1
-                    
+            parser = InpasLogParser(target_date)
+            for transaction in parser.parse_file(log_path):
+                transactions.append(transaction)
         except Exception as e:
             self.logger.error(f"Ошибка парсинга лога INPAS: {e}")
         
         return transactions
     
     def analyze_sberbank_driver(self, driver_dir: str, target_date: str) -> List[SberbankTransaction]:
-        """Анализ драйвера Сбербанка (SberbankPilot или SC552)"""
+        """Анализ драйвера Сбербанка (SberbankPilot или SC552), ошибки разбора передаются в analyze_drivers"""
         transactions = []
         
-        try:
-            driver_path = Path(driver_dir)
+        index, driver_name = self._index_driver(driver_dir)
+        
+        # Ищем папки с цифрами (1, 2, 3, 4)
+        subdirs = index.numbered_subfolders(driver_name)
+        
+        # Если нет подпапок, используем саму директорию (None - весь драйвер)
+        if not subdirs:
+            subdirs = [None]
+        
+        # Собираем файлы всех подпапок, чтобы разобрать их одним пулом
+        log_files = []
+        for subdir in subdirs:
+            # Ищем файлы логов Сбербанка
+            log_patterns = [
+                f"sbkernel{target_date[5:7]}{target_date[8:10]}.log",  # MMDD
+                f"sbkernel{target_date[2:4]}{target_date[5:7]}.log",   # YYMM
+                "sbkernel*.log"
+            ]
             
-            # Ищем папки с цифрами (1, 2, 3, 4)
-            subdirs = []
-            for item in driver_path.iterdir():
-                if item.is_dir() and item.name.isdigit():
-                    subdirs.append(item)
+            subdir_files = index.find_first(driver_name, log_patterns, subdir)
             
-            # Если нет подпапок, используем саму директорию
-            if not subdirs:
-                subdirs = [driver_path]
+            if not subdir_files:
+                # Ищем любые log файлы
+                subdir_files = index.files(driver_name, "*.log", subdir)
             
-            for subdir in subdirs:
-                # Ищем файлы логов Сбербанка
-                log_patterns = [
-                    f"sbkernel{target_date[5:7]}{target_date[8:10]}.log",  # MMDD
-                    f"sbkernel{target_date[2:4]}{target_date[5:7]}.log",   # YYMM
-                    "sbkernel*.log"
-                ]
-                
-                log_files = []
-                for pattern in log_patterns:
-                    found_files = list(subdir.rglob(pattern))
-                    if found_files:
-                        log_files.extend(found_files)
-                        break
-                
-                if not log_files:
-                    # Ищем любые log файлы
-                    log_files = list(subdir.rglob("*.log"))
-                
-                for log_file in log_files:
-                    self.logger.info(f"Анализ файла Сбербанка: {log_file}")
-                    transactions.extend(self._parse_sberbank_log(str(log_file), target_date))
-                    
-        except Exception as e:
-            self.logger.error(f"Ошибка анализа драйвера Сбербанка: {e}")
+            log_files.extend(info.path for info in subdir_files)
+        
+        for log_file in log_files:
+            self.logger.info(f"Анализ файла Сбербанка: {log_file}")
+        
+        per_file = parse_log_files_concurrently(SberbankLogParser, log_files, target_date,
+                                                executor=self._process_pool)
+        transactions = self._merge_sberbank_transactions(per_file)
         
         return transactions
     
+    def _merge_sberbank_transactions(self, per_file: List[List[SberbankTransaction]]) -> List[SberbankTransaction]:
+        """Слияние транзакций нескольких файлов в единый список по времени без повторов GUID"""
+        merged = []
+        seen_guids = set()
+        
+        # Файл пишется последовательно, поэтому сортировка каждого списка почти линейна,
+        # а общий порядок получается слиянием без пересортировки всего объема
+        ordered = heapq.merge(*(sorted(txns, key=sberbank_sort_key) for txns in per_file), key=sberbank_sort_key)
+        
+        for transaction in ordered:
+            if transaction.guid:
+                if transaction.guid in seen_guids:
+                    continue
+                seen_guids.add(transaction.guid)
+            merged.append(transaction)
+        
+        return merged
+    
     def _parse_sberbank_log(self, log_path: str, target_date: str) -> List[SberbankTransaction]:
-        """Парсинг лог-файла Сбербанка"""
+        """Парсинг лог-файла Сбербанка (однопроходный потоковый разбор)"""
         transactions = []
         
         try:
-            # Конвертируем целевую дату в формат лога (DD.MM)
-            target_day_month = f"{target_date[8:10]}.{target_date[5:7]}"
-            
-            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-                
-                # Ищем строку с командой оплаты
-                if 'SBKRNL:' in line and 'Command = 4000' in line and target_day_month in line:
-                    transaction_data = {}
-                    
-                    # Извлекаем дату и время
-                    time_match = re.search(r'(\d{2}\.\d{2})\s+(\d{2}:\d{2}:\d{2}\.\d{3})', line)
-                    if time_match:
-                        transaction_data['date'] = time_match.group(1)
-                        transaction_data['time'] = time_match.group(2)
-                    
-                    # Извлекаем сумму
-                    amount_match = re.search(r'Amount\s*=\s*([\d\.]+)', line)
-                    if amount_match:
-                        transaction_data['amount'] = amount_match.group(1)
-                    
-                    # Извлекаем отдел
-                    dept_match = re.search(r'Department\s*=\s*(\d+)', line)
-                    if dept_match:
-                        transaction_data['department'] = dept_match.group(1)
-                    
-                    # Ищем следующие строки для получения дополнительной информации
-                    for j in range(i + 1, min(i + 20, len(lines))):
-                        next_line = lines[j]
-                        
-                        # Ищем версию
-                        if 'Version:' in next_line and 'MSBuild' not in next_line:
-                            version_match = re.search(r'Version:([\d\.]+)', next_line)
-                            if version_match:
-                                transaction_data['version'] = version_match.group(1)
-                        
-                        # Ищем результат транзакции
-                        if 'Result' in next_line and 'GUID' in next_line:
-                            result_match = re.search(r'Result\s*=\s*(\d+)', next_line)
-                            if result_match:
-                                transaction_data['result_code'] = result_match.group(1)
-                                transaction_data['status'] = self._convert_sberbank_result(result_match.group(1))
-                            
-                            guid_match = re.search(r'GUID=([A-F0-9]+)', next_line)
-                            if guid_match:
-                                transaction_data['guid'] = guid_match.group(1)
-                            
-                            card_match = re.search(r'\*\*\*\*\*\*\*\*\*\*\*\*(\d{4})', next_line)
-                            if card_match:
-                                transaction_data['card_last4'] = card_match.group(1)
-                    
-                    # Если собрали необходимые данные, создаем транзакцию
-                    if all(k in transaction_data for k in ['date', 'time', 'amount', 'status']):
-                        transaction = SberbankTransaction(
-                            timestamp=f"{transaction_data['date']} {transaction_data['time']}",
-                            amount=transaction_data['amount'],
-                            status=transaction_data['status'],
-                            version=transaction_data.get('version', ''),
-                            card_last4=transaction_data.get('card_last4', ''),
-                            guid=transaction_data.get('guid', ''),
-                            department=transaction_data.get('department', '')
-                        )
-                        transactions.append(transaction)
-                    
-                    i = j  # Пропускаем обработанные строки
-                else:
-                    i += 1
-                    
+            transactions = parse_log_file(SberbankLogParser, log_path, target_date)
         except Exception as e:
             self.logger.error(f"Ошибка парсинга лога Сбербанка: {e}")
         
         return transactions
     
+    def analyze_arcus_driver(self, driver_dir: str, target_date: str) -> List[ArcusTransaction]:
+        """Анализ драйвера ARCUS2 (ошибки разбора передаются в analyze_drivers)"""
+        transactions = []
+        
+        index, driver_name = self._index_driver(driver_dir)
+        all_logs = index.files(driver_name, "*.log")
+        
+        # Сначала файлы, в имени которых целевая дата; иначе все логи с фильтром по дате внутри
+        log_files = [info.path for info in all_logs if info.file_date == target_date]
+        if not log_files:
+            log_files = [info.path for info in all_logs]
+        
+        for log_file in log_files:
+            self.logger.info(f"Анализ файла ARCUS2: {log_file}")
+        
+        per_file = parse_log_files_concurrently(ArcusLogParser, log_files, target_date,
+                                                executor=self._process_pool)
+        for file_transactions in per_file:
+            transactions.extend(file_transactions)
+        
+        transactions.sort(key=lambda txn: txn.timestamp)
+        
+        return transactions
+    
     def _convert_sberbank_result(self, result_code: str) -> str:
         """Конвертация кода результата Сбербанка в текст"""
-        result_map = {
-            '0': 'Успешно',
-            '99': 'Потеряна связь',
-            '2000': 'Отменено пользователем',
-            '2001': 'Таймаут',
-            '2002': 'Ошибка карты',
-            '2003': 'Отказ банка'
-        }
-        return result_map.get(result_code, f"Код {result_code}")
+        return convert_sberbank_result(result_code)
     
     def format_drivers_result(self, drivers: List[TerminalDriverInfo]) -> str:
         """Форматирование информации о драйверах"""
         if not drivers:
             return "Драйверы терминалов не найдены"
         
-        output = "=== ОБНАРУЖЕННЫЕ ДРАЙВЕРЫ ТЕРМИНАЛОВ ===\n\n"
+        output = ["=== ОБНАРУЖЕННЫЕ ДРАЙВЕРЫ ТЕРМИНАЛОВ ===\n\n"]
         
         for driver in drivers:
-            output += f"• {driver.to_text()}\n"
+            output.append(f"• {driver.to_text()}\n")
+        
+        return "".join(output)
+    
+    def format_driver_results(self, results: List[DriverAnalysisResult]) -> str:
+        """Форматирование итогов по драйверам"""
+        if not results:
+            return "Поддерживаемые драйверы для анализа не найдены"
+        
+        output = ["=== ИТОГИ ПО ДРАЙВЕРАМ ===\n\n"]
         
-        return output
+        for result in results:
+            output.append(f"• {result.to_text()}\n")
+        
+        return "".join(output)
     
     def format_inpas_result(self, transactions: List[InpasTransaction]) -> str:
         """Форматирование результатов INPAS"""
         if not transactions:
             return "Транзакции INPAS не найдены"
         
-        output = f"=== ТРАНЗАКЦИИ INPAS ({len(transactions)}) ===\n\n"
-        output += "Дата и время        | Сумма    | Терминал  | Статус    | Банк                 | Тип карты      | Код авторизации | RRN\n"
-        output += "-" * 120 + "\n"
+        output = [f"=== ТРАНЗАКЦИИ INPAS ({len(transactions)}) ===\n\n"]
+        output.append("Дата и время        | Сумма    | Терминал  | Статус    | Банк                 | Тип карты      | Код авторизации | RRN\n")
+        output.append("-" * 120 + "\n")
         
         for txn in transactions[:100]:  # Ограничиваем вывод
             bank_short = txn.bank[:20] if len(txn.bank) > 20 else txn.bank
-            output += f"{txn.timestamp:19} | {txn.amount:8} | {txn.terminal:9} | {txn.status:9} | {bank_short:20} | {txn.card_type:14} | {txn.auth_code:15} | {txn.rrn}\n"
+            output.append(f"{txn.timestamp:19} | {txn.amount:8} | {txn.terminal:9} | {txn.status:9} | {bank_short:20} | {txn.card_type:14} | {txn.auth_code:15} | {txn.rrn}\n")
         
         if len(transactions) > 100:
-            output += f"\n... и еще {len(transactions) - 100} транзакций\n"
+            output.append(f"\n... и еще {len(transactions) - 100} транзакций\n")
         
-        return output
+        return "".join(output)
     
     def format_sberbank_result(self, transactions: List[SberbankTransaction]) -> str:
         """Форматирование результатов Сбербанка"""
         if not transactions:
             return "Транзакции Сбербанка не найдены"
         
-        output = f"=== ТРАНЗАКЦИИ СБЕРБАНКА ({len(transactions)}) ===\n\n"
-        output += "Дата и время        | Сумма    | Статус              | Версия   | Карта | GUID       | Отдел\n"
-        output += "-" * 100 + "\n"
+        output = [f"=== ТРАНЗАКЦИИ СБЕРБАНКА ({len(transactions)}) ===\n\n"]
+        output.append("Дата и время        | Сумма    | Статус              | Версия   | Карта | GUID       | Отдел\n")
+        output.append("-" * 100 + "\n")
+        
+        for txn in transactions[:100]:  # Ограничиваем вывод
+            output.append(f"{txn.timestamp:19} | {txn.amount:8} | {txn.status:19} | {txn.version:8} | {txn.card_last4:5} | {txn.guid:10} | {txn.department}\n")
+        
+        if len(transactions) > 100:
+            output.append(f"\n... и еще {len(transactions) - 100} транзакций\n")
+        
+        return "".join(output)
+    
+    def format_arcus_result(self, transactions: List[ArcusTransaction]) -> str:
+        """Форматирование результатов ARCUS2"""
+        if not transactions:
+            return "Транзакции ARCUS2 не найдены"
+        
+        output = [f"=== ТРАНЗАКЦИИ ARCUS2 ({len(transactions)}) ===\n\n"]
+        output.append("Дата и время        | Сумма    | Операция      | Статус          | Карта | Код авторизации | RRN          | Терминал\n")
+        output.append("-" * 120 + "\n")
         
         for txn in transactions[:100]:  # Ограничиваем вывод
-            output += f"{txn.timestamp:19} | {txn.amount:8} | {txn.status:19} | {txn.version:8} | {txn.card_last4:5} | {txn.guid:10} | {txn.department}\n"
+            output.append(f"{txn.timestamp:19} | {txn.amount:8} | {txn.operation:13} | {txn.status:15} | {txn.card_last4:5} | {txn.auth_code:15} | {txn.rrn:12} | {txn.terminal}\n")
         
         if len(transactions) > 100:
-            output += f"\n... и еще {len(transactions) - 100} транзакций\n"
+            output.append(f"\n... и еще {len(transactions) - 100} транзакций\n")
         
-        return output
+        return "".join(output)
     
     def cleanup(self):
         """Очистка временных файлов"""
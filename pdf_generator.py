@@ -8,68 +8,92 @@ from reportlab.lib.units import mm
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Optional, Callable
+from xml.sax.saxutils import escape
 import os
+import threading
+
+from report_generator import days_limit_label, sla_limits_of, short_department_name
 
 logger = logging.getLogger(__name__)
 
+# Шрифты и стили общие для процесса: регистрация TTF и сборка таблицы стилей
+# выполняются один раз, генераторы (в том числе из фоновых потоков) их переиспользуют
+_resources_lock = threading.Lock()
+_font_names: Optional[Tuple[str, str]] = None
+_style_sheets: Dict[type, Any] = {}
+
+class PDFBuildCancelled(Exception):
+    """Сборка PDF отменена пользователем"""
+
+def register_russian_fonts() -> Tuple[str, str]:
+    """Регистрация русских шрифтов (один раз на процесс): (обычный, жирный)"""
+    global _font_names
+    with _resources_lock:
+        if _font_names is None:
+            _font_names = _register_russian_fonts()
+        return _font_names
+
+def _register_russian_fonts() -> Tuple[str, str]:
+    try:
+        # Используем DejaVu Sans который поддерживает кириллицу
+        font_paths = [
+            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+            '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+            '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+            '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf',
+        ]
+        
+        regular_font_registered = False
+        bold_font_registered = False
+        
+        for font_path in font_paths:
+            if os.path.exists(font_path):
+                try:
+                    if 'Bold' in font_path and not bold_font_registered:
+                        pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', font_path))
+                        bold_font_registered = True
+                        logger.info(f"Зарегистрирован жирный шрифт: {font_path}")
+                    elif 'Bold' not in font_path and not regular_font_registered:
+                        pdfmetrics.registerFont(TTFont('DejaVuSans', font_path))
+                        regular_font_registered = True
+                        logger.info(f"Зарегистрирован обычный шрифт: {font_path}")
+                except Exception as e:
+                    logger.warning(f"Не удалось зарегистрировать шрифт {font_path}: {e}")
+                    continue
+        
+        if regular_font_registered and bold_font_registered:
+            logger.info("Успешно зарегистрированы русские шрифты")
+            return 'DejaVuSans', 'DejaVuSans-Bold'
+        
+        # Используем стандартные шрифты как запасной вариант
+        logger.warning("Русские шрифты не найдены, используется Helvetica")
+        return 'Helvetica', 'Helvetica-Bold'
+            
+    except Exception as e:
+        logger.error(f"Ошибка регистрации шрифтов: {e}")
+        return 'Helvetica', 'Helvetica-Bold'
+
 class PDFReportGenerator:
     def __init__(self, analysis_data: Dict[str, Any], month: str, year: int, department: str = "Отдел"):
         self.analysis = analysis_data
         self.month = month
         self.year = year
         self.department = department
-        self.styles = getSampleStyleSheet()
         
-        # Регистрируем русские шрифты
-        self._register_russian_fonts()
-        
-        # Создаем кастомные стили
-        self._create_custom_styles()
+        # Русские шрифты и стили берем из общего кэша процесса
+        self.font_name, self.bold_font_name = register_russian_fonts()
+        self.styles = self._shared_styles()
     
-    def _register_russian_fonts(self):
-        """Регистрация русских шрифтов"""
-        try:
-            # Используем DejaVu Sans который поддерживает кириллицу
-            font_paths = [
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-                '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
-                '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf',
-            ]
-            
-            regular_font_registered = False
-            bold_font_registered = False
-            
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    try:
-                        if 'Bold' in font_path and not bold_font_registered:
-                            pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', font_path))
-                            bold_font_registered = True
-                            logger.info(f"Зарегистрирован жирный шрифт: {font_path}")
-                        elif 'Bold' not in font_path and not regular_font_registered:
-                            pdfmetrics.registerFont(TTFont('DejaVuSans', font_path))
-                            regular_font_registered = True
-                            logger.info(f"Зарегистрирован обычный шрифт: {font_path}")
-                    except Exception as e:
-                        logger.warning(f"Не удалось зарегистрировать шрифт {font_path}: {e}")
-                        continue
-            
-            if regular_font_registered and bold_font_registered:
-                self.font_name = 'DejaVuSans'
-                self.bold_font_name = 'DejaVuSans-Bold'
-                logger.info("Успешно зарегистрированы русские шрифты")
-            else:
-                # Используем стандартные шрифты как запасной вариант
-                self.font_name = 'Helvetica'
-                self.bold_font_name = 'Helvetica-Bold'
-                logger.warning("Русские шрифты не найдены, используется Helvetica")
-                
-        except Exception as e:
-            logger.error(f"Ошибка регистрации шрифтов: {e}")
-            self.font_name = 'Helvetica'
-            self.bold_font_name = 'Helvetica-Bold'
+    def _shared_styles(self):
+        """Таблица стилей класса: создается при первом генераторе и дальше не меняется"""
+        with _resources_lock:
+            styles = _style_sheets.get(type(self))
+            if styles is None:
+                self.styles = getSampleStyleSheet()
+                self._create_custom_styles()
+                styles = _style_sheets[type(self)] = self.styles
+            return styles
     
     def _create_custom_styles(self):
         """Создание кастомных стилей для документа"""
@@ -104,6 +128,21 @@ class PDFReportGenerator:
             spaceAfter=6
         ))
     
+    def _table_style(self, header_color, body_color) -> TableStyle:
+        """Компактный стиль таблиц тренда и сравнения отделов"""
+        return TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), header_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font_name),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('FONTNAME', (0, 1), (-1, -1), self.font_name),
+            ('FONTSIZE', (0, 1), (-1, -1), 7),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, body_color])
+        ])
+    
     def _calculate_percentage(self, count: int) -> str:
         """Вычисление процента от общего количества ошибок"""
         if self.analysis['total_errors'] == 0:
@@ -148,6 +187,33 @@ class PDFReportGenerator:
         
         return table
     
+    def _create_days_table(self):
+        """Создание таблицы дней в работе (анализ по кубу выгрузки)"""
+        days = self.analysis.get('days_in_work')
+        if not days or days['count'] == 0:
+            return None
+        
+        data = [
+            ['Дней в работе', 'Среднее', 'Медиана', '90-й перц.', '99-й перц.'],
+            [f"{days['sum']:g}", f"{days['mean']:.1f}", f"{days['p50']:g}", f"{days['p90']:g}", f"{days['p99']:g}"]
+        ]
+        
+        table = Table(data, colWidths=[40*mm, 35*mm, 35*mm, 35*mm, 35*mm])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font_name),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('FONTNAME', (0, 1), (-1, -1), self.font_name),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        
+        return table
+    
     def _create_deadline_violations_table(self):
         """Создание таблицы нарушений сроков"""
         data = [
@@ -156,11 +222,12 @@ class PDFReportGenerator:
         
         significant_stats = self.analysis['deadline_violations_significant']
         critical_stats = self.analysis['deadline_violations_critical']
+        limits = sla_limits_of(self.analysis)
         
         if significant_stats['total'] > 0:
             significant_percentage = (significant_stats['violations'] / significant_stats['total']) * 100
             data.append([
-                'Значительные (>14 дней)',
+                f"Значительные ({days_limit_label(limits.get('Значительная'))})",
                 significant_stats['total'],
                 significant_stats['violations'],
                 f"{significant_percentage:.1f}%"
@@ -169,7 +236,7 @@ class PDFReportGenerator:
         if critical_stats['total'] > 0:
             critical_percentage = (critical_stats['violations'] / critical_stats['total']) * 100
             data.append([
-                'Критические (>1 дня)',
+                f"Критические ({days_limit_label(limits.get('Критическая'))})",
                 critical_stats['total'],
                 critical_stats['violations'],
                 f"{critical_percentage:.1f}%"
@@ -192,6 +259,84 @@ class PDFReportGenerator:
             return table
         return None
     
+    def _create_sla_table(self):
+        """Создание таблицы SLA по серьезности (анализ по кубу выгрузки)"""
+        sla = self.analysis.get('sla')
+        if not sla or not sla['by_seriousness']:
+            return None
+        
+        data = [
+            ['Серьезность', 'Лимит', 'Всего', 'Нарушено', 'Медиана', 'p90', 'p99']
+        ]
+        
+        for seriousness, row in sla['by_seriousness'].items():
+            data.append([
+                seriousness[:25],
+                days_limit_label(row['limit']),
+                row['total'],
+                row['violations'] if row['limit'] is not None else '-',
+                f"{row['p50']:g}",
+                f"{row['p90']:g}",
+                f"{row['p99']:g}"
+            ])
+        
+        table = Table(data, colWidths=[40*mm, 25*mm, 20*mm, 25*mm, 25*mm, 20*mm, 20*mm])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightcoral),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font_name),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.mistyrose),
+            ('FONTNAME', (0, 1), (-1, -1), self.font_name),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+        
+        return table
+    
+    def _create_sla_top_table(self, key: str, column_title: str):
+        """Создание таблицы секторов или участков с наибольшим числом нарушений SLA"""
+        sla = self.analysis.get('sla')
+        if not sla:
+            return None
+        
+        rows = [(name, row) for name, row in sla[key].items() if row['violations'] > 0][:10]
+        if not rows:
+            return None
+        
+        data = [
+            [column_title, 'Под SLA', 'Нарушено', '%', 'Медиана', 'p90', 'p99']
+        ]
+        
+        for name, row in rows:
+            data.append([
+                name[:30] + '...' if len(name) > 30 else name,
+                row['tracked'],
+                row['violations'],
+                f"{row['violations'] / row['tracked'] * 100:.1f}%",
+                f"{row['p50']:g}",
+                f"{row['p90']:g}",
+                f"{row['p99']:g}"
+            ])
+        
+        table = Table(data, colWidths=[50*mm, 20*mm, 20*mm, 20*mm, 20*mm, 20*mm, 20*mm])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.darkred),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), self.bold_font_name),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('FONTNAME', (0, 1), (-1, -1), self.font_name),
+            ('FONTSIZE', (0, 1), (-1, -1), 7),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.mistyrose])
+        ]))
+        
+        return table
+    
     def _create_sector_top_table(self):
         """Создание таблицы ТОП секторов"""
         if not self.analysis['sector_top10']:
@@ -266,88 +411,452 @@ class PDFReportGenerator:
         
         return table
     
+    def _build_story(self) -> list:
+        """Содержимое документа"""
+        story = []
+        
+        # Заголовок документа
+        title = Paragraph(f"ОТЧЕТ ПО ОШИБКАМ ЗА {self.month.upper()} {self.year}г.", self.styles['TitleStyle'])
+        story.append(title)
+        
+        # Информация об отделе и дате
+        story.extend(self._create_info_paragraphs())
+        
+        # Основная статистика
+        story.append(Paragraph("1. ОСНОВНАЯ СТАТИСТИКА", self.styles['HeadingStyle']))
+        story.append(self._create_main_statistics_table())
+        days_table = self._create_days_table()
+        if days_table:
+            story.append(Spacer(1, 10))
+            story.append(days_table)
+        story.append(Spacer(1, 15))
+        
+        # Нарушения сроков
+        deadline_table = self._create_deadline_violations_table()
+        sla_table = self._create_sla_table()
+        if deadline_table or sla_table:
+            story.append(Paragraph("2. НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ", self.styles['HeadingStyle']))
+            for table in (deadline_table, sla_table):
+                if table:
+                    story.append(table)
+                    story.append(Spacer(1, 15))
+        
+        # ТОП секторов
+        sector_table = self._create_sector_top_table()
+        if sector_table:
+            story.append(Paragraph("3. ТОП-10 СЕКТОРОВ ПО КОЛИЧЕСТВУ ОШИБОК", self.styles['HeadingStyle']))
+            story.append(sector_table)
+            story.append(Spacer(1, 15))
+        
+        # ТОП участков
+        area_table = self._create_area_top_table()
+        if area_table:
+            story.append(Paragraph("4. ТОП-10 УЧАСТКОВ ПО КОЛИЧЕСТВУ ОШИБОК", self.styles['HeadingStyle']))
+            story.append(area_table)
+        
+        # Нарушения SLA по секторам и участкам
+        sla_sector_table = self._create_sla_top_table('by_sector', 'Сектор')
+        sla_area_table = self._create_sla_top_table('by_area', 'Участок')
+        if sla_sector_table or sla_area_table:
+            story.append(Paragraph("5. НАРУШЕНИЯ SLA ПО СЕКТОРАМ И УЧАСТКАМ", self.styles['HeadingStyle']))
+            for table in (sla_sector_table, sla_area_table):
+                if table:
+                    story.append(table)
+                    story.append(Spacer(1, 15))
+        
+        # Футер с автором
+        story.append(Spacer(1, 20))
+        footer = Paragraph(f"by Aleksey Pankratov", self.styles['BodyStyle'])
+        story.append(footer)
+        
+        return story
+    
+    def _create_info_paragraphs(self) -> list:
+        """Отдел, фильтр среза и дата формирования"""
+        paragraphs = [Paragraph(f"Отдел: {self.department}", self.styles['BodyStyle'])]
+        filters = self.analysis.get('filters')
+        if filters:
+            text = "; ".join(f"{column}: {', '.join(values)}" for column, values in filters.items())
+            paragraphs.append(Paragraph(f"Фильтр: {escape(text)}", self.styles['BodyStyle']))
+        paragraphs.append(Paragraph(f"Дата формирования: {datetime.now().strftime('%d.%m.%Y %H:%M')}", self.styles['BodyStyle']))
+        paragraphs.append(Spacer(1, 15))
+        return paragraphs
+    
+    def _default_file_name(self) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"отчет_ошибок_{timestamp}.pdf"
+    
+    def build_pdf(self, file_path: str, progress_callback: Optional[Callable[[int], None]] = None,
+                  is_cancelled: Optional[Callable[[], bool]] = None) -> str:
+        """Сборка PDF документа в указанный файл.
+        
+        progress_callback получает процент обработанных элементов документа,
+        is_cancelled опрашивается по ходу сборки - при отмене выбрасывается
+        PDFBuildCancelled. При отмене и любой ошибке сборки недособранный
+        файл удаляется.
+        """
+        doc = SimpleDocTemplate(
+            file_path,
+            pagesize=A4,
+            rightMargin=20*mm,
+            leftMargin=20*mm,
+            topMargin=20*mm,
+            bottomMargin=20*mm
+        )
+        
+        flowable_count = [1]
+        
+        def on_progress(event, value):
+            if is_cancelled and is_cancelled():
+                raise PDFBuildCancelled(file_path)
+            if event == 'SIZE_EST':
+                flowable_count[0] = max(value, 1)
+            elif event == 'PROGRESS' and progress_callback:
+                progress_callback(min(100, value * 100 // flowable_count[0]))
+        
+        doc.setProgressCallBack(on_progress)
+        
+        try:
+            doc.build(self._build_story())
+        except Exception as e:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            if isinstance(e, PDFBuildCancelled):
+                logger.info(f"Создание PDF отменено: {file_path}")
+            else:
+                logger.error(f"Ошибка сборки PDF {file_path}: {e}")
+            raise
+        
+        logger.info(f"PDF документ успешно создан: {file_path}")
+        return file_path
+    
+    def ask_file_path(self, parent_window=None) -> str:
+        """Выбор файла для сохранения PDF (пустая строка - пользователь отменил)"""
+        from PyQt5.QtWidgets import QFileDialog
+        
+        # Предлагаем выбрать папку и имя файла
+        file_path, _ = QFileDialog.getSaveFileName(
+            parent_window,
+            "Сохранить отчет как PDF",
+            self._default_file_name(),
+            "PDF Files (*.pdf);;All Files (*)"
+        )
+        
+        if not file_path:
+            return ""  # Пользователь отменил
+        
+        # Добавляем расширение .pdf если его нет
+        if not file_path.lower().endswith('.pdf'):
+            file_path += '.pdf'
+        
+        return file_path
+    
     def generate_pdf(self, parent_window=None):
         """Генерация PDF документа с выбором папки"""
         try:
-            from PyQt5.QtWidgets import QFileDialog
-            from datetime import datetime
-            
-            # Предлагаем выбрать папку и имя файла
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            default_name = f"отчет_ошибок_{timestamp}.pdf"
-            
-            file_path, _ = QFileDialog.getSaveFileName(
-                parent_window,
-                "Сохранить отчет как PDF",
-                default_name,
-                "PDF Files (*.pdf);;All Files (*)"
-            )
-            
+            file_path = self.ask_file_path(parent_window)
             if not file_path:
-                return ""  # Пользователь отменил
-            
-            # Добавляем расширение .pdf если его нет
-            if not file_path.lower().endswith('.pdf'):
-                file_path += '.pdf'
-            
-            doc = SimpleDocTemplate(
-                file_path,
-                pagesize=A4,
-                rightMargin=20*mm,
-                leftMargin=20*mm,
-                topMargin=20*mm,
-                bottomMargin=20*mm
-            )
-            
-            story = []
+                return ""
             
-            # Заголовок документа
-            title = Paragraph(f"ОТЧЕТ ПО ОШИБКАМ ЗА {self.month.upper()} {self.year}г.", self.styles['TitleStyle'])
-            story.append(title)
-            
-            # Информация об отделе и дате
-            department_info = Paragraph(f"Отдел: {self.department}", self.styles['BodyStyle'])
-            date_info = Paragraph(f"Дата формирования: {datetime.now().strftime('%d.%m.%Y %H:%M')}", self.styles['BodyStyle'])
-            story.append(department_info)
-            story.append(date_info)
-            story.append(Spacer(1, 15))
-            
-            # Основная статистика
-            story.append(Paragraph("1. ОСНОВНАЯ СТАТИСТИКА", self.styles['HeadingStyle']))
-            story.append(self._create_main_statistics_table())
-            story.append(Spacer(1, 15))
-            
-            # Нарушения сроков
-            deadline_table = self._create_deadline_violations_table()
-            if deadline_table:
-                story.append(Paragraph("2. НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ", self.styles['HeadingStyle']))
-                story.append(deadline_table)
-                story.append(Spacer(1, 15))
-            
-            # ТОП секторов
-            sector_table = self._create_sector_top_table()
-            if sector_table:
-                story.append(Paragraph("3. ТОП-10 СЕКТОРОВ ПО КОЛИЧЕСТВУ ОШИБОК", self.styles['HeadingStyle']))
-                story.append(sector_table)
-                story.append(Spacer(1, 15))
-            
-            # ТОП участков
-            area_table = self._create_area_top_table()
-            if area_table:
-                story.append(Paragraph("4. ТОП-10 УЧАСТКОВ ПО КОЛИЧЕСТВУ ОШИБОК", self.styles['HeadingStyle']))
-                story.append(area_table)
-            
-            # Футер с автором
-            story.append(Spacer(1, 20))
-            footer = Paragraph(f"by Aleksey Pankratov", self.styles['BodyStyle'])
-            story.append(footer)
-            
-            # Создаем документ
-            doc.build(story)
-            logger.info(f"PDF документ успешно создан: {file_path}")
-            
-            return file_path
+            return self.build_pdf(file_path)
             
         except Exception as e:
             logger.error(f"Ошибка при создании PDF: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+
+class TrendPDFReportGenerator(PDFReportGenerator):
+    """PDF отчет по тренду ошибок (результат TrendAnalyzer.analyze)"""
+    
+    def __init__(self, trend_data: Dict[str, Any], year: int, department: str = "Отдел"):
+        self.trend = trend_data
+        self.months = trend_data['months']
+        period = self.months[0] if len(self.months) == 1 else f"{self.months[0]} – {self.months[-1]}"
+        super().__init__({'total_errors': trend_data['total_errors']}, period, year, department)
+    
+    def _create_main_trend_table(self):
+        """Основные показатели: строка на месяц"""
+        data = [['Месяц', 'Всего', 'Успешно', 'Уточнение', 'С проблемами', 'В работе', 'Изменение']]
+        
+        previous = None
+        for month in self.months:
+            analysis = self.trend['by_month'][month]
+            total = analysis['total_errors']
+            change = f"{total - previous:+d}" if previous is not None else ''
+            data.append([
+                month,
+                total,
+                analysis['successfully_closed'],
+                analysis['clarification_required'],
+                analysis['closed_with_problems'],
+                analysis['in_progress'],
+                change
+            ])
+            previous = total
+        
+        table = Table(data, colWidths=[30*mm, 20*mm, 22*mm, 24*mm, 26*mm, 22*mm, 26*mm])
+        table.setStyle(self._table_style(colors.lightblue, colors.beige))
+        return table
+    
+    def _create_deadline_trend_table(self):
+        """Нарушения сроков по месяцам"""
+        limits = sla_limits_of(self.trend)
+        data = [['Месяц', f"Значительные ({days_limit_label(limits.get('Значительная'))})", '%',
+                 f"Критические ({days_limit_label(limits.get('Критическая'))})", '%']]
+        
+        for month in self.months:
+            row = [month]
+            for key in ('deadline_violations_significant', 'deadline_violations_critical'):
+                stats = self.trend['by_month'][month][key]
+                row.append(f"{stats['violations']}/{stats['total']}")
+                row.append(f"{stats['violations'] / stats['total'] * 100:.1f}%" if stats['total'] else '-')
+            data.append(row)
+        
+        table = Table(data, colWidths=[30*mm, 45*mm, 25*mm, 45*mm, 25*mm])
+        table.setStyle(self._table_style(colors.lightcoral, colors.mistyrose))
+        return table
+    
+    def _create_top_trend_table(self, column_title: str, trend: Dict[str, list], header_color, body_color):
+        """ТОП-10 значений за период с числом ошибок по месяцам"""
+        if not trend:
+            return None
+        
+        # Колонки месяцев делят ширину страницы, названия - первые три буквы при длинном периоде
+        month_titles = [month[:3] if len(self.months) > 6 else month for month in self.months]
+        data = [[column_title] + month_titles]
+        for name, counts in trend.items():
+            data.append([name[:30] + '...' if len(name) > 30 else name] + counts)
+        
+        month_width = 120*mm / len(self.months)
+        table = Table(data, colWidths=[50*mm] + [month_width] * len(self.months))
+        table.setStyle(self._table_style(header_color, body_color))
+        return table
+    
+    def _build_story(self) -> list:
+        story = []
+        
+        story.append(Paragraph(f"ТРЕНД ОШИБОК ЗА {self.month.upper()} {self.year}г.", self.styles['TitleStyle']))
+        story.extend(self._create_info_paragraphs())
+        
+        story.append(Paragraph("1. ОСНОВНЫЕ ПОКАЗАТЕЛИ ПО МЕСЯЦАМ", self.styles['HeadingStyle']))
+        story.append(self._create_main_trend_table())
+        story.append(Spacer(1, 15))
+        
+        story.append(Paragraph("2. НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ", self.styles['HeadingStyle']))
+        story.append(self._create_deadline_trend_table())
+        story.append(Spacer(1, 15))
+        
+        sector_table = self._create_top_trend_table(
+            'Сектор', self.trend['sector_trend'], colors.darkgreen, colors.honeydew)
+        if sector_table:
+            story.append(Paragraph("3. ТОП-10 СЕКТОРОВ ЗА ПЕРИОД", self.styles['HeadingStyle']))
+            story.append(sector_table)
+            story.append(Spacer(1, 15))
+        
+        area_table = self._create_top_trend_table(
+            'Участок', self.trend['area_trend'], colors.darkorange, colors.lemonchiffon)
+        if area_table:
+            story.append(Paragraph("4. ТОП-10 УЧАСТКОВ ЗА ПЕРИОД", self.styles['HeadingStyle']))
+            story.append(area_table)
+        
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("by Aleksey Pankratov", self.styles['BodyStyle']))
+        
+        return story
+    
+    def _default_file_name(self) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"тренд_ошибок_{timestamp}.pdf"
+
+
+class ComparisonPDFReportGenerator(PDFReportGenerator):
+    """PDF отчет сравнения отделов (результат DepartmentComparison.analyze)"""
+    
+    def __init__(self, comparison_data: Dict[str, Any], month: str, year: int):
+        self.comparison = comparison_data
+        self.departments = comparison_data['departments']
+        super().__init__({'total_errors': comparison_data['total_errors']}, month, year,
+                         ", ".join(short_department_name(name) for name in self.departments))
+    
+    def _comparison_table(self, data, header_color, body_color):
+        column_width = 125*mm / max(len(self.departments), 1)
+        table = Table(data, colWidths=[45*mm] + [column_width] * len(self.departments))
+        table.setStyle(self._table_style(header_color, body_color))
+        return table
+    
+    def _header_row(self, title: str) -> list:
+        return [title] + [Paragraph(escape(short_department_name(name)), self.styles['TableHeaderStyle'])
+                          for name in self.departments]
+    
+    def _create_main_comparison_table(self):
+        """Основные показатели отделов с долей от ошибок отдела"""
+        by_department = self.comparison['by_department']
+        rates = self.comparison['normalized']['rates']
+        
+        data = [self._header_row('Показатель')]
+        data.append(['Всего ошибок'] + [by_department[name]['total_errors'] for name in self.departments])
+        data.append(['Доля от всех отделов'] + [f"{rates[name]['share_of_total']:.1f}%" for name in self.departments])
+        data.append(['Нагрузка к среднему'] + [f"{rates[name]['load_index']:.2f}" for name in self.departments])
+        for metric, title in (('successfully_closed', 'Успешно закрыто'),
+                              ('clarification_required', 'На уточнении'),
+                              ('closed_with_problems', 'Закрыто с проблемами'),
+                              ('in_progress', 'На выполнении')):
+            data.append([title] + [f"{by_department[name][metric]} ({rates[name][metric]:.1f}%)"
+                                   for name in self.departments])
+        
+        return self._comparison_table(data, colors.lightblue, colors.beige)
+    
+    def _create_deadline_comparison_table(self):
+        """Нарушения сроков по общей таблице SLA"""
+        by_department = self.comparison['by_department']
+        limits = sla_limits_of(self.comparison)
+        
+        data = [self._header_row('Серьезность')]
+        for key, seriousness, title in (('deadline_violations_significant', 'Значительная', 'Значительные'),
+                                        ('deadline_violations_critical', 'Критическая', 'Критические')):
+            row = [f"{title} ({days_limit_label(limits.get(seriousness))})"]
+            for name in self.departments:
+                stats = by_department[name][key]
+                row.append(f"{stats['violations']}/{stats['total']} ({stats['violations'] / stats['total'] * 100:.1f}%)"
+                           if stats['total'] else 'нет данных')
+            data.append(row)
+        
+        return self._comparison_table(data, colors.lightcoral, colors.mistyrose)
+    
+    def _create_seriousness_comparison_table(self):
+        """Серьезность в общей базе: доля ошибок / нарушения SLA / медиана дней"""
+        normalized = self.comparison['normalized']
+        if not normalized['seriousness_order']:
+            return None
+        
+        data = [self._header_row('Серьезность')]
+        for seriousness in normalized['seriousness_order']:
+            row = [seriousness[:25]]
+            for name in self.departments:
+                cell = normalized['seriousness'][name][seriousness]
+                if cell is None:
+                    row.append('-')
+                    continue
+                violation = f"{cell['violation_rate']:.0f}%" if cell['violation_rate'] is not None else '-'
+                row.append(f"{cell['share']:.0f}% / {violation} / {cell['p50']:g}")
+            data.append(row)
+        
+        return self._comparison_table(data, colors.darkred, colors.mistyrose)
+    
+    def _create_department_sector_table(self, name: str):
+        """ТОП-5 секторов отдела"""
+        analysis = self.comparison['by_department'][name]
+        sectors = list(analysis['sector_top10'].items())[:5]
+        if not sectors:
+            return None
+        
+        data = [['Сектор', 'Всего', 'Успешно', 'С проблемами', 'В работе', '%']]
+        for sector, stats in sectors:
+            data.append([
+                sector[:30] + '...' if len(sector) > 30 else sector,
+                stats['total'],
+                stats['successful'],
+                stats['with_problems'],
+                stats['in_progress'],
+                f"{stats['total'] / analysis['total_errors'] * 100:.1f}%"
+            ])
+        
+        table = Table(data, colWidths=[50*mm, 20*mm, 20*mm, 25*mm, 20*mm, 25*mm])
+        table.setStyle(self._table_style(colors.darkgreen, colors.honeydew))
+        return table
+    
+    def _create_custom_styles(self):
+        super()._create_custom_styles()
+        self.styles.add(ParagraphStyle(
+            name='TableHeaderStyle',
+            parent=self.styles['Normal'],
+            fontName=self.bold_font_name,
+            fontSize=8,
+            alignment=1,
+            textColor=colors.white
+        ))
+    
+    def _build_story(self) -> list:
+        story = []
+        
+        story.append(Paragraph(f"СРАВНЕНИЕ ОТДЕЛОВ ЗА {self.month.upper()} {self.year}г.", self.styles['TitleStyle']))
+        story.extend(self._create_info_paragraphs())
+        
+        story.append(Paragraph("1. ОСНОВНАЯ СТАТИСТИКА ОТДЕЛОВ", self.styles['HeadingStyle']))
+        story.append(self._create_main_comparison_table())
+        story.append(Spacer(1, 15))
+        
+        story.append(Paragraph("2. НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ", self.styles['HeadingStyle']))
+        story.append(self._create_deadline_comparison_table())
+        story.append(Spacer(1, 15))
+        
+        seriousness_table = self._create_seriousness_comparison_table()
+        if seriousness_table:
+            story.append(Paragraph("3. СЕРЬЕЗНОСТЬ: ДОЛЯ ОШИБОК / НАРУШЕНИЯ SLA / МЕДИАНА ДНЕЙ",
+                                   self.styles['HeadingStyle']))
+            story.append(seriousness_table)
+            story.append(Spacer(1, 15))
+        
+        story.append(Paragraph("4. ТОП-5 СЕКТОРОВ ОТДЕЛОВ", self.styles['HeadingStyle']))
+        for name in self.departments:
+            story.append(Paragraph(escape(name), self.styles['BodyStyle']))
+            table = self._create_department_sector_table(name)
+            story.append(table if table else Paragraph("Нет данных", self.styles['BodyStyle']))
+            story.append(Spacer(1, 10))
+        
+        story.append(Spacer(1, 20))
+        story.append(Paragraph("by Aleksey Pankratov", self.styles['BodyStyle']))
+        
+        return story
+    
+    def _default_file_name(self) -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"сравнение_отделов_{timestamp}.pdf"
+
+
+def department_month_jobs(analyses: Dict[Tuple[str, str], Dict[str, Any]], year: int,
+                          output_dir: str) -> List[Tuple[PDFReportGenerator, str]]:
+    """Задания пакетной сборки: {(отдел, месяц): результат анализа} -> [(генератор, путь к PDF)]"""
+    jobs = []
+    for (department, month), analysis in analyses.items():
+        file_name = f"отчет_ошибок_{short_department_name(department)}_{month}_{year}.pdf"
+        for char in '\\/:*?"<>|':
+            file_name = file_name.replace(char, '_')
+        jobs.append((PDFReportGenerator(analysis, month, year, department), os.path.join(output_dir, file_name)))
+    return jobs
+
+
+def comparison_pack_jobs(comparison: Dict[str, Any], month: str, year: int,
+                         output_dir: str) -> List[Tuple[PDFReportGenerator, str]]:
+    """Пакет отчетов по сравнению отделов: сводный PDF и отчет каждого отдела за месяц"""
+    jobs = [(ComparisonPDFReportGenerator(comparison, month, year),
+             os.path.join(output_dir, f"сравнение_отделов_{month}_{year}.pdf"))]
+    analyses = {(department, month): comparison['by_department'][department]
+                for department in comparison['departments']}
+    return jobs + department_month_jobs(analyses, year, output_dir)
+
+
+def build_pdf_batch(jobs: List[Tuple[PDFReportGenerator, str]],
+                    progress_callback: Optional[Callable[[int], None]] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None) -> List[str]:
+    """Сборка нескольких PDF подряд с общими шрифтами и стилями.
+    
+    Прогресс считается по всему пакету; при отмене уже собранные файлы
+    остаются, текущий удаляется и выбрасывается PDFBuildCancelled.
+    """
+    created = []
+    for index, (generator, file_path) in enumerate(jobs):
+        if is_cancelled and is_cancelled():
+            raise PDFBuildCancelled(file_path)
+        
+        def job_progress(percent, index=index):
+            if progress_callback:
+                progress_callback((index * 100 + percent) // len(jobs))
+        
+        created.append(generator.build_pdf(file_path, job_progress, is_cancelled))
+    
+    if progress_callback:
+        progress_callback(100)
+    logger.info(f"Пакет PDF собран: {len(created)} файлов")
+    return created
+
@@ -1,10 +1,25 @@
 # report_generator.py
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Лимиты для подписей, если в анализе нет таблицы SLA
+DEFAULT_LIMITS = {'Значительная': 14, 'Критическая': 1}
+
+def days_limit_label(days) -> str:
+    """Подпись лимита SLA, например >14 дней или >1 дня"""
+    if days is None:
+        return "без лимита"
+    days = int(days) if float(days).is_integer() else days
+    word = "дня" if isinstance(days, int) and days % 10 == 1 and days % 100 != 11 else "дней"
+    return f">{days} {word}"
+
+def sla_limits_of(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Таблица SLA, по которой считались нарушения сроков"""
+    return analysis.get('sla', {}).get('limits') or analysis.get('sla_limits') or DEFAULT_LIMITS
+
 class ReportGenerator:
     def __init__(self, analysis_data: Dict[str, Any], month: str, year: int):
         self.analysis = analysis_data
@@ -25,6 +40,9 @@ class ReportGenerator:
         # Заголовок отчета
         report.append(f"📊 ОТЧЕТ ПО ОШИБКАМ ЗА {self.month.upper()} {self.year}")
         report.append("=" * 50)
+        filters = self.analysis.get('filters')
+        if filters:
+            report.append("🔎 Фильтр: " + "; ".join(f"{column}: {', '.join(values)}" for column, values in filters.items()))
         report.append("")
         
         # Основная статистика
@@ -47,17 +65,26 @@ class ReportGenerator:
         
         report.append("")
         
+        # Дни в работе (есть в анализе по кубу выгрузки)
+        days = self.analysis.get('days_in_work')
+        if days and days['count'] > 0:
+            report.append("⏱ ДНЕЙ В РАБОТЕ:")
+            report.append(f"• Всего: {days['sum']:g} | Среднее: {days['mean']:.1f}")
+            report.append(f"• Медиана: {days['p50']:g} | 90-й перцентиль: {days['p90']:g} | 99-й перцентиль: {days['p99']:g}")
+            report.append("")
+        
         # Статистика нарушений сроков
         report.append("🚨 НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ:")
         
         significant_stats = self.analysis['deadline_violations_significant']
         critical_stats = self.analysis['deadline_violations_critical']
+        limits = sla_limits_of(self.analysis)
         
         if significant_stats['total'] > 0:
             significant_percentage = (significant_stats['violations'] / significant_stats['total']) * 100
             report.append(f"• Значительные ошибки:")
             report.append(f"  Всего: {significant_stats['total']}")
-            report.append(f"  Нарушения (>14 дней): {significant_stats['violations']} ({significant_percentage:.1f}%)")
+            report.append(f"  Нарушения ({days_limit_label(limits.get('Значительная'))}): {significant_stats['violations']} ({significant_percentage:.1f}%)")
         else:
             report.append(f"• Значительные ошибки: нет данных")
         
@@ -65,12 +92,16 @@ class ReportGenerator:
             critical_percentage = (critical_stats['violations'] / critical_stats['total']) * 100
             report.append(f"• Критические ошибки:")
             report.append(f"  Всего: {critical_stats['total']}")
-            report.append(f"  Нарушения (>1 дня): {critical_stats['violations']} ({critical_percentage:.1f}%)")
+            report.append(f"  Нарушения ({days_limit_label(limits.get('Критическая'))}): {critical_stats['violations']} ({critical_percentage:.1f}%)")
         else:
             report.append(f"• Критические ошибки: нет данных")
         
         report.append("")
         
+        # SLA по серьезности, секторам и участкам (есть в анализе по кубу выгрузки)
+        if self.analysis.get('sla'):
+            report.extend(self._sla_lines(self.analysis['sla']))
+        
         # Распределение по серьезности (успешные)
         if self.analysis['seriousness_breakdown']:
             report.append("🎯 РАСПРЕДЕЛЕНИЕ УСПЕШНО ЗАКРЫТЫХ ПО СЕРЬЕЗНОСТИ:")
@@ -122,6 +153,240 @@ class ReportGenerator:
         
         return "\n".join(report)
     
+    def _sla_lines(self, sla: Dict[str, Any]) -> List[str]:
+        """SLA: нарушения и перцентили дней в работе"""
+        lines = ["📏 SLA ПО СЕРЬЕЗНОСТИ (дней в работе: медиана / p90 / p99):"]
+        for seriousness, row in sla['by_seriousness'].items():
+            percentiles = f"{row['p50']:g} / {row['p90']:g} / {row['p99']:g}"
+            if row['limit'] is None:
+                lines.append(f"• {seriousness}: {row['total']}, без лимита | {percentiles}")
+            else:
+                percentage = row['violations'] / row['tracked'] * 100 if row['tracked'] else 0
+                lines.append(f"• {seriousness} ({days_limit_label(row['limit'])}): нарушено {row['violations']} из "
+                             f"{row['tracked']} ({percentage:.1f}%) | {percentiles}")
+        lines.append("")
+        
+        for key, title in (('by_sector', "СЕКТОРЫ"), ('by_area', "УЧАСТКИ")):
+            rows = [(name, row) for name, row in sla[key].items() if row['violations'] > 0][:10]
+            if not rows:
+                continue
+            lines.append(f"📏 {title} С НАИБОЛЬШИМ ЧИСЛОМ НАРУШЕНИЙ SLA:")
+            for i, (name, row) in enumerate(rows, 1):
+                lines.append(f"{i}. {name}: нарушено {row['violations']} из {row['tracked']} | "
+                             f"дней: {row['p50']:g} / {row['p90']:g} / {row['p99']:g}")
+            lines.append("")
+        
+        return lines
+    
     def generate_detailed_report_file(self) -> str:
         """Генерация детального отчета в файле (если текст слишком длинный)"""
-        return self.generate_text_report()
\ No newline at end of file
+        return self.generate_text_report()
+
+
+def _format_change(previous: int, current: int) -> str:
+    """Изменение показателя относительно прошлого месяца, например +12 (+8.5%)"""
+    delta = current - previous
+    if previous == 0:
+        return f"{delta:+d}"
+    return f"{delta:+d} ({delta / previous * 100:+.1f}%)"
+
+class TrendReportGenerator:
+    """Текстовый отчет по тренду ошибок (результат TrendAnalyzer.analyze)"""
+    
+    MAIN_METRICS = [
+        ('total_errors', 'Всего'),
+        ('successfully_closed', 'Успешно'),
+        ('clarification_required', 'Уточнение'),
+        ('closed_with_problems', 'С проблемами'),
+        ('in_progress', 'В работе'),
+    ]
+    
+    def __init__(self, trend_data: Dict[str, Any], year: int):
+        self.trend = trend_data
+        self.year = year
+        self.months: List[str] = trend_data['months']
+    
+    @property
+    def period(self) -> str:
+        if len(self.months) == 1:
+            return self.months[0]
+        return f"{self.months[0]} – {self.months[-1]}"
+    
+    def _violations_cell(self, stats: Dict[str, int]) -> str:
+        if stats['total'] == 0:
+            return "нет данных"
+        return f"{stats['violations']}/{stats['total']} ({stats['violations'] / stats['total'] * 100:.1f}%)"
+    
+    def _trend_lines(self, trend: Dict[str, List[int]], name_width: int = 30) -> List[str]:
+        lines = [f"{'':{name_width}} | " + " | ".join(f"{month[:8]:>8}" for month in self.months)]
+        lines.append("-" * len(lines[0]))
+        for name, counts in trend.items():
+            name = name[:name_width - 3] + '...' if len(name) > name_width else name
+            lines.append(f"{name:{name_width}} | " + " | ".join(f"{count:8d}" for count in counts))
+        return lines
+    
+    def generate_text_report(self) -> str:
+        """Генерация текстового отчета"""
+        report = []
+        by_month = self.trend['by_month']
+        
+        report.append(f"📈 ТРЕНД ОШИБОК ЗА {self.period.upper()} {self.year}")
+        report.append("=" * 50)
+        report.append(f"Месяцев: {len(self.months)}, всего ошибок за период: {self.trend['total_errors']}")
+        report.append("")
+        
+        # Основные показатели: строка на месяц
+        report.append("📊 ОСНОВНЫЕ ПОКАЗАТЕЛИ ПО МЕСЯЦАМ:")
+        header = f"{'Месяц':10} | " + " | ".join(f"{title:>12}" for _, title in self.MAIN_METRICS)
+        report.append(header)
+        report.append("-" * len(header))
+        for month in self.months:
+            analysis = by_month[month]
+            report.append(f"{month:10} | " + " | ".join(f"{analysis[key]:12d}" for key, _ in self.MAIN_METRICS))
+        report.append("")
+        
+        if len(self.months) > 1:
+            report.append("🔄 ИЗМЕНЕНИЕ К ПРОШЛОМУ МЕСЯЦУ:")
+            for previous, current in zip(self.months, self.months[1:]):
+                changes = ", ".join(
+                    f"{title.lower()} {_format_change(by_month[previous][key], by_month[current][key])}"
+                    for key, title in self.MAIN_METRICS
+                )
+                report.append(f"• {current}: {changes}")
+            report.append("")
+        
+        # Нарушения сроков по месяцам
+        report.append("🚨 НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ (нарушено/всего):")
+        limits = sla_limits_of(self.trend)
+        header = (f"{'Месяц':10} | {'Значительные (' + days_limit_label(limits.get('Значительная')) + ')':>24} | "
+                  f"{'Критические (' + days_limit_label(limits.get('Критическая')) + ')':>24}")
+        report.append(header)
+        report.append("-" * len(header))
+        for month in self.months:
+            analysis = by_month[month]
+            report.append(
+                f"{month:10} | {self._violations_cell(analysis['deadline_violations_significant']):>24} | "
+                f"{self._violations_cell(analysis['deadline_violations_critical']):>24}"
+            )
+        report.append("")
+        
+        # Секторы и участки: ТОП-10 за период по месяцам
+        if self.trend['sector_trend']:
+            report.append("🏆 ТОП-10 СЕКТОРОВ ЗА ПЕРИОД ПО МЕСЯЦАМ:")
+            report.extend(self._trend_lines(self.trend['sector_trend']))
+            report.append("")
+        else:
+            report.append("🏆 Нет данных по секторам")
+            report.append("")
+        
+        if self.trend['area_trend']:
+            report.append("🎯 ТОП-10 УЧАСТКОВ ЗА ПЕРИОД ПО МЕСЯЦАМ:")
+            report.extend(self._trend_lines(self.trend['area_trend']))
+            report.append("")
+        else:
+            report.append("🎯 Нет данных по участкам")
+            report.append("")
+        
+        report.append(f"📅 Отчет сгенерирован: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+        
+        return "\n".join(report)
+
+
+def short_department_name(name: str) -> str:
+    """Короткое имя отдела для колонок (без префикса "2ая линия")"""
+    return name.replace("2ая линия", "").strip() or name
+
+class ComparisonReportGenerator:
+    """Текстовый отчет сравнения отделов (результат DepartmentComparison.analyze)"""
+    
+    COLUMN_WIDTH = 16
+    
+    def __init__(self, comparison_data: Dict[str, Any], month: str, year: int):
+        self.comparison = comparison_data
+        self.month = month
+        self.year = year
+        self.departments: List[str] = comparison_data['departments']
+    
+    def _row(self, title: str, cells: List[str]) -> str:
+        width = self.COLUMN_WIDTH
+        return f"{title:28} | " + " | ".join(f"{cell[:width]:>{width}}" for cell in cells)
+    
+    def _header(self) -> List[str]:
+        header = self._row("", [short_department_name(name) for name in self.departments])
+        return [header, "-" * len(header)]
+    
+    def generate_text_report(self) -> str:
+        """Генерация текстового отчета"""
+        report = []
+        by_department = self.comparison['by_department']
+        normalized = self.comparison['normalized']
+        rates = normalized['rates']
+        
+        report.append(f"🏢 СРАВНЕНИЕ ОТДЕЛОВ ЗА {self.month.upper()} {self.year}")
+        report.append("=" * 50)
+        report.append(f"Отделов: {len(self.departments)}, всего ошибок: {self.comparison['total_errors']}")
+        for name in self.departments:
+            report.append(f"• {short_department_name(name)}: {name}")
+        report.append("")
+        
+        # Основные показатели: значение и доля от ошибок отдела
+        report.append("📈 ОСНОВНАЯ СТАТИСТИКА (доля от ошибок отдела):")
+        report.extend(self._header())
+        report.append(self._row("Всего ошибок", [str(by_department[name]['total_errors']) for name in self.departments]))
+        report.append(self._row("Доля от всех отделов", [f"{rates[name]['share_of_total']:.1f}%" for name in self.departments]))
+        report.append(self._row("Нагрузка к среднему", [f"{rates[name]['load_index']:.2f}" for name in self.departments]))
+        for metric, title in (('successfully_closed', "Успешно закрыто"),
+                              ('clarification_required', "На уточнении"),
+                              ('closed_with_problems', "Закрыто с проблемами"),
+                              ('in_progress', "На выполнении")):
+            report.append(self._row(title, [
+                f"{by_department[name][metric]} ({rates[name][metric]:.1f}%)" for name in self.departments
+            ]))
+        report.append("")
+        
+        # Нарушения сроков по общей таблице SLA
+        limits = sla_limits_of(self.comparison)
+        report.append("🚨 НАРУШЕНИЯ СРОКОВ ИСПРАВЛЕНИЯ (нарушено/всего):")
+        report.extend(self._header())
+        for key, seriousness, title in (('deadline_violations_significant', 'Значительная', "Значительные"),
+                                        ('deadline_violations_critical', 'Критическая', "Критические")):
+            cells = []
+            for name in self.departments:
+                stats = by_department[name][key]
+                cells.append(f"{stats['violations']}/{stats['total']}" if stats['total'] else "нет данных")
+            report.append(self._row(f"{title} ({days_limit_label(limits.get(seriousness))})", cells))
+        report.append("")
+        
+        # Серьезность в общей базе
+        if normalized['seriousness_order']:
+            report.append("📏 СЕРЬЕЗНОСТЬ: ДОЛЯ ОШИБОК / НАРУШЕНИЯ SLA / МЕДИАНА ДНЕЙ:")
+            report.extend(self._header())
+            for seriousness in normalized['seriousness_order']:
+                cells = []
+                for name in self.departments:
+                    row = normalized['seriousness'][name][seriousness]
+                    if row is None:
+                        cells.append("-")
+                        continue
+                    violation = f"{row['violation_rate']:.0f}%" if row['violation_rate'] is not None else "-"
+                    cells.append(f"{row['share']:.0f}%/{violation}/{row['p50']:g}")
+                report.append(self._row(seriousness[:28], cells))
+            report.append("")
+        
+        # ТОП-5 секторов каждого отдела
+        report.append("🏆 ТОП-5 СЕКТОРОВ ОТДЕЛОВ:")
+        for name in self.departments:
+            analysis = by_department[name]
+            report.append(f"{short_department_name(name)}:")
+            sectors = list(analysis['sector_top10'].items())[:5]
+            if not sectors:
+                report.append("   нет данных")
+            for i, (sector, stats) in enumerate(sectors, 1):
+                percentage = stats['total'] / analysis['total_errors'] * 100
+                report.append(f"   {i}. {sector}: {stats['total']} ({percentage:.1f}%)")
+        report.append("")
+        
+        report.append(f"📅 Отчет сгенерирован: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+        
+        return "\n".join(report)
+
@@ -0,0 +1,237 @@
+# structured_export.py
+"""
+Структурированный экспорт полных результатов анализа в XLSX, CSV и NDJSON.
+
+В отличие от текстового отчета (formatted_text ограничен первыми строками)
+выгружаются все записи. Строки пишутся по одной: openpyxl в режиме
+write_only, csv.writer и json построчно, поэтому память не зависит от числа
+записей.
+"""
+
+import os
+import csv
+import json
+import logging
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Any, Iterable, Optional, Callable
+
+from basic_mechanisms_analyzer import journal_title
+
+logger = logging.getLogger(__name__)
+
+# Форматы: расширение -> название для диалога сохранения
+EXPORT_FORMATS = {
+    '.xlsx': "Excel (*.xlsx)",
+    '.csv': "CSV (*.csv)",
+    '.ndjson': "NDJSON (*.ndjson)",
+}
+
+# Предел строк листа Excel: при превышении раздел продолжается на следующем листе
+XLSX_MAX_ROWS = 1048576
+
+# Колонки: (заголовок, атрибут записи)
+LOG_ENTRY_COLUMNS = [
+    ("Время", 'timestamp'), ("Тип", 'log_type'), ("Содержание", 'content'), ("Файл", 'source_file'),
+]
+RECEIPT_OPERATION_COLUMNS = [
+    ("Время", 'time'), ("Статус печати", 'print_status'), ("Сумма", 'amount'),
+    ("Тип чека", 'fiscal_type'), ("Номер продажи", 'sale_number'), ("Операция", 'operation_type'),
+    ("Способ оплаты", 'payment_method'), ("РНМ", 'rnm'), ("Сумма картой", 'card_sum'),
+]
+MARKING_SCAN_COLUMNS = [
+    ("Время", 'timestamp'), ("Результат", 'result'), ("Файл", 'source_file'),
+]
+MARKING_INFO_COLUMNS = [
+    ("Время", 'timestamp'), ("КМ", 'cis'), ("В обороте", 'realizable'), ("Продан", 'sold'),
+    ("Продано единиц", 'sold_unit_count'), ("Единиц в упаковке", 'inner_unit_count'),
+    ("Срок годности", 'expire_date'), ("Владелец", 'is_owner'), ("Прослеживаемость", 'is_tracking'),
+    ("Файл", 'source_file'),
+]
+CONNECTION_ISSUE_COLUMNS = [
+    ("Время", 'timestamp'), ("Сообщение", 'message'), ("Файл", 'source_file'),
+]
+LOGIN_PASSWORD_COLUMNS = [
+    ("Время", 'timestamp'), ("Закодировано", 'encoded_auth'), ("Раскодировано", 'decoded_auth'),
+    ("Файл", 'source_file'),
+]
+OPENING_CHECK_COLUMNS = [
+    ("Время", 'timestamp'), ("КМ", 'cis'), ("Объем, л", 'quantity'), ("Срок годности", 'expiration_date'),
+    ("Дата подключения", 'connection_date'), ("Файл", 'source_file'),
+]
+OS_EVENT_COLUMNS = [
+    ("Дата и время", 'timestamp'), ("Уровень", 'level'), ("Код события", 'event_code'),
+    ("Источник", 'source'), ("Описание", 'description'), ("Журнал", 'log_type'),
+]
+INPAS_COLUMNS = [
+    ("Дата и время", 'timestamp'), ("Сумма", 'amount'), ("Терминал", 'terminal'), ("Статус", 'status'),
+    ("Банк", 'bank'), ("Тип карты", 'card_type'), ("Код авторизации", 'auth_code'), ("RRN", 'rrn'),
+    ("Драйвер", 'driver_name'),
+]
+SBERBANK_COLUMNS = [
+    ("Дата и время", 'timestamp'), ("Сумма", 'amount'), ("Статус", 'status'), ("Версия", 'version'),
+    ("Карта", 'card_last4'), ("GUID", 'guid'), ("Отдел", 'department'), ("Драйвер", 'driver_name'),
+]
+ARCUS_COLUMNS = [
+    ("Дата и время", 'timestamp'), ("Сумма", 'amount'), ("Операция", 'operation'), ("Статус", 'status'),
+    ("Код ответа", 'response_code'), ("Карта", 'card_last4'), ("Код авторизации", 'auth_code'),
+    ("RRN", 'rrn'), ("Терминал", 'terminal'), ("Драйвер", 'driver_name'),
+]
+
+# Методы анализа маркировки (индекс в списке методов) -> (раздел, заголовок, колонки)
+MARKING_SECTIONS = {
+    0: ('scans', "Сканирования", MARKING_SCAN_COLUMNS),
+    1: ('marking_info', "Информация по КМ", MARKING_INFO_COLUMNS),
+    2: ('connection_issues', "Подключение ЛМ ЧЗ", CONNECTION_ISSUE_COLUMNS),
+    3: ('login_password', "Логин и пароль ЛМ ЧЗ", LOGIN_PASSWORD_COLUMNS),
+    4: ('opening_check', "Проверка вскрытия", OPENING_CHECK_COLUMNS),
+}
+
+@dataclass
+class ExportSection:
+    """Раздел экспорта: лист XLSX, отдельный CSV или значение поля section в NDJSON"""
+    key: str
+    title: str
+    columns: List[Tuple[str, str]]
+    records: Iterable[Any]
+
+def log_analysis_sections(result: Dict[str, Any]) -> List[ExportSection]:
+    """Разделы результата LogAnalysisThread или PaymentTerminalThread"""
+    if 'inpas_transactions' in result:
+        return [
+            ExportSection('inpas', "INPAS", INPAS_COLUMNS, result['inpas_transactions']),
+            ExportSection('sberbank', "Сбербанк", SBERBANK_COLUMNS, result['sberbank_transactions']),
+            ExportSection('arcus', "ARCUS2", ARCUS_COLUMNS, result.get('arcus_transactions', [])),
+        ]
+
+    data = result['structured_data']
+    if result.get('analysis_method') == 'receipt':
+        return [ExportSection('operations', "Операции с чеками", RECEIPT_OPERATION_COLUMNS, data['operations'])]
+    return [ExportSection('log_entries', "Записи логов", LOG_ENTRY_COLUMNS, data['log_entries'])]
+
+def marking_sections(result: Dict[str, Any]) -> List[ExportSection]:
+    """Разделы результата MarkingAnalysisThread"""
+    key, title, columns = MARKING_SECTIONS[result['method_index']]
+    return [ExportSection(key, title, columns, result['results'])]
+
+def os_journal_sections(result: Dict[str, Any]) -> List[ExportSection]:
+    """Разделы результата BasicMechanismsThread: по журналу на раздел"""
+    return [ExportSection(channel, journal_title(channel), OS_EVENT_COLUMNS, events)
+            for channel, events in result['journals'].items()]
+
+def _record_values(record: Any, columns: List[Tuple[str, str]]) -> list:
+    return [getattr(record, attribute, None) for _, attribute in columns]
+
+def export_sections(sections: List[ExportSection], file_path: str,
+                    progress_callback: Optional[Callable[[int], None]] = None) -> List[str]:
+    """Экспорт разделов в формат по расширению файла. Возвращает записанные файлы.
+
+    progress_callback получает число записанных строк (вызывается раз в 10000 строк).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.xlsx':
+        writer = _write_xlsx
+    elif extension == '.csv':
+        writer = _write_csv
+    elif extension in ('.ndjson', '.jsonl'):
+        writer = _write_ndjson
+    else:
+        raise ValueError(f"Неподдерживаемый формат экспорта: {extension}")
+
+    counter = _RowCounter(progress_callback)
+    file_paths = writer(sections, file_path, counter)
+    logger.info(f"Экспортировано строк: {counter.rows}, файлов: {len(file_paths)}")
+    return file_paths
+
+class _RowCounter:
+    """Счетчик записанных строк для прогресса"""
+
+    STEP = 10000
+
+    def __init__(self, progress_callback):
+        self.rows = 0
+        self.progress_callback = progress_callback
+
+    def add(self):
+        self.rows += 1
+        if self.progress_callback and self.rows % self.STEP == 0:
+            self.progress_callback(self.rows)
+
+def _sheet_title(title: str, used: set) -> str:
+    """Имя листа Excel: без запрещенных символов, не длиннее 31 символа, уникальное"""
+    for char in '[]:*?/\\':
+        title = title.replace(char, '_')
+    title = title[:31] or "Лист"
+    base, number = title, 2
+    while title in used:
+        suffix = f" ({number})"
+        title = base[:31 - len(suffix)] + suffix
+        number += 1
+    used.add(title)
+    return title
+
+def _write_xlsx(sections: List[ExportSection], file_path: str, counter: _RowCounter) -> List[str]:
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    def clean(value):
+        # Управляющие символы из логов openpyxl в ячейку не пропускает
+        if isinstance(value, str):
+            return ILLEGAL_CHARACTERS_RE.sub('', value)
+        return value
+
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+
+    for section in sections:
+        header = [title for title, _ in section.columns]
+        sheet = workbook.create_sheet(_sheet_title(section.title, used_titles))
+        sheet.append(header)
+        sheet_rows = 1
+
+        for record in section.records:
+            if sheet_rows == XLSX_MAX_ROWS:
+                sheet = workbook.create_sheet(_sheet_title(section.title, used_titles))
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append([clean(value) for value in _record_values(record, section.columns)])
+            sheet_rows += 1
+            counter.add()
+
+    if not sections:
+        workbook.create_sheet("Нет данных")
+
+    workbook.save(file_path)
+    return [file_path]
+
+def _write_csv(sections: List[ExportSection], file_path: str, counter: _RowCounter) -> List[str]:
+    # Несколько разделов с разными колонками - по файлу на раздел
+    if len(sections) == 1:
+        targets = [(sections[0], file_path)]
+    else:
+        stem, extension = os.path.splitext(file_path)
+        targets = [(section, f"{stem}_{section.key}{extension}") for section in sections]
+
+    for section, path in targets:
+        # utf-8-sig и ';' - файл открывается в русском Excel без мастера импорта
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow([title for title, _ in section.columns])
+            for record in section.records:
+                writer.writerow(['' if value is None else value
+                                 for value in _record_values(record, section.columns)])
+                counter.add()
+
+    return [path for _, path in targets]
+
+def _write_ndjson(sections: List[ExportSection], file_path: str, counter: _RowCounter) -> List[str]:
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for section in sections:
+            attributes = [attribute for _, attribute in section.columns]
+            for record in section.records:
+                row = {'section': section.key}
+                row.update(zip(attributes, _record_values(record, section.columns)))
+                f.write(json.dumps(row, ensure_ascii=False, default=str))
+                f.write('\n')
+                counter.add()
+
+    return [file_path]
@@ -0,0 +1,7 @@
+# tests/conftest.py
+"""Общие настройки тестов: модули приложения лежат в корне репозитория"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
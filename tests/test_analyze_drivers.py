@@ -0,0 +1,48 @@
+# tests/test_analyze_drivers.py
+"""Параллельный анализ драйверов терминалов и итоги по каждому драйверу"""
+
+import pytest
+
+from payment_terminal_analyzer import PaymentTerminalAnalyzer, SberbankLogParser
+
+from test_inpas_parser import INPAS_LOG
+from test_sberbank_parser import SBERBANK_LOG
+
+@pytest.fixture
+def pts_dir(tmp_path):
+    """pts_vendor с драйверами INPAS и SberbankPilot (подпапка 1)"""
+    (tmp_path / "INPAS").mkdir()
+    (tmp_path / "INPAS" / "DualConnector.log").write_text(INPAS_LOG, encoding='utf-8')
+    (tmp_path / "SberbankPilot" / "1").mkdir(parents=True)
+    (tmp_path / "SberbankPilot" / "1" / "sbkernel.log").write_text(SBERBANK_LOG, encoding='utf-8')
+    return str(tmp_path)
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    analyzer = PaymentTerminalAnalyzer()
+    # Файлы разбираются в текущем процессе, чтобы подмена парсера действовала
+    monkeypatch.setattr(analyzer, '_create_process_pool', lambda: None)
+    return analyzer
+
+def test_all_drivers_analyzed(pts_dir, analyzer):
+    drivers = analyzer.detect_drivers(pts_dir)
+    results = analyzer.analyze_drivers(pts_dir, drivers, "2024-01-14")
+
+    assert [(result.driver_name, result.driver_type, len(result.transactions), result.error)
+            for result in results] == [("INPAS", "INPAS", 2, ""), ("SberbankPilot", "SBERBANK", 2, "")]
+    assert all(txn.driver_name == "SberbankPilot" for txn in results[1].transactions)
+
+def test_failed_driver_reported_as_error(pts_dir, analyzer, monkeypatch):
+    """Сбой парсера одного драйвера попадает в его итог, остальные драйверы не затронуты"""
+    def broken_feed(self, line):
+        raise ValueError("поврежденный лог")
+
+    monkeypatch.setattr(SberbankLogParser, 'feed', broken_feed)
+    drivers = analyzer.detect_drivers(pts_dir)
+    results = {result.driver_name: result for result in analyzer.analyze_drivers(pts_dir, drivers, "2024-01-14")}
+
+    assert results["INPAS"].error == "" and len(results["INPAS"].transactions) == 2
+    assert results["SberbankPilot"].error == "поврежденный лог"
+    assert results["SberbankPilot"].transactions == []
+    assert "SberbankPilot (SBERBANK): ошибка - поврежденный лог" in \
+        analyzer.format_driver_results(list(results.values()))
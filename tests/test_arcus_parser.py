@@ -0,0 +1,39 @@
+# tests/test_arcus_parser.py
+"""Потоковый парсер операционного лога ARCUS2"""
+
+from payment_terminal_analyzer import ArcusLogParser, parse_log_file
+
+ARCUS_LOG = """\
+2024-01-14 10:00:00 Start operation 1
+2024-01-14 10:00:01 Amount: 150,00
+2024-01-14 10:00:02 TID: 12345678
+2024-01-14 10:00:03 PAN: ************4321
+2024-01-14 10:00:04 Response code: 00
+2024-01-14 10:00:04 Auth code: A1B2C3
+2024-01-14 10:00:04 RRN: 401400000001
+2024-01-14 10:00:05 End operation
+14.01.2024 11:00:00 Start operation 3
+14.01.2024 11:00:01 Сумма = 50.00
+14.01.2024 11:00:02 RC = 51
+14.01.2024 11:00:03 End operation
+2024-01-15 09:00:00 Start operation 1
+2024-01-15 09:00:01 Amount: 10.00
+2024-01-15 09:00:02 End operation
+"""
+
+def write_log(tmp_path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_arcus_operations(tmp_path):
+    log_path = write_log(tmp_path, "operation.log", ARCUS_LOG)
+    transactions = parse_log_file(ArcusLogParser, log_path, "2024-01-14")
+
+    assert [(t.timestamp, t.amount, t.operation, t.status) for t in transactions] == [
+        ("2024-01-14 10:00:00", "150.00", "Оплата", "Одобрено"),
+        ("2024-01-14 11:00:00", "50.00", "Возврат", "Отказ (код 51)"),
+    ]
+    first = transactions[0]
+    assert (first.terminal, first.card_last4, first.auth_code, first.rrn) == \
+        ("12345678", "4321", "A1B2C3", "401400000001")
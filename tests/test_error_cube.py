@@ -0,0 +1,139 @@
+# tests/test_error_cube.py
+"""Куб выгрузки ошибок: перцентили и срезы совпадают с расчетом по DataFrame"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pd = pytest.importorskip('pandas')
+
+from analyzer import (
+    ErrorAnalyzer, ErrorCube, SLA_PERCENTILES, grouped_weighted_percentiles, weighted_percentiles
+)
+
+ANALYSIS_KEYS = [
+    'total_errors', 'successfully_closed', 'clarification_required', 'closed_with_problems', 'in_progress',
+    'seriousness_breakdown', 'sector_top10', 'area_top10', 'status_distribution',
+    'deadline_violations_significant', 'deadline_violations_critical',
+]
+
+@pytest.fixture(scope='module')
+def export_frame():
+    """Выгрузка из 3000 строк: пробелы по краям, пустые ячейки и нечисловые дни"""
+    rng = np.random.default_rng(7)
+    size = 3000
+
+    def column(values, probabilities=None):
+        return rng.choice(np.array(values, dtype=object), size, p=probabilities)
+
+    frame = pd.DataFrame({
+        'Статус': column(['Выполнение завершено успешно', 'Выполнение завершено успешно ',
+                          'Выполнение завершено с проблемами', 'ВОбработке', 'Отклонено', None]),
+        'Серьезность': column(['Критическая', 'Значительная', ' Значительная', 'Незначительная', None]),
+        'Активный этап': column(['Уточнение', 'Разработка', 'Тестирование', None]),
+        'Сектор': column([f"Сектор {n}" for n in range(15)] + [None]),
+        'Участок': column([f"Участок {n}" for n in range(25)]),
+        'Дней в работе': column([str(n) for n in range(40)] + ['', 'нет данных', None]),
+    })
+    return frame
+
+@pytest.fixture(scope='module')
+def cube(export_frame):
+    return ErrorAnalyzer(frame=export_frame).build_cube()
+
+@pytest.fixture(scope='module')
+def clean_frame(export_frame):
+    analyzer = ErrorAnalyzer(frame=export_frame)
+    analyzer.clean_data()
+    return analyzer.df
+
+def ordered(analysis):
+    """Показатели с порядком ключей (порядок важен для отчетов)"""
+    def items(value):
+        if isinstance(value, dict):
+            return [(key, items(item)) for key, item in value.items()]
+        return value
+    return {key: items(analysis[key]) for key in ANALYSIS_KEYS}
+
+def test_weighted_percentiles_equal_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 100, 200).astype(float)
+    weights = rng.integers(1, 20, 200)
+    quantiles = [0, 10, 50, 90, 99, 100]
+
+    expected = np.percentile(np.repeat(values, weights), quantiles)
+    assert weighted_percentiles(values, weights, quantiles) == pytest.approx(expected)
+
+def test_grouped_weighted_percentiles_equal_numpy():
+    rng = np.random.default_rng(2)
+    groups = rng.integers(0, 5, 300)
+    groups[groups == 3] = 4  # группа 3 пустая
+    values = rng.normal(10, 5, 300)
+    weights = rng.integers(1, 4, 300)
+
+    result = grouped_weighted_percentiles(groups, values, weights, 5, SLA_PERCENTILES)
+
+    for group in range(5):
+        selected = groups == group
+        if not selected.any():
+            assert list(result[group]) == [0] * len(SLA_PERCENTILES)
+            continue
+        expected = np.percentile(np.repeat(values[selected], weights[selected]), SLA_PERCENTILES)
+        assert result[group] == pytest.approx(expected)
+
+def test_cube_analysis_equals_pandas(export_frame, cube):
+    expected = ErrorAnalyzer(frame=export_frame).analyze_errors()
+    assert ordered(cube.analysis()) == ordered(expected)
+
+@pytest.mark.parametrize("filters", [
+    {'Сектор': ['Сектор 1', 'Сектор 7', 'Не указан']},
+    {'Серьезность': ['Значительная'], 'Активный этап': ['Уточнение', 'Разработка']},
+    {'Участок': ['Участок 3'], 'Статус': ['Выполнение завершено успешно']},
+    {'Сектор': ['Нет такого сектора']},
+])
+def test_cube_filter_equals_pandas(export_frame, clean_frame, cube, filters):
+    """Срез куба совпадает с анализом отфильтрованных строк выгрузки"""
+    mask = np.ones(len(clean_frame), dtype=bool)
+    for column, selected in filters.items():
+        mask &= clean_frame[column].astype(str).isin(selected).to_numpy()
+
+    sliced = cube.filter(**filters)
+    analysis = sliced.analysis()
+    assert analysis['filters'] == filters
+    assert analysis['total_errors'] == int(mask.sum())
+    if not mask.any():
+        return
+
+    assert ordered(analysis) == ordered(ErrorAnalyzer(frame=export_frame[mask]).analyze_errors())
+
+    days = clean_frame.loc[mask, 'Дней в работе'].to_numpy(float)
+    summary = analysis['days_in_work']
+    assert summary['sum'] == pytest.approx(days.sum())
+    assert summary['mean'] == pytest.approx(days.mean())
+    for q, value in zip(ErrorCube.DAYS_PERCENTILES, np.percentile(days, ErrorCube.DAYS_PERCENTILES)):
+        assert summary[f'p{q}'] == pytest.approx(value)
+
+def test_sla_percentiles_by_sector_equal_pandas(clean_frame, cube):
+    report = cube.sla_report()
+    days = clean_frame['Дней в работе'].astype(float)
+    sectors = clean_frame['Сектор'].astype(str)
+
+    assert set(report['by_sector']) == set(sectors)
+    for sector, row in report['by_sector'].items():
+        sector_days = days[sectors == sector].to_numpy()
+        assert row['total'] == len(sector_days)
+        for q, value in zip(SLA_PERCENTILES, np.percentile(sector_days, SLA_PERCENTILES)):
+            assert row[f'p{q}'] == pytest.approx(value)
+
+def test_filter_chain_equals_combined_filter(cube):
+    chained = cube.filter(Сектор=['Сектор 2', 'Сектор 4']).filter(Серьезность=['Критическая'])
+    combined = cube.filter(Сектор=['Сектор 2', 'Сектор 4'], Серьезность=['Критическая'])
+    assert chained.analysis() == combined.analysis()
+
+def test_cube_from_cells_equals_from_frame(cube):
+    """Куб потокового чтения (по ячейкам) дает тот же анализ, что и куб по DataFrame"""
+    cells = {}
+    for i in range(cube.size):
+        key = tuple(cube.categories[column][cube.codes[column][i]] for column in cube.codes) + (cube.days[i],)
+        cells[key] = [int(cube.counts[i]), int(cube.first_rows[i])]
+
+    assert ErrorCube.from_cells(cells).analysis() == cube.analysis()
@@ -0,0 +1,74 @@
+# tests/test_evtx_reader.py
+"""Чтение BinXml-записей EVTX на небольшом синтетическом журнале"""
+
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pytest
+
+from benchmark import generate_evtx
+from evtx_reader import (
+    EvtxReader, count_chunks, make_time_window, read_records_concurrently, scan_records
+)
+
+EVENT_NS = '{http://schemas.microsoft.com/win/2004/08/events/event}'
+
+@pytest.fixture(scope='module')
+def journal(tmp_path_factory):
+    """Журнал System за трое суток до 15.01.2024: 1500 записей в нескольких чанках"""
+    path = str(tmp_path_factory.mktemp('evtx') / 'System.evtx')
+    generate_evtx(path, 1500, days=3)
+    return path
+
+@pytest.fixture(scope='module')
+def records(journal):
+    return list(EvtxReader(journal).records())
+
+def record_fields(record):
+    return (record.record_id, record.event_id, record.level, record.provider, record.channel,
+            record.computer, record.data)
+
+def test_reads_all_records_in_order(journal, records):
+    assert count_chunks(journal) > 1
+    assert [record.record_id for record in records] == list(range(1, 1501))
+    assert all(record.timestamp is not None for record in records)
+
+def test_matches_python_evtx(journal, records):
+    """Поля System и данные события совпадают с XML библиотеки evtx"""
+    evtx = pytest.importorskip('Evtx.Evtx')
+
+    expected = []
+    with evtx.Evtx(journal) as evtx_file:
+        for evtx_record in evtx_file.records():
+            event = ET.fromstring(evtx_record.xml())
+            system = event.find(EVENT_NS + 'System')
+            expected.append((
+                int(system.find(EVENT_NS + 'EventRecordID').text),
+                int(system.find(EVENT_NS + 'EventID').text),
+                int(system.find(EVENT_NS + 'Level').text),
+                system.find(EVENT_NS + 'Provider').get('Name'),
+                system.find(EVENT_NS + 'Channel').text,
+                system.find(EVENT_NS + 'Computer').text,
+                [data.text for data in event.iter(EVENT_NS + 'Data')],
+            ))
+
+    assert [record_fields(record) for record in records] == expected
+
+def test_filters_by_event_id_level_and_time(journal, records):
+    start, end = datetime(2024, 1, 14), datetime(2024, 1, 15)
+    window = make_time_window(start, end)
+    filtered = list(EvtxReader(journal).records(event_ids={41, 6008}, time_window=window, levels={1, 2}))
+
+    expected = [record for record in records
+                if start <= record.timestamp < end and (record.event_id in (41, 6008) or record.level in (1, 2))]
+    assert expected
+    assert [record_fields(record) for record in filtered] == [record_fields(record) for record in expected]
+
+def test_scan_records_matches_reader(journal, records):
+    """Сканер по сигнатурам записей находит те же записи, что и чтение по чанкам"""
+    scanned = sorted(scan_records(journal), key=lambda record: record.record_id)
+    assert [record_fields(record) for record in scanned] == [record_fields(record) for record in records]
+
+def test_concurrent_read_matches_reader(journal, records):
+    concurrent = read_records_concurrently(journal, max_workers=2, min_chunks_per_task=1)
+    assert [record_fields(record) for record in concurrent] == [record_fields(record) for record in records]
@@ -0,0 +1,64 @@
+# tests/test_inpas_parser.py
+"""Потоковый парсер чеков DualConnector (INPAS)"""
+
+from payment_terminal_analyzer import InpasLogParser, parse_log_file
+
+INPAS_LOG = """\
+[0001] DC: exchange packet 0:0 state=READY len=512
+ПАО СБЕРБАНК
+МАГАЗИН 'ПРОДУКТЫ'
+ОПЛАТА ПОКУПКИ
+ОДОБРЕНО
+14.01.24 10:15:00
+ТЕРМИНАЛ: 10000001
+КАРТА VISA
+**** **** **** **** 1234
+СУММА (RUB) 150.00
+КОД АВТОРИЗАЦИИ: 100001
+№ ССЫЛКИ: 500000000001
+ПАО СБЕРБАНК
+ОПЛАТА ПОКУПКИ
+ОТКАЗ
+14.01.24 10:20:00
+ТЕРМИНАЛ: 10000001
+СУММА (RUB) 99.90
+[0002] DC: exchange packet 1:0 state=READY len=512
+[0003] DC: exchange packet 1:1 state=READY len=512
+[0004] DC: exchange packet 1:2 state=READY len=512
+[0005] DC: exchange packet 1:3 state=READY len=512
+[0006] DC: exchange packet 1:4 state=READY len=512
+[0007] DC: exchange packet 1:5 state=READY len=512
+ПАО СБЕРБАНК
+ОПЛАТА ПОКУПКИ
+ОДОБРЕНО
+15.01.24 09:00:00
+ТЕРМИНАЛ: 10000002
+КАРТА MIR
+СУММА (RUB) 500.00
+КОД АВТОРИЗАЦИИ: 100002
+№ ССЫЛКИ: 500000000002
+"""
+
+def write_log(tmp_path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_inpas_slips_for_target_date(tmp_path):
+    log_path = write_log(tmp_path, "dc.log", INPAS_LOG)
+    transactions = parse_log_file(InpasLogParser, log_path, "2024-01-14")
+
+    assert [(t.timestamp, t.amount, t.status) for t in transactions] == [
+        ("14.01.24 10:15:00", "150.00", "ОДОБРЕНО"),
+        ("14.01.24 10:20:00", "99.90", "ОТКАЗ"),
+    ]
+    first = transactions[0]
+    assert (first.terminal, first.bank, first.card_type, first.auth_code, first.rrn) == \
+        ("10000001", "ПАО СБЕРБАНК", "VISA", "100001", "500000000001")
+
+def test_inpas_without_date_returns_all_slips(tmp_path):
+    log_path = write_log(tmp_path, "dc.log", INPAS_LOG)
+    transactions = parse_log_file(InpasLogParser, log_path, "")
+
+    assert [t.timestamp for t in transactions] == ["14.01.24 10:15:00", "14.01.24 10:20:00", "15.01.24 09:00:00"]
+    assert transactions[2].card_type == "MIR"
@@ -0,0 +1,40 @@
+# tests/test_journal_refilter.py
+"""Повторный отбор событий разобранных журналов без разбора файлов"""
+
+import pytest
+
+from basic_mechanisms_analyzer import BasicMechanismsAnalyzer
+from benchmark import generate_evtx
+
+@pytest.fixture
+def analyzer(tmp_path, monkeypatch):
+    """Журнал System за трое суток, проанализированный по кодам по умолчанию"""
+    generate_evtx(str(tmp_path / "System.evtx"), 3000, days=3)
+    analyzer = BasicMechanismsAnalyzer()
+    monkeypatch.setattr(analyzer, '_create_process_pool', lambda: None)
+    analyzer.set_analysis_date("2024-01-14")
+    analyzer.analyze_os_logs(str(tmp_path))
+    # Дальше файлы журналов не разбираются
+    monkeypatch.setattr(analyzer, 'parse_evtx_file', lambda *args: pytest.fail("повторный разбор журнала"))
+    return analyzer
+
+def test_refilter_by_level_source_and_text(analyzer):
+    events = analyzer.refilter_journals(levels={"Ошибка"}, source="service control")["System"]
+
+    assert events
+    assert {event.event_code for event in events} <= {"7031", "7000", "7001"}
+    assert all(event.level == "Ошибка" for event in events)
+
+    assert not analyzer.refilter_journals(text="нет такого текста")
+
+def test_refilter_by_cached_codes(analyzer):
+    """Коды перезагрузок кэшируются при любом шаблоне"""
+    analyzer.apply_pattern_settings(True, "6005, 6006")
+    events = analyzer.refilter_journals()["System"]
+
+    assert events and {event.event_code for event in events} == {"6005", "6006"}
+
+def test_codes_outside_cache_need_new_analysis(analyzer):
+    analyzer.apply_pattern_settings(True, "16")
+
+    assert analyzer.refilter_journals() is None
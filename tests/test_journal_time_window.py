@@ -0,0 +1,64 @@
+# tests/test_journal_time_window.py
+"""Интервал анализа журналов ОС - местные сутки, время EVTX и XML - в UTC"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from basic_mechanisms_analyzer import BasicMechanismsAnalyzer
+from benchmark import generate_evtx
+from evtx_reader import EvtxReader
+
+XML_EXPORT = """<Events>
+<Event xmlns="http://schemas.microsoft.com/win/2004/08/events/event">
+  <System><Provider Name="EventLog"/><EventID>6005</EventID><Level>4</Level>
+    <TimeCreated SystemTime="2024-01-14T20:00:00.000Z"/><Channel>System</Channel></System>
+  <EventData><Data>01:00 по местному времени</Data></EventData>
+</Event>
+<Event xmlns="http://schemas.microsoft.com/win/2004/08/events/event">
+  <System><Provider Name="EventLog"/><EventID>6005</EventID><Level>4</Level>
+    <TimeCreated SystemTime="2024-01-15T20:00:00.000Z"/><Channel>System</Channel></System>
+  <EventData><Data>01:00 следующих суток</Data></EventData>
+</Event>
+</Events>
+"""
+
+@pytest.fixture
+def local_utc_plus_5(monkeypatch):
+    """Местное время UTC+5 без перехода на летнее время"""
+    if not hasattr(time, 'tzset'):
+        pytest.skip("смена часового пояса недоступна")
+    monkeypatch.setenv('TZ', 'UTC-05')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+@pytest.fixture
+def analyzer():
+    """Анализ всех событий за 15.01.2024"""
+    analyzer = BasicMechanismsAnalyzer()
+    analyzer.set_use_custom_patterns(True)
+    analyzer.custom_patterns = []
+    analyzer.set_analysis_date("2024-01-15")
+    return analyzer
+
+def test_xml_event_at_one_am_local_time(local_utc_plus_5, analyzer):
+    """Событие в 01:00 местного времени записано в UTC накануне и входит в сутки анализа"""
+    events = analyzer._parse_xml_events(XML_EXPORT, "System")
+
+    assert [event.timestamp for event in events] == ["2024-01-15 01:00:00"]
+
+def test_binary_evtx_uses_local_day(local_utc_plus_5, analyzer, tmp_path):
+    """Записи раз в час за двое суток: отбираются 24 записи с 19:00 UTC накануне"""
+    path = str(tmp_path / "System.evtx")
+    generate_evtx(path, 48, days=2)
+    start = datetime(2024, 1, 14, 19)
+    expected = [str(record.event_id) for record in EvtxReader(path).records()
+                if start <= record.timestamp < start + timedelta(days=1)]
+
+    events = analyzer.parse_evtx_file(path, "System")
+
+    assert [event.event_code for event in events] == expected
+    assert [event.timestamp for event in events] == [f"2024-01-15 {hour:02}:00:00" for hour in range(24)]
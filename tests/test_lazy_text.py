@@ -0,0 +1,72 @@
+# tests/test_lazy_text.py
+"""Отложенный текст отчета и его выдача порциями"""
+
+import gc
+import io
+import weakref
+
+import pytest
+
+from lazy_text import LazyText
+
+def test_renders_once_and_drops_arguments():
+    calls = []
+
+    def render(lines):
+        calls.append(lines)
+        return "\n".join(lines)
+
+    text = LazyText(render, ["a", "b"])
+    assert not text.is_rendered
+    assert text.text() == "a\nb"
+    assert str(text) == "a\nb"
+    assert text.is_rendered and len(calls) == 1
+    assert text._args == ()
+
+def test_join_skips_empty_parts():
+    parts = [LazyText(lambda: "первый"), "", LazyText(lambda: ""), "второй"]
+    assert LazyText.join(parts, separator="\n--\n").text() == "первый\n--\nвторой"
+
+def test_join_does_not_keep_part_texts():
+    parts = [LazyText(lambda: "часть"), "хвост"]
+    released = weakref.ref(parts[0])
+    joined = LazyText.join(parts)
+
+    assert joined.text() == "часть\n\nхвост"
+    assert not parts[0].is_rendered
+    del parts
+    gc.collect()
+    assert released() is None
+
+def test_chunks_cut_after_newline():
+    source = "".join(f"строка {n:03d}\n" for n in range(100))  # 11 символов на строку
+    chunks = list(LazyText(lambda: source).chunks(size=50))
+
+    assert "".join(chunks) == source
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    # В порцию помещается 4 целые строки
+    assert chunks[0] == source[:44]
+
+@pytest.mark.parametrize("source, size", [
+    ("", 10),
+    ("без переводов строки " * 10, 16),    # длинная строка режется по size
+    ("ровно\n" * 4, 6),                     # граница порции совпадает с концом строки
+    ("хвост без перевода\nабв", 8),
+    ("\n\n\n", 1),
+])
+def test_chunks_boundaries(source, size):
+    chunks = list(LazyText(lambda: source).chunks(size=size))
+
+    assert "".join(chunks) == source
+    assert all(0 < len(chunk) <= size for chunk in chunks)
+    for chunk in chunks[:-1]:
+        # Разрез по size допустим только если в порции нет перевода строки
+        assert chunk.endswith("\n") or "\n" not in chunk
+
+def test_write_to_file_matches_text():
+    source = "".join(f"{n}\n" for n in range(50000))
+    text = LazyText(lambda: source)
+    output = io.StringIO()
+    text.write_to(output)
+    assert output.getvalue() == source
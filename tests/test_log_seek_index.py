@@ -0,0 +1,44 @@
+# tests/test_log_seek_index.py
+"""Переход к целевой дате в больших логах терминалов по индексу меток времени"""
+
+import pytest
+
+from payment_terminal_analyzer import (
+    InpasLogParser, SberbankLogParser, ArcusLogParser, StreamingLogParser, LogSeekIndex,
+    parse_log_file, parse_log_files_concurrently
+)
+
+from test_inpas_parser import INPAS_LOG, write_log
+from test_sberbank_parser import SBERBANK_LOG
+from test_arcus_parser import ARCUS_LOG
+
+def history(text: str, day_formats, days: int = 28, repeat: int = 40) -> str:
+    """Лог за days суток января 2024: даты лога заменены датой каждых суток"""
+    blocks = []
+    for day in range(1, days + 1):
+        block = text
+        for source, day_format in day_formats:
+            block = block.replace(source, day_format.format(day=day))
+        blocks.append(block * repeat)
+    return "".join(blocks)
+
+@pytest.mark.parametrize("parser_class, text, day_formats", [
+    (InpasLogParser, INPAS_LOG, [("14.01.24", "{day:02d}.01.24"), ("15.01.24", "{day:02d}.01.24")]),
+    (SberbankLogParser, SBERBANK_LOG, [("14.01", "{day:02d}.01"), ("15.01", "{day:02d}.01")]),
+    (ArcusLogParser, ARCUS_LOG, [("2024-01-14", "2024-01-{day:02d}"), ("14.01.2024", "{day:02d}.01.2024"),
+                                 ("2024-01-15", "2024-01-{day:02d}")]),
+])
+def test_seek_index_matches_whole_file(tmp_path, monkeypatch, parser_class, text, day_formats):
+    """Разбор по индексу дат дает те же транзакции, что и чтение всего файла"""
+    log_path = write_log(tmp_path, "history.log", history(text, day_formats))
+    expected = list(parser_class("2024-01-14").parse_whole_file(log_path))
+    assert expected
+
+    monkeypatch.setattr(StreamingLogParser, 'SEEK_MIN_SIZE', 0)
+    monkeypatch.setattr(LogSeekIndex, 'MIN_STEP', 4096)
+    LogSeekIndex._cache.clear()
+
+    start, end = parser_class("2024-01-14").seek_range(log_path)
+    assert start > 0 and end is not None
+    assert parse_log_file(parser_class, log_path, "2024-01-14") == expected
+    assert parse_log_files_concurrently(parser_class, [log_path], "2024-01-14") == [expected]
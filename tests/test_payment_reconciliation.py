@@ -0,0 +1,135 @@
+# tests/test_payment_reconciliation.py
+"""Сверка оплат по терминалам с фискальными чеками"""
+
+from datetime import datetime
+
+from log_analyzer import ReceiptOperation
+from payment_reconciliation import PaymentReconciler, CardPayment, CardReceipt
+from payment_terminal_analyzer import InpasTransaction, SberbankTransaction, ArcusTransaction
+
+def receipt(time: str, card_sum: float, sale_number: str, operation_type: str = "Продажа") -> ReceiptOperation:
+    return ReceiptOperation(time, "Напечатан", f"{card_sum:.2f}", "Приход", sale_number, operation_type,
+                            "Безналичные", "0001", card_sum)
+
+def sberbank(timestamp: str, amount: str, version: str = "2.22.0.1", status: str = "Успешно") -> SberbankTransaction:
+    return SberbankTransaction(timestamp, amount, status, version, "4321", "00000000000000A1", "1")
+
+def arcus_transaction(timestamp: str, amount: str, operation: str, status: str,
+                      response_code: str) -> ArcusTransaction:
+    return ArcusTransaction(timestamp, amount, operation, status, response_code, "4321", "A1B2C3",
+                            "401400000001", "12345678")
+
+def at(text: str) -> datetime:
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S")
+
+def test_matches_within_tolerance_and_reports_orphans():
+    reconciler = PaymentReconciler(tolerance_seconds=120)
+    payments = [
+        CardPayment(at("2024-01-14 10:00:00"), 15000, "10:00:00", "INPAS"),
+        CardPayment(at("2024-01-14 10:01:00"), 15000, "10:01:00", "INPAS"),
+        CardPayment(at("2024-01-14 11:06:40"), 5000, "11:06:40", "INPAS"),
+    ]
+    receipts = [
+        CardReceipt(at("2024-01-14 10:01:30"), 15000, "10:01:30"),
+        CardReceipt(at("2024-01-14 10:00:10"), 15000, "10:00:10"),
+        CardReceipt(at("2024-01-14 13:53:20"), 7000, "13:53:20"),
+    ]
+
+    result = reconciler.reconcile(payments, receipts)
+
+    assert [(payment.timestamp, receipt.timestamp) for payment, receipt in result.matched] == [
+        ("10:00:00", "10:00:10"), ("10:01:00", "10:01:30")
+    ]
+    assert [payment.amount for payment in result.orphan_payments] == [5000]
+    assert [receipt.amount for receipt in result.orphan_receipts] == [7000]
+    assert not result.is_consistent
+
+def test_payment_outside_tolerance_is_not_matched():
+    reconciler = PaymentReconciler(tolerance_seconds=60)
+    result = reconciler.reconcile([CardPayment(at("2024-01-14 10:00:00"), 10000, "10:00:00", "ARCUS2")],
+                                  [CardReceipt(at("2024-01-14 10:01:01"), 10000, "10:01:01")])
+
+    assert not result.matched
+    assert len(result.orphan_payments) == 1 and len(result.orphan_receipts) == 1
+
+def test_same_time_on_another_day_is_not_matched():
+    reconciler = PaymentReconciler(tolerance_seconds=120)
+    result = reconciler.reconcile([CardPayment(at("2024-01-14 10:00:00"), 10000, "10:00:00", "INPAS")],
+                                  [CardReceipt(at("2024-01-15 10:00:00"), 10000, "10:00:00")])
+
+    assert not result.matched
+
+def test_payment_before_midnight_matches_next_day_receipt():
+    """Чек по оплате в 23:59:50 печатается в 00:00:05 и лежит в логах следующих суток"""
+    reconciler = PaymentReconciler(tolerance_seconds=120)
+    inpas = [InpasTransaction("14.01.24 23:59:50", "150.00", "10000001", "ОДОБРЕНО", "ПАО СБЕРБАНК",
+                              "VISA", "100001", "500000000001")]
+    next_day = [receipt("00:00:05", 150.0, "1"), receipt("00:00:30", 80.0, "2"), receipt("10:00:00", 60.0, "3")]
+
+    result = reconciler.reconcile_all("2024-01-14", inpas, [], [], next_day_operations=next_day)
+
+    assert [(payment.timestamp, receipt.operation.sale_number) for payment, receipt in result.matched] == [
+        ("14.01.24 23:59:50", "1")
+    ]
+    # Остальные чеки следующих суток сверяются с оплатами своего дня
+    assert result.is_consistent
+
+def test_reconcile_all_sources():
+    reconciler = PaymentReconciler()
+    inpas = [InpasTransaction("14.01.24 10:00:00", "150.00", "10000001", "ОДОБРЕНО", "ПАО СБЕРБАНК",
+                              "VISA", "100001", "500000000001")]
+    arcus = [
+        arcus_transaction("2024-01-14 12:00:05", "99.90", "Оплата", "Одобрено", "00"),
+        arcus_transaction("2024-01-14 12:30:00", "99.90", "Возврат", "Одобрено", "00"),
+        arcus_transaction("2024-01-14 13:00:00", "10.00", "Оплата", "Отказ (код 51)", "51"),
+    ]
+    sber = [sberbank("14.01 11:00:00.500", "250.50")]
+    operations = [
+        receipt("10:00:30", 150.0, "1"),
+        receipt("11:00:02", 250.5, "2"),
+        receipt("12:00:00", 99.9, "3"),
+        receipt("12:30:00", 99.9, "4", operation_type="Возврат"),
+        receipt("14:00:00", 0.0, "5"),
+    ]
+
+    result = reconciler.reconcile_all("2024-01-14", inpas, sber, operations, arcus)
+
+    assert [(payment.source, receipt.operation.sale_number) for payment, receipt in result.matched] == [
+        ("INPAS", "1"), ("SBERBANK", "2"), ("ARCUS2", "3")
+    ]
+    assert result.is_consistent and not result.ambiguous_matches
+
+def test_sberbank_amount_unit_from_version():
+    """Версия, которая пишет дробную часть, пишет рубли: ее целые суммы - целые рубли"""
+    reconciler = PaymentReconciler()
+    payments = reconciler.payments_from_sberbank([
+        sberbank("14.01 10:00:00.000", "120.50", version="2.22.0.1"),
+        sberbank("14.01 10:05:00.000", "300", version="2.22.0.1"),
+        sberbank("14.01 10:10:00.000", "15000", version="1.0"),
+    ], year=2024)
+
+    assert [(payment.amount, payment.alternative_amount) for payment in payments] == [
+        (12050, None), (30000, None), (15000, 1500000)
+    ]
+
+def test_ambiguous_sberbank_amounts_are_flagged():
+    reconciler = PaymentReconciler()
+    transactions = [
+        sberbank("14.01 10:00:00.000", "15000", version="1.0"),
+        sberbank("14.01 12:00:00.000", "300", version="1.0"),
+        sberbank("14.01 13:00:00.000", "777", version="1.0"),
+    ]
+    operations = [receipt("10:00:30", 150.0, "1"), receipt("12:00:00", 300.0, "2")]
+
+    result = reconciler.reconcile_all("2024-01-14", [], transactions, operations)
+
+    assert not result.matched
+    assert [(payment.transaction.amount, receipt.amount) for payment, receipt in result.ambiguous_matches] == [
+        ("15000", 15000), ("300", 30000)
+    ]
+    assert [payment.transaction.amount for payment in result.orphan_payments] == ["777"]
+    assert not result.orphan_receipts
+
+    text = reconciler.format_result(result)
+    assert "ЕДИНИЦА СУММЫ НЕ ОПРЕДЕЛЕНА" in text
+    assert "7.77 или 777.00" in text
@@ -0,0 +1,31 @@
+# tests/test_sberbank_parser.py
+"""Потоковый парсер sbkernel (Сбербанк)"""
+
+from payment_terminal_analyzer import SberbankLogParser, parse_log_file
+
+SBERBANK_LOG = """\
+14.01 10:00:00.123 PILOT: poll device state=0 queue=0
+14.01 10:00:01.000 SBKRNL: Command = 4000, Amount = 15000, Department = 1
+14.01 10:00:01.010 SBKRNL: Version:2.22.0.1
+14.01 10:00:05.000 SBKRNL: Result = 0, GUID=00000000000000A1, card ************4321
+14.01 11:00:00.000 SBKRNL: Command = 4000, Amount = 99.90, Department = 1
+14.01 11:00:03.000 SBKRNL: Result = 2003, GUID=00000000000000A2, card ************1111
+""" + "14.01 11:00:04.000 PILOT: poll device state=0 queue=0\n" * 20 + """\
+15.01 09:00:00.000 SBKRNL: Command = 4000, Amount = 500, Department = 2
+15.01 09:00:01.000 SBKRNL: Result = 0, GUID=00000000000000A3, card ************2222
+"""
+
+def write_log(tmp_path, name: str, text: str) -> str:
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_sberbank_transactions(tmp_path):
+    log_path = write_log(tmp_path, "sbkernel.log", SBERBANK_LOG)
+    transactions = parse_log_file(SberbankLogParser, log_path, "2024-01-14")
+
+    assert [(t.timestamp, t.amount, t.status, t.version, t.card_last4, t.guid, t.department)
+            for t in transactions] == [
+        ("14.01 10:00:01.000", "15000", "Успешно", "2.22.0.1", "4321", "00000000000000A1", "1"),
+        ("14.01 11:00:00.000", "99.90", "Отказ банка", "", "1111", "00000000000000A2", "1"),
+    ]
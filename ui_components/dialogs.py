@@ -5,11 +5,11 @@
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTextEdit, QProgressBar, 
-                             QDialogButtonBox, QMessageBox)
+                             QDialogButtonBox, QMessageBox, QFileDialog)
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
 from PyQt5.QtGui import QFont
 
-from config import APP_VERSION, CONTACT_INFO
+from config import APP_VERSION, CONTACT_INFO, DEPARTMENTS
 from update_manager import UpdateManager, UpdateChecker
 
 class ModernDialog(QDialog):
@@ -116,6 +116,109 @@ class OperationsHelpDialog(ModernDialog):
         """)
         layout.addWidget(button_box)
 
+class DepartmentFilesDialog(ModernDialog):
+    """Выбор выгрузок отделов для сравнения: по одному файлу на отдел"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.file_paths = {}
+        self.file_labels = {}
+        self._setup_ui()
+        
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        title = QLabel("🏢 Выгрузки отделов")
+        title.setStyleSheet("""
+            QLabel {
+                color: #f8f8f2;
+                font-size: 18px;
+                font-weight: bold;
+                margin-bottom: 15px;
+            }
+        """)
+        layout.addWidget(title)
+        
+        for department in DEPARTMENTS:
+            row_layout = QHBoxLayout()
+            
+            name_label = QLabel(department)
+            name_label.setMinimumWidth(280)
+            name_label.setStyleSheet("color: #f8f8f2; font-size: 12px;")
+            row_layout.addWidget(name_label)
+            
+            file_label = QLabel("Файл не выбран")
+            file_label.setMinimumWidth(200)
+            file_label.setStyleSheet("color: #888888; font-size: 11px;")
+            self.file_labels[department] = file_label
+            row_layout.addWidget(file_label)
+            
+            select_btn = QPushButton("📁 Выбрать")
+            select_btn.setStyleSheet(self._get_button_style())
+            select_btn.clicked.connect(lambda checked, name=department: self._select_file(name))
+            row_layout.addWidget(select_btn)
+            
+            layout.addLayout(row_layout)
+        
+        button_layout = QHBoxLayout()
+        
+        self.compare_btn = QPushButton("📊 Сравнить")
+        self.compare_btn.setEnabled(False)
+        self.compare_btn.setStyleSheet(self._get_button_style())
+        self.compare_btn.clicked.connect(self.accept)
+        
+        cancel_btn = QPushButton("Отмена")
+        cancel_btn.setStyleSheet(self._get_button_style())
+        cancel_btn.clicked.connect(self.reject)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(self.compare_btn)
+        button_layout.addWidget(cancel_btn)
+        
+        layout.addLayout(button_layout)
+        
+    def _select_file(self, department):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            f"Выгрузка отдела: {department}",
+            "",
+            "Excel Files (*.xlsx *.xls);;All Files (*)"
+        )
+        if not file_path:
+            return
+        
+        self.file_paths[department] = file_path
+        label = self.file_labels[department]
+        label.setText(file_path.replace('\\', '/').split('/')[-1])
+        label.setToolTip(file_path)
+        label.setStyleSheet("color: #50fa7b; font-size: 11px;")
+        self.compare_btn.setEnabled(len(self.file_paths) >= 2)
+        
+    def selected_exports(self):
+        """Отдел -> путь к выгрузке в порядке списка отделов"""
+        return {department: self.file_paths[department] for department in DEPARTMENTS
+                if department in self.file_paths}
+        
+    def _get_button_style(self):
+        return """
+            QPushButton {
+                background-color: #6272a4;
+                color: white;
+                border: none;
+                padding: 8px 15px;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #7282b4;
+            }
+            QPushButton:disabled {
+                background-color: #404352;
+                color: #888888;
+            }
+        """
+
 class UpdateDialog(ModernDialog):
     """Диалог обновлений - ИСПРАВЛЕННАЯ ВЕРСИЯ"""
     
@@ -226,6 +226,22 @@ def create_error_analyzer_page(main_window):
     main_window.analyze_btn.clicked.connect(main_window._start_analysis)
     analysis_layout.addWidget(main_window.analyze_btn)
     
+    # Кнопка анализа тренда по нескольким месячным выгрузкам
+    main_window.trend_btn = QPushButton("📈 Тренд по месяцам")
+    main_window.trend_btn.setMinimumHeight(40)
+    main_window.trend_btn.setToolTip("Выберите выгрузки за несколько месяцев - месяц определяется по имени файла")
+    main_window.trend_btn.setStyleSheet(main_window._get_button_style())
+    main_window.trend_btn.clicked.connect(main_window._start_trend_analysis)
+    analysis_layout.addWidget(main_window.trend_btn)
+    
+    # Кнопка сравнения отделов за один период
+    main_window.comparison_btn = QPushButton("🏢 Сравнение отделов")
+    main_window.comparison_btn.setMinimumHeight(40)
+    main_window.comparison_btn.setToolTip("Выберите выгрузки отделов за выбранный месяц - отчет по всем отделам сразу")
+    main_window.comparison_btn.setStyleSheet(main_window._get_button_style())
+    main_window.comparison_btn.clicked.connect(main_window._start_department_comparison)
+    analysis_layout.addWidget(main_window.comparison_btn)
+    
     # Кнопка экспорта
     main_window.export_btn = QPushButton("📄 Экспорт в PDF")
     main_window.export_btn.setMinimumHeight(40)
@@ -240,6 +256,31 @@ def create_error_analyzer_page(main_window):
     results_tab = QWidget()
     results_layout = QVBoxLayout(results_tab)
     
+    # Фильтры среза: отчет пересчитывается по кубу выгрузки без повторного анализа
+    filter_group = QGroupBox("Фильтры")
+    filter_group.setStyleSheet(dept_group.styleSheet())
+    filter_layout = QGridLayout(filter_group)
+    
+    main_window.error_filter_combos = {}
+    for i, column in enumerate(['Статус', 'Серьезность', 'Сектор', 'Участок']):
+        combo = QComboBox()
+        combo.addItem("Все")
+        combo.setEnabled(False)
+        combo.setStyleSheet(main_window.department_combo.styleSheet())
+        combo.currentIndexChanged.connect(main_window._apply_error_filters)
+        label = QLabel(f"{column}:")
+        label.setStyleSheet("color: #f8f8f2;")
+        filter_layout.addWidget(label, i // 2, (i % 2) * 2)
+        filter_layout.addWidget(combo, i // 2, (i % 2) * 2 + 1)
+        main_window.error_filter_combos[column] = combo
+    
+    main_window.reset_filters_btn = QPushButton("Сбросить фильтры")
+    main_window.reset_filters_btn.setEnabled(False)
+    main_window.reset_filters_btn.setStyleSheet(main_window._get_button_style())
+    main_window.reset_filters_btn.clicked.connect(main_window._reset_error_filters)
+    filter_layout.addWidget(main_window.reset_filters_btn, 2, 0, 1, 4)
+    results_layout.addWidget(filter_group)
+    
     main_window.text_report = QTextEdit()
     main_window.text_report.setReadOnly(True)
     main_window.text_report.setStyleSheet("""
@@ -973,6 +1014,7 @@ def _create_basic_mechanisms_tab(main_window):
     main_window.use_custom_patterns_check = QCheckBox("Считать по шаблону")
     main_window.use_custom_patterns_check.setStyleSheet("QCheckBox { color: #f8f8f2; font-weight: bold; }")
     main_window.use_custom_patterns_check.stateChanged.connect(_on_use_custom_patterns_changed_factory(main_window))
+    main_window.use_custom_patterns_check.stateChanged.connect(main_window._apply_os_event_filter)
     patterns_layout.addWidget(main_window.use_custom_patterns_check)
     
     patterns_layout.addWidget(QLabel("Укажите шаблон кодов через запятую:"))
@@ -989,6 +1031,7 @@ def _create_basic_mechanisms_tab(main_window):
         }
     """)
     main_window.custom_patterns_input.setEnabled(False)
+    main_window.custom_patterns_input.editingFinished.connect(main_window._apply_os_event_filter)
     patterns_layout.addWidget(main_window.custom_patterns_input)
     
     default_patterns_label = QLabel("Коды по умолчанию: 41, 55, 98, 7031, 7001, 7000")
@@ -1047,8 +1090,7 @@ def _create_basic_mechanisms_tab(main_window):
     log_switch_layout = QHBoxLayout()
     log_switch_layout.addWidget(QLabel("Журнал:"))
     
-    main_window.os_log_switch_combo = QComboBox()
-    main_window.os_log_switch_combo.addItems(["Журнал приложения", "Журнал системы"])
+    main_window.os_log_switch_combo = QComboBox()  # Заполняется журналами из результата анализа
     main_window.os_log_switch_combo.setStyleSheet("""
         QComboBox {
             background-color: #44475a;
@@ -1064,6 +1106,43 @@ def _create_basic_mechanisms_tab(main_window):
     
     results_layout.addLayout(log_switch_layout)
     
+    # Фильтр событий: отбор из разобранных журналов без повторного анализа
+    event_filter_layout = QHBoxLayout()
+    event_filter_style = """
+        QComboBox, QLineEdit {
+            background-color: #44475a;
+            color: #f8f8f2;
+            border: 1px solid #6272a4;
+            padding: 8px;
+            border-radius: 4px;
+        }
+    """
+    
+    event_filter_layout.addWidget(QLabel("Уровень:"))
+    main_window.os_level_filter_combo = QComboBox()
+    main_window.os_level_filter_combo.setStyleSheet(event_filter_style)
+    main_window.os_level_filter_combo.addItem("Все", None)
+    for level in ("Критическое", "Ошибка", "Предупреждение", "Информация", "Подробно"):
+        main_window.os_level_filter_combo.addItem(level, level)
+    main_window.os_level_filter_combo.currentIndexChanged.connect(main_window._apply_os_event_filter)
+    event_filter_layout.addWidget(main_window.os_level_filter_combo)
+    
+    event_filter_layout.addWidget(QLabel("Источник:"))
+    main_window.os_source_filter_input = QLineEdit()
+    main_window.os_source_filter_input.setPlaceholderText("Часть имени источника")
+    main_window.os_source_filter_input.setStyleSheet(event_filter_style)
+    main_window.os_source_filter_input.editingFinished.connect(main_window._apply_os_event_filter)
+    event_filter_layout.addWidget(main_window.os_source_filter_input)
+    
+    event_filter_layout.addWidget(QLabel("Текст:"))
+    main_window.os_text_filter_input = QLineEdit()
+    main_window.os_text_filter_input.setPlaceholderText("Часть описания события")
+    main_window.os_text_filter_input.setStyleSheet(event_filter_style)
+    main_window.os_text_filter_input.editingFinished.connect(main_window._apply_os_event_filter)
+    event_filter_layout.addWidget(main_window.os_text_filter_input)
+    
+    results_layout.addLayout(event_filter_layout)
+    
     # Таблица результатов
     main_window.os_events_table = QTableWidget()
     main_window.os_events_table.setStyleSheet("""
@@ -1175,6 +1254,49 @@ def create_settings_page(main_window):
     
     layout.addWidget(update_group)
     
+    # Группа SLA для аналитики ошибок
+    sla_group = QGroupBox("⏱ Сроки исправления ошибок (SLA)")
+    sla_group.setStyleSheet(update_group.styleSheet())
+    sla_layout = QVBoxLayout(sla_group)
+    
+    sla_hint = QLabel("Серьезность ошибки и допустимое число дней в работе. "
+                      "Ошибки с большим сроком считаются нарушением SLA.")
+    sla_hint.setWordWrap(True)
+    sla_hint.setStyleSheet("color: #f8f8f2; font-size: 12px; font-weight: normal;")
+    sla_layout.addWidget(sla_hint)
+    
+    main_window.sla_table = QTableWidget(0, 2)
+    main_window.sla_table.setHorizontalHeaderLabels(["Серьезность", "Дней"])
+    main_window.sla_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+    main_window.sla_table.verticalHeader().setVisible(False)
+    main_window.sla_table.setMaximumHeight(160)
+    main_window.sla_table.setStyleSheet("""
+        QTableWidget {
+            background-color: #44475a;
+            color: #f8f8f2;
+            border: 1px solid #6272a4;
+            font-weight: normal;
+        }
+    """)
+    sla_layout.addWidget(main_window.sla_table)
+    
+    sla_buttons = QHBoxLayout()
+    add_sla_btn = QPushButton("➕ Добавить")
+    add_sla_btn.setStyleSheet(main_window._get_button_style())
+    add_sla_btn.clicked.connect(lambda: main_window.sla_table.insertRow(main_window.sla_table.rowCount()))
+    remove_sla_btn = QPushButton("➖ Удалить")
+    remove_sla_btn.setStyleSheet(main_window._get_button_style())
+    remove_sla_btn.clicked.connect(lambda: main_window.sla_table.removeRow(main_window.sla_table.currentRow()))
+    save_sla_btn = QPushButton("💾 Сохранить SLA")
+    save_sla_btn.setStyleSheet(main_window._get_button_style())
+    save_sla_btn.clicked.connect(main_window._save_sla_settings)
+    sla_buttons.addWidget(add_sla_btn)
+    sla_buttons.addWidget(remove_sla_btn)
+    sla_buttons.addWidget(save_sla_btn)
+    sla_layout.addLayout(sla_buttons)
+    
+    layout.addWidget(sla_group)
+    
     # Группа системной информации
     system_group = QGroupBox("💻 Системная информация")
     system_group.setStyleSheet(update_group.styleSheet())
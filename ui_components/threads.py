@@ -6,12 +6,15 @@
 import logging
 import requests
 import tempfile
+from datetime import datetime, timedelta
 from PyQt5.QtCore import QThread, pyqtSignal
 
 from log_analyzer import SupportLogAnalyzer
 from marking_analyzer import MarkingLogAnalyzer
 from basic_mechanisms_analyzer import BasicMechanismsAnalyzer
-from payment_terminal_analyzer import PaymentTerminalAnalyzer
+from payment_terminal_analyzer import PaymentTerminalAnalyzer, sberbank_sort_key
+from payment_reconciliation import PaymentReconciler
+from lazy_text import LazyText
 
 logger = logging.getLogger(__name__)
 
@@ -22,31 +25,140 @@ class AnalysisThread(QThread):
     analysis_error = pyqtSignal(str)
     progress_updated = pyqtSignal(int)
     
-    def __init__(self, file_path, department, month):
+    def __init__(self, file_path, department, month, sla_limits=None):
         super().__init__()
         self.file_path = file_path
         self.department = department
         self.month = month
+        self.sla_limits = sla_limits
         self.logger = logging.getLogger(__name__)
     
     def run(self):
         try:
             self.progress_updated.emit(10)
             
-            from analyzer import ErrorAnalyzer
-            analyzer = ErrorAnalyzer(self.file_path)
-            self.progress_updated.emit(40)
-            
-            analysis_result = analyzer.analyze_errors()
+            from analyzer import analyze_error_export
+            analysis_result, cube = analyze_error_export(self.file_path, self.sla_limits)
             self.progress_updated.emit(80)
             
+            # По кубу считаются отчеты по срезам (фильтры на вкладке результатов)
+            if cube is not None:
+                analysis_result = cube.analysis(self.sla_limits)
+            
             self.progress_updated.emit(100)
-            self.analysis_finished.emit(analysis_result)
+            self.analysis_finished.emit({'analysis': analysis_result, 'cube': cube})
             
         except Exception as e:
             self.logger.error(f"Ошибка анализа: {e}")
             self.analysis_error.emit(str(e))
 
+class TrendAnalysisThread(QThread):
+    """Поток для анализа тренда ошибок по месячным выгрузкам"""
+    
+    analysis_finished = pyqtSignal(dict)
+    analysis_error = pyqtSignal(str)
+    progress_updated = pyqtSignal(int)
+    
+    def __init__(self, exports, sla_limits=None):
+        super().__init__()
+        self.exports = exports  # {месяц: путь к выгрузке}
+        self.sla_limits = sla_limits
+        self.logger = logging.getLogger(__name__)
+    
+    def run(self):
+        try:
+            self.progress_updated.emit(10)
+            
+            from analyzer import TrendAnalyzer
+            trend_result = TrendAnalyzer(self.exports, self.sla_limits).analyze()
+            
+            self.progress_updated.emit(100)
+            self.analysis_finished.emit(trend_result)
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка анализа тренда: {e}")
+            self.analysis_error.emit(str(e))
+
+class ComparisonAnalysisThread(QThread):
+    """Поток для сравнения отделов по выгрузкам за один период"""
+    
+    analysis_finished = pyqtSignal(dict)
+    analysis_error = pyqtSignal(str)
+    progress_updated = pyqtSignal(int)
+    
+    def __init__(self, exports, sla_limits=None):
+        super().__init__()
+        self.exports = exports  # {отдел: путь к выгрузке}
+        self.sla_limits = sla_limits
+        self.logger = logging.getLogger(__name__)
+    
+    def run(self):
+        try:
+            self.progress_updated.emit(10)
+            
+            from analyzer import DepartmentComparison
+            comparison_result = DepartmentComparison(self.exports, self.sla_limits).analyze()
+            
+            self.progress_updated.emit(100)
+            self.analysis_finished.emit(comparison_result)
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка сравнения отделов: {e}")
+            self.analysis_error.emit(str(e))
+
+class PDFExportThread(QThread):
+    """Поток сборки PDF: одно или несколько заданий (генератор, путь) с отменой"""
+    
+    export_finished = pyqtSignal(list)
+    export_error = pyqtSignal(str)
+    export_cancelled = pyqtSignal()
+    progress_updated = pyqtSignal(int)
+    
+    def __init__(self, jobs):
+        super().__init__()
+        self.jobs = jobs  # [(генератор PDF, путь к файлу)]
+        self._cancelled = False
+        self.logger = logging.getLogger(__name__)
+    
+    def cancel(self):
+        """Отмена: сборка прерывается на ближайшем элементе документа"""
+        self._cancelled = True
+    
+    def run(self):
+        from pdf_generator import build_pdf_batch, PDFBuildCancelled
+        try:
+            file_paths = build_pdf_batch(self.jobs, self.progress_updated.emit, lambda: self._cancelled)
+            self.export_finished.emit(file_paths)
+            
+        except PDFBuildCancelled:
+            self.export_cancelled.emit()
+        except Exception as e:
+            self.logger.error(f"Ошибка создания PDF: {e}")
+            self.export_error.emit(str(e))
+
+class StructuredExportThread(QThread):
+    """Поток структурированного экспорта полных результатов (XLSX, CSV, NDJSON)"""
+    
+    export_finished = pyqtSignal(list)
+    export_error = pyqtSignal(str)
+    rows_written = pyqtSignal(int)
+    
+    def __init__(self, sections, file_path):
+        super().__init__()
+        self.sections = sections
+        self.file_path = file_path
+        self.logger = logging.getLogger(__name__)
+    
+    def run(self):
+        try:
+            from structured_export import export_sections
+            file_paths = export_sections(self.sections, self.file_path, self.rows_written.emit)
+            self.export_finished.emit(file_paths)
+            
+        except Exception as e:
+            self.logger.error(f"Ошибка структурированного экспорта: {e}")
+            self.export_error.emit(str(e))
+
 class LogAnalysisThread(QThread):
     """Поток для анализа логов"""
     
@@ -82,11 +194,11 @@ class LogAnalysisThread(QThread):
             
             if self.analysis_method == "general":
                 result = self.analyzer.general_analysis(log_dir, self.include_warnings)
-                formatted_result = self.analyzer.format_general_analysis_result(result)
+                formatted_result = LazyText(self.analyzer.format_general_analysis_result, result)
                 structured_data = result
             elif self.analysis_method == "receipt":
                 result = self.analyzer.receipt_analysis(log_dir)
-                formatted_result = self.analyzer.format_receipt_analysis_result(result)
+                formatted_result = LazyText(self.analyzer.format_receipt_analysis_result, result)
                 structured_data = result
             else:
                 self.analysis_error.emit("Неизвестный метод анализа")
@@ -142,30 +254,29 @@ class MarkingAnalysisThread(QThread):
             self.progress_updated.emit(60)
             
             results = []
-            formatted_text = ""
             
             if self.method_index == 0:  # Считать все сканирования
                 if self.use_devices:
                     results = self.analyzer.analyze_all_scans_devices(log_dir)
                 else:
                     results = self.analyzer.analyze_all_scans_console(log_dir)
-                formatted_text = self.analyzer.format_scans_result(results)
+                formatted_text = LazyText(self.analyzer.format_scans_result, results)
                 
             elif self.method_index == 1:  # Информация по КМ
                 results = self.analyzer.analyze_marking_info(log_dir)
-                formatted_text = self.analyzer.format_marking_info_result(results)
+                formatted_text = LazyText(self.analyzer.format_marking_info_result, results)
                 
             elif self.method_index == 2:  # Подключение ЛМ ЧЗ
                 results = self.analyzer.analyze_connection_issues(log_dir)
-                formatted_text = self.analyzer.format_connection_issues_result(results)
+                formatted_text = LazyText(self.analyzer.format_connection_issues_result, results)
                 
             elif self.method_index == 3:  # Логин и пароль ЛМ ЧЗ
                 results = self.analyzer.analyze_login_password(log_dir)
-                formatted_text = self.analyzer.format_login_password_result(results)
+                formatted_text = LazyText(self.analyzer.format_login_password_result, results)
                 
             elif self.method_index == 4:  # Проверка вскрытия
                 results = self.analyzer.analyze_opening_check(log_dir)
-                formatted_text = self.analyzer.format_opening_check_result(results)
+                formatted_text = LazyText(self.analyzer.format_opening_check_result, results)
             
             else:
                 self.analysis_error.emit("Неизвестный метод анализа маркировки")
@@ -214,9 +325,10 @@ class BasicMechanismsThread(QThread):
             self.progress_updated.emit(30)
             
             # Настраиваем шаблоны если нужно
-            if self.use_custom_patterns and self.custom_patterns:
-                self.analyzer.set_custom_patterns(self.custom_patterns)
-                self.analyzer.set_use_custom_patterns(True)
+            self.analyzer.apply_pattern_settings(self.use_custom_patterns, self.custom_patterns)
+            
+            if self.analysis_date:
+                self.analyzer.set_analysis_date(self.analysis_date)
             
             log_dir = self.analyzer.find_system_info_directory()
             if not log_dir:
@@ -226,16 +338,17 @@ class BasicMechanismsThread(QThread):
             self.progress_updated.emit(60)
             
             # Анализируем журналы ОС
-            app_events, sys_events = self.analyzer.analyze_os_logs(log_dir)
-            formatted_text = self.analyzer.format_os_logs_result(app_events, sys_events)
+            journals = self.analyzer.analyze_os_logs(log_dir)
+            formatted_text = LazyText(self.analyzer.format_os_logs_result, journals)
             
             self.progress_updated.emit(90)
             
             final_result = {
-                'application_events': app_events,
-                'system_events': sys_events,
+                'journals': journals,
                 'formatted_text': formatted_text,
-                'total_events': len(app_events) + len(sys_events)
+                'total_events': sum(len(events) for events in journals.values()),
+                # Разобранные журналы для повторного отбора на странице без нового анализа
+                'analyzer': self.analyzer
             }
             
             self.analysis_finished.emit(final_result)
@@ -252,12 +365,46 @@ class PaymentTerminalThread(QThread):
     analysis_finished = pyqtSignal(dict)
     analysis_error = pyqtSignal(str)
     progress_updated = pyqtSignal(int)
+    driver_progress = pyqtSignal(str)
     
-    def __init__(self, archive_path, analysis_date):
+    def __init__(self, archive_path, analysis_date, reconcile_tolerance=120):
         super().__init__()
         self.archive_path = archive_path
         self.analysis_date = analysis_date
         self.analyzer = PaymentTerminalAnalyzer()
+        self.reconciler = PaymentReconciler(tolerance_seconds=reconcile_tolerance)
+        self.logger = logging.getLogger(__name__)
+    
+    def _on_driver_done(self, driver_name, done, total):
+        """Прогресс по драйверам: диапазон 50-80%"""
+        self.driver_progress.emit(f"Драйвер {driver_name} проанализирован ({done}/{total})")
+        self.progress_updated.emit(50 + int(30 * done / total))
+    
+    def _reconcile_with_receipts(self, inpas_transactions, sberbank_transactions, arcus_transactions):
+        """Сверка оплат терминалов с чеками (если в архиве есть логи кассы за дату)"""
+        if not inpas_transactions and not sberbank_transactions and not arcus_transactions:
+            return None
+        
+        try:
+            # Архив уже распакован - используем ту же временную папку
+            log_analyzer = SupportLogAnalyzer()
+            log_analyzer.temp_dir = self.analyzer.temp_dir
+            log_dir = log_analyzer.find_logs_directory(self.analysis_date)
+            if not log_dir:
+                return None
+            
+            operations = log_analyzer.analyze_receipt_operations(log_dir)
+            
+            # Чеки по оплатам перед полуночью лежат в логах следующих суток
+            next_day = (datetime.strptime(self.analysis_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+            next_day_dir = log_analyzer.find_logs_directory(next_day)
+            next_day_operations = log_analyzer.analyze_receipt_operations(next_day_dir) if next_day_dir else None
+            
+            return self.reconciler.reconcile_all(self.analysis_date, inpas_transactions, sberbank_transactions,
+                                                 operations, arcus_transactions, next_day_operations)
+        except Exception as e:
+            self.logger.error(f"Ошибка сверки оплат с чеками: {e}")
+            return None
     
     def run(self):
         try:
@@ -280,41 +427,59 @@ class PaymentTerminalThread(QThread):
             
             # Обнаруживаем драйверы
             drivers = self.analyzer.detect_drivers(pts_dir)
-            drivers_text = self.analyzer.format_drivers_result(drivers)
             
-            # Анализируем найденные драйверы
+            # Анализируем все найденные драйверы параллельно
+            driver_results = self.analyzer.analyze_drivers(
+                pts_dir,
+                drivers,
+                self.analysis_date,
+                progress_callback=self._on_driver_done
+            )
+            
             inpas_transactions = []
             sberbank_transactions = []
+            arcus_transactions = []
             
-            for driver in drivers:
-                if driver.driver_type == "INPAS" and driver.found:
-                    inpas_transactions = self.analyzer.analyze_inpas_driver(
-                        f"{pts_dir}/{driver.driver_name}", 
-                        self.analysis_date
-                    )
-                
-                elif driver.driver_type in ["SBERBANK", "SC552"] and driver.found:
-                    sberbank_transactions = self.analyzer.analyze_sberbank_driver(
-                        f"{pts_dir}/{driver.driver_name}", 
-                        self.analysis_date
-                    )
+            for driver_result in driver_results:
+                if driver_result.driver_type == "INPAS":
+                    inpas_transactions.extend(driver_result.transactions)
+                elif driver_result.driver_type in ["SBERBANK", "SC552"]:
+                    sberbank_transactions.extend(driver_result.transactions)
+                elif driver_result.driver_type == "ARCUS2":
+                    arcus_transactions.extend(driver_result.transactions)
             
-            self.progress_updated.emit(80)
+            # Несколько драйверов Сбербанка - общий порядок по времени
+            sberbank_transactions.sort(key=sberbank_sort_key)
             
-            inpas_text = self.analyzer.format_inpas_result(inpas_transactions)
-            sberbank_text = self.analyzer.format_sberbank_result(sberbank_transactions)
+            self.progress_updated.emit(80)
             
-            # Объединяем все результаты
-            formatted_text = f"{drivers_text}\n\n{inpas_text}\n\n{sberbank_text}"
+            # Сверяем оплаты с чеками из логов кассы того же архива
+            reconciliation = self._reconcile_with_receipts(inpas_transactions, sberbank_transactions,
+                                                           arcus_transactions)
+            
+            # Объединяем все результаты (текст строится при показе)
+            text_parts = [
+                LazyText(self.analyzer.format_drivers_result, drivers),
+                LazyText(self.analyzer.format_driver_results, driver_results),
+                LazyText(self.analyzer.format_inpas_result, inpas_transactions),
+                LazyText(self.analyzer.format_sberbank_result, sberbank_transactions),
+                LazyText(self.analyzer.format_arcus_result, arcus_transactions),
+            ]
+            if reconciliation:
+                text_parts.append(LazyText(self.reconciler.format_result, reconciliation))
+            formatted_text = LazyText.join(text_parts)
             
             self.progress_updated.emit(90)
             
             final_result = {
                 'drivers': drivers,
+                'driver_results': driver_results,
                 'inpas_transactions': inpas_transactions,
                 'sberbank_transactions': sberbank_transactions,
+                'arcus_transactions': arcus_transactions,
+                'reconciliation': reconciliation,
                 'formatted_text': formatted_text,
-                'total_transactions': len(inpas_transactions) + len(sberbank_transactions)
+                'total_transactions': len(inpas_transactions) + len(sberbank_transactions) + len(arcus_transactions)
             }
             
             self.analysis_finished.emit(final_result)